@@ -10,9 +10,6 @@ import queue
 import time
 import numpy as np
 import sounddevice as sd
-import webrtcvad
-import noisereduce as nr
-from scipy import signal
 import whisper
 from google.cloud import speech
 import speech_recognition as sr
@@ -23,6 +20,17 @@ import os
 from typing import List, Dict, Optional, Tuple
 import logging
 
+from asr_ensemble import EnsembleScheduler
+from audio_channel import AudioChannel
+from audio_preprocessor import StreamingPreprocessor
+from audio_ring_buffer import AudioRingBuffer
+from pcm_audio import to_whisper_input
+from rover_alignment import rover_combine
+from sqlite_writer import BackgroundSQLiteWriter
+from transcription_cache import TranscriptionCache
+from stt_worker_pool import get_stt_pool
+from voice_activity import VoiceActivityDetector
+
 class AdvancedVoiceEngine:
     """Advanced multi-engine voice recognition system."""
     
@@ -37,8 +45,14 @@ class AdvancedVoiceEngine:
         self._init_engines()
         
         # Advanced preprocessing components
-        self.vad = webrtcvad.Vad(3)
-        self.noise_profile = None
+        self.voice_activity = VoiceActivityDetector(
+            sample_rate=self.samplerate,
+            frame_ms=self.frame_duration_ms,
+            min_speech_db=-60.0,        # mean energy ~1000 on int16
+            zcr_range=(0.005, 0.15),    # crossings per sample (speech has moderate ZCR)
+            webrtc_aggressiveness=3
+        )
+        self.preprocessor = StreamingPreprocessor(sample_rate=self.samplerate)
         self.audio_buffer = deque(maxlen=1000)
         
         # Learning and optimization database
@@ -51,18 +65,31 @@ class AdvancedVoiceEngine:
             'sphinx': {'accuracy': 0.75, 'speed': 1.0, 'confidence': []}
         }
         
+        # Early-exit scheduling over whichever engines initialized
+        available_engines = {}
+        if self.whisper_pool:
+            available_engines['whisper'] = self.transcribe_with_whisper
+        if self.google_client:
+            available_engines['google'] = self.transcribe_with_google
+        if self.sphinx_recognizer:
+            available_engines['sphinx'] = self.transcribe_with_sphinx
+        self.ensemble = EnsembleScheduler(
+            available_engines,
+            prior_accuracy={name: perf['accuracy'] for name, perf in self.engine_performance.items()}
+        )
+        
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
     def _init_engines(self):
         """Initialize all available ASR engines."""
-        # Whisper (OpenAI) - Highest accuracy
+        # Whisper (OpenAI) - Highest accuracy, served off the event loop
         try:
-            self.whisper_model = whisper.load_model("base")
+            self.whisper_pool = get_stt_pool("base")
             print("✅ Whisper ASR engine initialized")
         except Exception as e:
             print(f"❌ Whisper failed: {e}")
-            self.whisper_model = None
+            self.whisper_pool = None
             
         # Google Cloud Speech-to-Text
         try:
@@ -114,61 +141,50 @@ class AdvancedVoiceEngine:
         conn.commit()
         conn.close()
         
-    def preprocess_audio(self, audio_data: np.ndarray) -> np.ndarray:
-        """Advanced audio preprocessing for optimal recognition."""
-        # Convert to float for processing
-        audio_float = audio_data.astype(np.float32) / 32768.0
-        
-        # Noise reduction
-        if self.noise_profile is not None:
-            audio_float = nr.reduce_noise(y=audio_float, sr=self.samplerate, 
-                                        stationary=True, prop_decrease=0.8)
-        
-        # Normalize volume
-        audio_float = audio_float / np.max(np.abs(audio_float))
+        # Per-utterance learning data goes through one long-lived WAL connection
+        self.db_writer = BackgroundSQLiteWriter(self.db_path, batch_size=32, flush_interval=1.0,
+                                                name="voice-learning-writer")
+        
+        # Repeated commands skip inference on an exact digest match; perceptual matching
+        # is opt-in (GEM_PERCEPTUAL_TRANSCRIPTION_CACHE=1) until calibrated on recorded speech
+        self.transcription_cache = TranscriptionCache(
+            self.db_path,
+            writer=self.db_writer,
+            language=self.language_code,
+            sample_rate=self.samplerate,
+            perceptual=os.getenv('GEM_PERCEPTUAL_TRANSCRIPTION_CACHE', '0') == '1'
+        )
         
-        # Apply bandpass filter (human speech range: 85-255 Hz fundamental)
-        sos = signal.butter(4, [85, 8000], btype='band', fs=self.samplerate, output='sos')
-        audio_float = signal.sosfilt(sos, audio_float)
+    def preprocess_audio(self, audio_data: np.ndarray) -> np.ndarray:
+        """Advanced audio preprocessing for optimal recognition.
         
-        # Convert back to int16
-        return (audio_float * 32767).astype(np.int16)
+        Band-pass (85-7600 Hz), spectral noise suppression against the learned noise
+        profile and running automatic gain control - filter design and noise/gain
+        state are reused between calls.
+        """
+        return self.preprocessor.process_utterance(audio_data)
         
     def detect_voice_activity(self, audio_chunk: np.ndarray) -> bool:
-        """Advanced voice activity detection."""
-        # WebRTC VAD
-        try:
-            vad_result = self.vad.is_speech(audio_chunk.tobytes(), self.samplerate)
-        except:
-            vad_result = False
-            
-        # Energy-based detection
-        energy = np.sum(audio_chunk.astype(np.float32) ** 2) / len(audio_chunk)
-        energy_threshold = 1000  # Adjustable threshold
-        energy_result = energy > energy_threshold
-        
-        # Zero crossing rate
-        zcr = np.sum(np.abs(np.diff(np.sign(audio_chunk)))) / len(audio_chunk)
-        zcr_result = 0.01 < zcr < 0.3  # Speech typically has moderate ZCR
-        
-        # Combined decision
-        return vad_result and energy_result and zcr_result
+        """Advanced voice activity detection (energy + ZCR + WebRTC, with hangover)."""
+        return self.voice_activity.is_speech(audio_chunk)
         
     async def transcribe_with_whisper(self, audio_data: np.ndarray) -> Tuple[str, float]:
         """Transcribe using Whisper (highest accuracy)."""
-        if not self.whisper_model:
+        if not self.whisper_pool:
             return "", 0.0
             
         try:
             start_time = time.time()
-            audio_float = audio_data.astype(np.float32) / 32768.0
-            result = self.whisper_model.transcribe(audio_float, language='pt')
+            audio_float = to_whisper_input(audio_data, self.samplerate)
+            result = await self.whisper_pool.transcribe(audio_float, language='pt')
             processing_time = time.time() - start_time
             
             text = result['text'].strip()
-            # Whisper doesn't provide confidence, estimate from segments
-            avg_confidence = np.mean([segment.get('confidence', 0.8) 
-                                    for segment in result.get('segments', [{'confidence': 0.8}])])
+            # Whisper doesn't provide confidence, estimate from segment log-probabilities
+            avg_confidence = float(np.mean([
+                segment.get('confidence', np.exp(segment['avg_logprob']) if 'avg_logprob' in segment else 0.8)
+                for segment in result.get('segments') or [{'confidence': 0.8}]
+            ]))
             
             return text, avg_confidence
         except Exception as e:
@@ -267,102 +283,87 @@ class AdvancedVoiceEngine:
         if weighted_results[0][1] > 0.8:
             return weighted_results[0][0]
             
-        # Otherwise, try to find consensus
+        # Otherwise, align the hypotheses word by word and vote (ROVER)
         if len(weighted_results) > 1:
-            # Simple word-level consensus
-            words_count = {}
-            for text, weight, engine in weighted_results:
-                words = text.lower().split()
-                for word in words:
-                    if word not in words_count:
-                        words_count[word] = 0
-                    words_count[word] += weight
-                    
-            # Reconstruct text with most confident words
-            if words_count:
-                consensus_words = sorted(words_count.items(), key=lambda x: x[1], reverse=True)
-                return ' '.join([word for word, _ in consensus_words[:10]])
+            consensus = rover_combine([(text, weight) for text, weight, _ in weighted_results])
+            if consensus:
+                return consensus
                 
         return weighted_results[0][0] if weighted_results else ""
         
     def store_recognition_result(self, audio_hash: str, results: Dict[str, str], 
                                final_result: str, confidence: float, processing_time: float):
-        """Store recognition results for learning and optimization."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO recognition_history 
-                (audio_hash, whisper_result, google_result, sphinx_result, 
-                 final_result, confidence_score, processing_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                audio_hash,
-                results.get('whisper', ''),
-                results.get('google', ''),
-                results.get('sphinx', ''),
-                final_result,
-                confidence,
-                processing_time
-            ))
-            
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            self.logger.error(f"Failed to store recognition result: {e}")
-            
-    async def advanced_transcribe(self, audio_data: np.ndarray) -> str:
-        """Main transcription method using all engines with advanced processing."""
+        """Store recognition results for learning and optimization (queued, never blocks)."""
+        queued = self.db_writer.execute('''
+            INSERT INTO recognition_history 
+            (audio_hash, whisper_result, google_result, sphinx_result, 
+             final_result, confidence_score, processing_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            audio_hash,
+            results.get('whisper', ''),
+            results.get('google', ''),
+            results.get('sphinx', ''),
+            final_result,
+            confidence,
+            processing_time
+        ))
+        if not queued:
+            self.logger.error("Failed to store recognition result: writer queue full")
+            
+    def close(self):
+        """Flush queued learning data and release the database connections."""
+        self.transcription_cache.close()
+        self.db_writer.close()
+        
+    async def advanced_transcribe(self, audio_data: np.ndarray, quality: str = 'balanced',
+                                  confidence_threshold: Optional[float] = None,
+                                  deadline: Optional[float] = None) -> str:
+        """Main transcription method using all engines with advanced processing.
+        
+        ``quality`` ('fast', 'balanced' or 'accurate') trades accuracy for latency;
+        ``confidence_threshold`` and ``deadline`` override the preset. The first
+        result trusted above the threshold wins and the other engines are cancelled.
+        """
         start_time = time.time()
         
         # Preprocess audio
         processed_audio = self.preprocess_audio(audio_data)
         
-        # Generate audio hash for caching/learning
-        audio_hash = str(hash(processed_audio.tobytes()))
-        
-        # Run all engines in parallel
-        tasks = []
+        # Stable fingerprint for caching/learning
+        cache_key = self.transcription_cache.make_key(processed_audio)
+        audio_hash = cache_key.digest
         
-        if self.whisper_model:
-            tasks.append(asyncio.create_task(
-                self.transcribe_with_whisper(processed_audio), name='whisper'
-            ))
-            
-        if self.google_client:
-            tasks.append(asyncio.create_task(
-                self.transcribe_with_google(processed_audio), name='google'
-            ))
-            
-        if self.sphinx_recognizer:
-            tasks.append(asyncio.create_task(
-                self.transcribe_with_sphinx(processed_audio), name='sphinx'
-            ))
+        cached = self.transcription_cache.get(cache_key)
+        if cached:
+            processing_time = time.time() - start_time
+            self.store_recognition_result(audio_hash, {}, cached['text'],
+                                        cached['confidence'], processing_time)
+            print(f"⚡ Cache hit ({cached['match']}) in {processing_time * 1000:.1f}ms: {cached['text']}")
+            return cached['text']
             
-        # Wait for all tasks to complete
-        if not tasks:
+        if not self.ensemble.engines:
             return ""
             
-        completed_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results
-        results = []
-        result_dict = {}
-        
-        for i, result in enumerate(completed_results):
-            if isinstance(result, Exception):
-                continue
-                
-            text, confidence = result
-            engine_name = tasks[i].get_name()
-            
-            if text.strip():
-                results.append((text, confidence, engine_name))
-                result_dict[engine_name] = text
+        # Race the engines that are worth launching
+        outcome = await self.ensemble.run(processed_audio, quality=quality,
+                                          confidence_threshold=confidence_threshold,
+                                          deadline=deadline)
+        results = outcome.results
+        result_dict = {engine_name: text for text, _, engine_name in results}
                 
-        # Make ensemble decision
-        final_text = self.ensemble_decision(results)
+        # Make ensemble decision over whatever finished in time
+        if outcome.early_exit:
+            final_text = result_dict[outcome.early_exit]
+        else:
+            final_text = self.ensemble_decision(results)
+        
+        # Learn engine accuracy from agreement with the decision
+        self.ensemble.record_decision(outcome, final_text)
+        for text, confidence, engine_name in results:
+            performance = self.engine_performance[engine_name]
+            performance['accuracy'] = self.ensemble.stats[engine_name].accuracy
+            performance['confidence'] = (performance['confidence'] + [confidence])[-100:]
         
         # Calculate overall confidence
         if results:
@@ -375,8 +376,12 @@ class AdvancedVoiceEngine:
         # Store for learning
         self.store_recognition_result(audio_hash, result_dict, final_text, 
                                     overall_confidence, processing_time)
+        self.transcription_cache.put(cache_key, final_text, overall_confidence)
         
-        print(f"🎯 Transcription completed in {processing_time:.2f}s with {overall_confidence:.2f} confidence")
+        exit_note = f" (early exit: {outcome.early_exit})" if outcome.early_exit else ""
+        print(f"🎯 Transcription completed in {processing_time:.2f}s with {overall_confidence:.2f} confidence{exit_note}")
+        if outcome.cancelled:
+            print(f"✂️ Cancelled: {', '.join(outcome.cancelled)}")
         print(f"📝 Results: {result_dict}")
         print(f"🏆 Final: {final_text}")
         
@@ -386,16 +391,22 @@ class AdvancedVoiceEngine:
         """Continuous listening with advanced voice activity detection."""
         print("🎤 Advanced listening started...")
         
-        audio_queue = asyncio.Queue()
-        loop = asyncio.get_running_loop()
+        audio_ring = AudioRingBuffer(
+            capacity_seconds=30.0,
+            sample_rate=self.samplerate,
+            frame_size=self.frame_size,
+            dtype=np.int16
+        )
+        audio_channel = AudioChannel(audio_ring, max_backlog_seconds=2.0)
         recording = False
-        audio_chunks = []
+        speech_start = 0
+        recorded_frames = 0
         silence_count = 0
         max_silence = 30  # frames of silence before stopping
         
         def audio_callback(indata, frame_count, time_info, status):
             """Audio input callback."""
-            loop.call_soon_threadsafe(audio_queue.put_nowait, indata.copy())
+            audio_channel.publish(indata[:, 0])
             
         # Start audio stream
         stream = sd.InputStream(
@@ -409,42 +420,53 @@ class AdvancedVoiceEngine:
         try:
             with stream:
                 while True:
-                    chunk = await audio_queue.get()
+                    chunk = await audio_channel.get_frame()
+                    if chunk is None:
+                        break
                     
                     # Check for voice activity
-                    has_voice = self.detect_voice_activity(chunk.flatten())
+                    has_voice = self.detect_voice_activity(chunk)
                     
                     if has_voice:
                         if not recording:
                             print("🔴 Voice detected - recording...")
                             recording = True
-                            audio_chunks = []
+                            speech_start = audio_ring.read_position - self.frame_size
+                            recorded_frames = 0
                             
-                        audio_chunks.append(chunk.flatten())
+                        recorded_frames += 1
                         silence_count = 0
                         
-                    elif recording:
+                    elif not recording:
+                        # Background between utterances refines the noise profile
+                        self.preprocessor.update_noise(chunk)
+                        
+                    else:
                         silence_count += 1
-                        audio_chunks.append(chunk.flatten())
+                        recorded_frames += 1
                         
                         if silence_count >= max_silence:
                             print("⏹️ Silence detected - processing...")
                             break
                             
                     # Prevent infinite recording
-                    if len(audio_chunks) > 500:  # ~15 seconds max
+                    if recorded_frames > 500:  # ~15 seconds max
                         print("⏰ Max recording time reached")
                         break
                         
         except Exception as e:
             self.logger.error(f"Recording error: {e}")
             return ""
+        finally:
+            audio_channel.close()
             
-        if not audio_chunks:
+        if not recording:
             return ""
             
-        # Combine all audio chunks
-        full_audio = np.concatenate(audio_chunks)
+        # Slice the whole utterance out of the ring buffer
+        full_audio = audio_ring.slice(speech_start, audio_ring.read_position)
+        if full_audio is None:
+            return ""
         
         # Transcribe using advanced engine
         result = await self.advanced_transcribe(full_audio)
@@ -13,9 +13,12 @@ import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Callable
-import queue
 import logging
 
+from audio_channel import AudioChannel
+from streaming_transcription import PartialHypothesisTracker
+from voice_activity import VoiceActivityDetector
+
 class AdvancedVoiceSystem:
     """Advanced multi-engine voice recognition with AI optimization"""
     
@@ -50,12 +53,24 @@ class AdvancedVoiceSystem:
         self.command_patterns = {}
         self.recognition_history = []
         
-        # Audio processing queue
-        self.audio_queue = queue.Queue()
+        # Audio capture ring buffer (created once audio parameters are known)
+        self.audio_ring = None
+        self.audio_channel = None
+        self.voice_activity = None
         self.processing_active = False
         
+        # Streaming transcription (partial hypotheses while the user is still speaking)
+        self.streaming_mode = False
+        self.partial_interval = 0.5  # seconds of new audio between partial hypotheses
+        self.early_action_confidence = 0.85
+        self.partial_tracker = PartialHypothesisTracker(agreement=2)
+        self._partial_task = None
+        self._early_result = None
+        self._early_dispatch_task = None  # Runs on its own; the endpoint never cancels it
+        
         # Callbacks
         self.on_command_recognized = None
+        self.on_partial_result = None
         self.on_speech_start = None
         self.on_speech_end = None
         self.on_error = None
@@ -160,6 +175,7 @@ class AdvancedVoiceSystem:
         try:
             import pyaudio
             import sounddevice as sd
+            from audio_ring_buffer import AudioRingBuffer
             
             # Get audio devices
             devices = sd.query_devices()
@@ -178,6 +194,20 @@ class AdvancedVoiceSystem:
                 'device': default_device
             }
             
+            # Preallocated capture buffer - the callback never allocates per block
+            self.audio_ring = AudioRingBuffer(
+                capacity_seconds=30.0,
+                sample_rate=self.audio_params['sample_rate'],
+                frame_size=self.audio_params['blocksize']
+            )
+            
+            # Shared VAD state across the recognition loop and speech collection
+            self.voice_activity = VoiceActivityDetector(
+                sample_rate=self.audio_params['sample_rate'],
+                frame_ms=32,
+                min_speech_db=-30.0  # mean energy ~0.001
+            )
+            
             print("✅ Audio system initialized")
             return True
             
@@ -192,13 +222,7 @@ class AdvancedVoiceSystem:
         
         # Voice Activity Detection
         if self.voice_activity_detection:
-            try:
-                import webrtcvad
-                self.vad = webrtcvad.Vad(2)  # Aggressiveness level 0-3
-                print("✅ Voice Activity Detection enabled")
-            except ImportError:
-                print("⚠️ Voice Activity Detection unavailable (pip install webrtcvad)")
-                self.voice_activity_detection = False
+            print("✅ Voice Activity Detection enabled (adaptive noise floor)")
         
         # Noise reduction setup
         if self.noise_reduction:
@@ -287,6 +311,10 @@ class AdvancedVoiceSystem:
         
         self.processing_active = True
         
+        # Event-driven handoff from the capture thread to the recognition loop
+        if self.audio_ring is not None:
+            self.audio_channel = AudioChannel(self.audio_ring, max_backlog_seconds=2.0)
+        
         # Start processing tasks
         asyncio.create_task(self.audio_input_loop())
         asyncio.create_task(self.voice_recognition_loop())
@@ -302,9 +330,9 @@ class AdvancedVoiceSystem:
                 if status:
                     print(f"Audio input status: {status}")
                 
-                # Add audio data to queue for processing
+                # Hand audio to the recognition loop
                 if self.processing_active:
-                    self.audio_queue.put(indata.copy())
+                    self.audio_channel.publish(indata[:, 0])
             
             # Start audio stream
             with sd.InputStream(
@@ -312,8 +340,7 @@ class AdvancedVoiceSystem:
                 **self.audio_params
             ):
                 print("🎤 Audio input stream active")
-                while self.processing_active:
-                    await asyncio.sleep(0.1)
+                await self.audio_channel.wait_closed()
                     
         except Exception as e:
             print(f"❌ Audio input error: {e}")
@@ -322,33 +349,43 @@ class AdvancedVoiceSystem:
     
     async def voice_recognition_loop(self):
         """Continuous voice recognition processing"""
+        if self.audio_channel is None:
+            return
+        
         while self.processing_active:
             try:
-                # Check for audio data
-                if not self.audio_queue.empty():
-                    audio_data = self.audio_queue.get()
-                    
-                    # Process audio for voice activity
-                    if self.detect_voice_activity(audio_data):
-                        # Trigger speech start callback
-                        if self.on_speech_start:
-                            await self.on_speech_start()
-                        
-                        # Collect audio for recognition
-                        speech_audio = await self.collect_speech_audio(audio_data)
-                        
-                        # Perform recognition
-                        result = await self.recognize_speech(speech_audio)
-                        
-                        if result and result['confidence'] > self.confidence_threshold:
-                            # Process recognized command
-                            await self.process_recognized_command(result)
-                        
-                        # Trigger speech end callback
-                        if self.on_speech_end:
-                            await self.on_speech_end()
+                # Wait for audio data without polling
+                audio_data = await self.audio_channel.get_frame()
+                if audio_data is None:
+                    break  # Channel closed
                 
-                await asyncio.sleep(0.01)  # Small delay to prevent excessive CPU usage
+                # Process audio for voice activity
+                if self.detect_voice_activity(audio_data):
+                    # Trigger speech start callback
+                    if self.on_speech_start:
+                        await self.on_speech_start()
+                    
+                    # Collect audio for recognition
+                    speech_audio = await self.collect_speech_audio(audio_data)
+                    
+                    # Perform recognition
+                    result = await self.recognize_speech(speech_audio)
+                    
+                    if result and self.streaming_mode:
+                        # Commit the endpoint result over any partials
+                        final = self.partial_tracker.finalize(result['text'], result['confidence'])
+                        final['engine'] = result['engine']
+                        if self.on_partial_result:
+                            await self.on_partial_result(final)
+                    
+                    if (result and result['confidence'] > self.confidence_threshold
+                            and not self._was_handled_early(result)):
+                        # Process recognized command
+                        await self.process_recognized_command(result)
+                    
+                    # Trigger speech end callback
+                    if self.on_speech_end:
+                        await self.on_speech_end()
                 
             except Exception as e:
                 print(f"❌ Voice recognition error: {e}")
@@ -358,47 +395,118 @@ class AdvancedVoiceSystem:
     
     def detect_voice_activity(self, audio_data) -> bool:
         """Detect if audio contains voice activity"""
-        if not self.voice_activity_detection:
+        if not self.voice_activity_detection or self.voice_activity is None:
             return True  # Always process if VAD is disabled
         
         try:
-            # Simple energy-based VAD
-            import numpy as np
-            
-            # Calculate audio energy
-            energy = np.sum(audio_data ** 2) / len(audio_data)
-            
-            # Threshold for voice activity (tunable)
-            energy_threshold = 0.001
-            
-            return energy > energy_threshold
+            return self.voice_activity.is_speech(audio_data)
             
         except Exception:
             return True  # Default to processing if VAD fails
     
     async def collect_speech_audio(self, initial_audio):
         """Collect complete speech audio for recognition"""
-        speech_chunks = [initial_audio]
+        ring = self.audio_ring
+        speech_start = ring.read_position - len(initial_audio)
+        speech_end = ring.read_position
+        frame_duration = ring.frame_size / ring.sample_rate
         silence_duration = 0
         max_silence = 1.0  # seconds
         
+        # Streaming mode: transcribe the growing window every partial_interval
+        partial_step = int(self.partial_interval * ring.sample_rate)
+        next_partial = speech_start + partial_step
+        # Cleared every utterance - a stale early command must not suppress later finals
+        self._early_result = None
+        if self.streaming_mode:
+            self.partial_tracker.reset()
+        
         while silence_duration < max_silence:
-            try:
-                # Get next audio chunk (with timeout)
-                audio_chunk = self.audio_queue.get(timeout=0.1)
-                
-                if self.detect_voice_activity(audio_chunk):
-                    speech_chunks.append(audio_chunk)
-                    silence_duration = 0
-                else:
-                    silence_duration += 0.1
-                    
-            except queue.Empty:
-                silence_duration += 0.1
+            # Wait for the next frame without blocking the event loop
+            audio_chunk = await self.audio_channel.get_frame(timeout=max_silence - silence_duration)
+            
+            if audio_chunk is None:
+                break  # No audio arrived within the silence window, or channel closed
+            
+            if self.detect_voice_activity(audio_chunk):
+                speech_end = ring.read_position
+                silence_duration = 0
+            else:
+                silence_duration += frame_duration
+            
+            if self.streaming_mode and ring.read_position >= next_partial:
+                next_partial = ring.read_position + partial_step
+                self.schedule_partial_transcription(ring.slice(speech_start, speech_end))
+        
+        # Endpoint reached - stop any partial still in flight
+        if self._partial_task and not self._partial_task.done():
+            self._partial_task.cancel()
+        
+        # Slice the whole utterance out of the ring in one go
+        speech_audio = ring.slice(speech_start, speech_end)
+        return speech_audio if speech_audio is not None else initial_audio
+    
+    def schedule_partial_transcription(self, window_audio):
+        """Start a partial transcription unless one is already running"""
+        if window_audio is None or (self._partial_task and not self._partial_task.done()):
+            return  # Skip rather than queue - only the newest window matters
+        self._partial_task = asyncio.create_task(self.transcribe_partial(window_audio.copy()))
+    
+    async def transcribe_partial(self, window_audio):
+        """Transcribe the current window and emit a partial hypothesis"""
+        try:
+            result = await self.recognize_with_engine(self.current_engine, window_audio)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return  # Partials are best effort; the final pass reports errors
         
-        # Combine all speech chunks
-        import numpy as np
-        return np.concatenate(speech_chunks)
+        if not result or not result['text'].strip():
+            return
+        
+        partial = self.partial_tracker.update(result['text'], result['confidence'])
+        partial['engine'] = result['engine']
+        
+        if self.on_partial_result:
+            await self.on_partial_result(partial)
+        
+        # Act early on a confident, stable command instead of waiting for the endpoint
+        if (self._early_result is None and partial['is_stable']
+                and partial['confidence'] >= self.early_action_confidence
+                and self.categorize_command(partial['text'].lower()) != 'general'):
+            self._early_result = {
+                'text': partial['text'],
+                'confidence': partial['confidence'],
+                'engine': partial['engine'],
+                'partial': True
+            }
+            # Not awaited here: cancelling this partial at the endpoint must not cut the handler short
+            self._early_dispatch_task = asyncio.create_task(self.dispatch_early_command(dict(self._early_result)))
+    
+    async def dispatch_early_command(self, result: Dict[str, Any]):
+        """Run a command recognized from a stable partial"""
+        try:
+            await self.process_recognized_command(result)
+        except Exception as e:
+            print(f"❌ Early command error: {e}")
+            if self.on_error:
+                await self.on_error(f"Early command error: {e}")
+    
+    def _was_handled_early(self, result: Dict[str, Any]) -> bool:
+        """Check whether a confident partial already dispatched this command.
+        
+        The final counts as handled only when it repeats or extends the dispatched text
+        ("stop the music" -> "stop the music now"); a corrected final runs as usual.
+        """
+        if not self._early_result:
+            return False
+        
+        def normalize(text: str) -> str:
+            return ' '.join(text.lower().strip(' .!?').split())
+        
+        final_text = normalize(result['text'])
+        early_text = normalize(self._early_result['text'])
+        return final_text == early_text or final_text.startswith(early_text + ' ')
     
     async def recognize_speech(self, audio_data) -> Optional[Dict[str, Any]]:
         """Recognize speech using current engine with fallbacks"""
@@ -443,18 +551,14 @@ class AdvancedVoiceSystem:
     async def recognize_whisper(self, audio_data) -> Optional[Dict[str, Any]]:
         """Whisper speech recognition"""
         try:
-            import whisper
             import numpy as np
-            
-            # Load model if not already loaded
-            if not hasattr(self, '_whisper_model'):
-                self._whisper_model = whisper.load_model("base")
+            from stt_worker_pool import get_stt_pool
             
             # Prepare audio for Whisper
             audio_np = np.array(audio_data, dtype=np.float32).flatten()
             
-            # Transcribe
-            result = self._whisper_model.transcribe(audio_np)
+            # Transcribe on the shared worker pool (model is preloaded per worker)
+            result = await get_stt_pool("base").transcribe(audio_np)
             
             return {
                 'text': result['text'].strip(),
@@ -702,6 +806,8 @@ class AdvancedVoiceSystem:
         """Stop voice processing"""
         print("🛑 Stopping voice processing...")
         self.processing_active = False
+        if self.audio_channel is not None:
+            self.audio_channel.close()
     
     def generate_voice_report(self) -> str:
         """Generate comprehensive voice system report"""
@@ -725,6 +831,7 @@ class AdvancedVoiceSystem:
             f"🎚️ Confidence Threshold: {self.confidence_threshold}",
             f"🎤 Voice Activity Detection: {'ON' if self.voice_activity_detection else 'OFF'}",
             f"🔇 Noise Reduction: {'ON' if self.noise_reduction else 'OFF'}",
+            f"📝 Streaming Transcription: {'ON' if self.streaming_mode else 'OFF'}",
             "",
             f"📊 Recognition History: {len(self.recognition_history)} entries",
             f"🧠 AI Learning: {'ENABLED' if self.ai_learning_enabled else 'DISABLED'}",
@@ -747,6 +854,10 @@ async def main():
     async def on_command_recognized(result):
         print(f"📢 Command: '{result['text']}' (confidence: {result['confidence']:.2f})")
     
+    async def on_partial_result(partial):
+        marker = "✅" if partial['is_final'] else "…"
+        print(f"📝 {marker} {partial['stable_text']} [{partial['unstable_text']}]")
+    
     async def on_speech_start():
         print("🎤 Speech started...")
     
@@ -757,6 +868,7 @@ async def main():
         print(f"❌ Voice system error: {error}")
     
     voice_system.on_command_recognized = on_command_recognized
+    voice_system.on_partial_result = on_partial_result
     voice_system.on_speech_start = on_speech_start
     voice_system.on_speech_end = on_speech_end
     voice_system.on_error = on_error
@@ -6,6 +6,8 @@ Implementing real-time communication between all AI agents with shared memory
 
 import asyncio
 import json
+import os
+import sys
 import time
 import threading
 from datetime import datetime
@@ -15,6 +17,12 @@ import queue
 import sqlite3
 from pathlib import Path
 
+from sqlite_writer import BackgroundSQLiteWriter, close_at_exit, connect
+from ttl_cache import ABSENT, MISSING, TTLCache
+
+# How shared memory reaches disk: "sync", "batched" or "memory"
+SHARED_MEMORY_DURABILITY = os.getenv('GEM_SHARED_MEMORY_DURABILITY', 'batched')
+
 @dataclass
 class AIMessage:
     """Message structure for AI agent communication"""
@@ -27,26 +35,82 @@ class AIMessage:
     requires_response: bool = False
 
 class SharedMemorySystem:
-    """Shared memory system for all AI agents"""
+    """Shared memory system for all AI agents
+    
+    ``durability`` picks how ``store`` reaches disk, always over one persistent connection:
+    
+    - ``sync``: written and committed (fully synced) before ``store`` returns
+    - ``batched``: write-behind; repeated keys coalesce in memory and the latest value of
+      each is written in one transaction every ``flush_interval`` seconds (or as soon as
+      ``max_pending`` keys are waiting). A crash loses at most one interval.
+    - ``memory``: never written; shared memory lives as long as the process (and only
+      the ``cache_entries`` most recently used keys)
     
-    def __init__(self):
-        self.db_path = Path("./data/ai_shared_memory.db")
+    Reads go through ``memory_cache['shared_data']``, a ``TTLCache`` bounded to
+    ``cache_entries`` keys / ``cache_bytes`` of serialized values that honours each key's
+    ``expires_in``. Keys found in neither tier are remembered as missing for
+    ``negative_ttl`` seconds. ``store`` and ``delete`` update both tiers together.
+    """
+    
+    DURABILITY_MODES = ('sync', 'batched', 'memory')
+    
+    def __init__(self, db_path: Optional[Path] = None, durability: str = SHARED_MEMORY_DURABILITY,
+                 flush_interval: float = 0.5, max_pending: int = 1000, cache_entries: int = 4096,
+                 cache_bytes: int = 16 * 1024 * 1024, negative_ttl: float = 5.0):
+        if durability not in self.DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.db_path = Path(db_path or "./data/ai_shared_memory.db")
         self.db_path.parent.mkdir(exist_ok=True)
-        self._init_database()
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        
+        self._lock = threading.RLock()
+        self._pending: Dict[str, tuple] = {}  # Latest row per key, waiting for the next flush
+        self._flushing: Dict[str, tuple] = {}  # Handed to the writer, not yet committed
+        # Separate from _lock: the writer thread releases committed rows while a flush may
+        # hold _lock waiting for room in the writer's queue
+        self._flushing_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._closed = False
+        self.write_metrics = {
+            'stores': 0,
+            'coalesced': 0,
+            'rows_written': 0,
+            'flushes': 0
+        }
+        
+        # Sync mode commits on the caller's thread, batched mode on the writer thread
+        self._conn = None
+        self.writer = None
+        self._reader = None
+        if durability == 'sync':
+            self._conn = connect(str(self.db_path))
+            self._conn.execute("PRAGMA synchronous=FULL")
+        elif durability == 'batched':
+            self.writer = BackgroundSQLiteWriter(str(self.db_path), name="shared-memory-writer")
+        if durability != 'memory':
+            self._reader = connect(str(self.db_path))
+            self._init_database()
+        
+        if durability == 'batched':
+            self._flusher = threading.Thread(target=self._flush_loop, name="shared-memory-flusher", daemon=True)
+            self._flusher.start()
+        close_at_exit(self)
         
         # In-memory cache for fast access
         self.memory_cache = {
             'user_context': {},
             'system_state': {},
             'agent_status': {},
-            'shared_data': {},
+            'shared_data': TTLCache(max_entries=cache_entries, max_bytes=cache_bytes, negative_ttl=negative_ttl),
             'conversation_history': [],
             'emergency_data': {}
         }
         
     def _init_database(self):
         """Initialize SQLite database for persistent shared memory"""
-        with sqlite3.connect(self.db_path) as conn:
+        def create(conn):
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS shared_memory (
                     key TEXT PRIMARY KEY,
@@ -70,49 +134,175 @@ class SharedMemorySystem:
                 )
             """)
             
+        self._on_connection(create)
+        
+    def _on_connection(self, function):
+        """Run ``function(conn)`` on the write connection and commit"""
+        if self._conn is not None:
+            with self._lock:
+                result = function(self._conn)
+                self._conn.commit()
+                return result
+        return self.writer.submit(function).result()
+        
+    def _write(self, sql: str, params: tuple):
+        """A single write, honouring the durability mode"""
+        if self.durability == 'memory' or self._closed:
+            return
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute(sql, params)
+                self._conn.commit()
+        else:
+            self.writer.execute(sql, params)
+            
     def store(self, key: str, value: Any, agent: str, expires_in: Optional[int] = None):
         """Store data in shared memory"""
-        expires_at = time.time() + expires_in if expires_in else None
+        now = time.time()
+        expires_at = now + expires_in if expires_in else None
+        self.write_metrics['stores'] += 1
         
-        # Update cache
-        self.memory_cache['shared_data'][key] = {
-            'value': value,
-            'agent': agent,
-            'timestamp': time.time()
-        }
+        # Update cache (replaces a negative entry for this key too)
+        serialized = json.dumps(value)
+        self.memory_cache['shared_data'].put(key, value, ttl=expires_in or None, size=len(serialized))
         
         # Persist to database
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        row = (key, serialized, agent, now, expires_at)
+        if self.durability == 'batched':
+            with self._lock:
+                if key in self._pending:
+                    self.write_metrics['coalesced'] += 1
+                self._pending[key] = row
+                if len(self._pending) >= self.max_pending:
+                    self._flush_requested.set()
+        else:
+            self._write("""
+                INSERT OR REPLACE INTO shared_memory 
+                (key, value, agent_owner, timestamp, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, row)
+            
+    def _flush_loop(self):
+        while not self._closed:
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush(wait=False)
+            
+    def flush(self, wait: bool = True):
+        """Write every pending key in one transaction (``wait`` blocks until it is committed)"""
+        if self.writer is None:
+            return
+        def write(conn):
+            conn.executemany("""
                 INSERT OR REPLACE INTO shared_memory 
                 (key, value, agent_owner, timestamp, expires_at)
                 VALUES (?, ?, ?, ?, ?)
-            """, (key, json.dumps(value), agent, time.time(), expires_at))
+            """, rows)
+            
+        # Queued under the lock so a concurrent delete() can't be overtaken by this batch
+        with self._lock:
+            batch = self._pending
+            rows = list(batch.values())
+            self._pending = {}
+            done = None
+            if rows:
+                # Readers keep seeing the batch until it is committed
+                with self._flushing_lock:
+                    self._flushing.update(batch)
+                done = self.writer.submit(write)
+                done.add_done_callback(lambda _: self._committed(batch))
+        if rows:
+            self.write_metrics['rows_written'] += len(rows)
+            self.write_metrics['flushes'] += 1
+            if wait:
+                done.result()
+        elif wait:
+            self.writer.flush()
+            
+    def _committed(self, batch: Dict[str, tuple]):
+        """Stop serving a flushed batch from memory (runs on the writer thread)"""
+        with self._flushing_lock:
+            for key, row in batch.items():
+                if self._flushing.get(key) is row:
+                    self._flushing.pop(key, None)
+            
+    def log_message(self, from_agent: str, to_agent: str, message_type: str, content: str, priority: int):
+        """Persist an agent message"""
+        self._write("""
+            INSERT INTO agent_messages 
+            (from_agent, to_agent, message_type, content, timestamp, priority)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (from_agent, to_agent, message_type, content, time.time(), priority))
+        
+    def delete(self, key: str):
+        """Remove a key from both tiers (including a write still waiting to be flushed)"""
+        self.memory_cache['shared_data'].invalidate(key)
+        with self._lock:
+            self._pending.pop(key, None)
+            with self._flushing_lock:
+                self._flushing.pop(key, None)
+            self._write("DELETE FROM shared_memory WHERE key = ?", (key,))
+        
+    def purge_expired(self):
+        """Remove expired entries"""
+        self.memory_cache['shared_data'].expire()
+        self._write("""
+            DELETE FROM shared_memory 
+            WHERE expires_at IS NOT NULL AND expires_at < ?
+        """, (time.time(),))
+        
+    def close(self):
+        """Flush pending writes and close the connections"""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_requested.set()
+        if self.durability == 'batched':
+            # Stop the flusher first so its last batch can't reach the writer after close
+            self._flusher.join()
+            self.flush()
+        if self.writer is not None:
+            self.writer.close()
+        if self._conn is not None:
+            self._conn.close()
+        if self._reader is not None:
+            self._reader.close()
+        
+    def get_write_metrics(self) -> Dict[str, Any]:
+        """Get write-behind metrics"""
+        metrics = dict(self.write_metrics, durability=self.durability, pending=len(self._pending))
+        if self.writer is not None:
+            metrics['writer'] = self.writer.get_metrics()
+        return metrics
             
     def retrieve(self, key: str) -> Optional[Any]:
         """Retrieve data from shared memory"""
         # Check cache first
-        if key in self.memory_cache['shared_data']:
-            return self.memory_cache['shared_data'][key]['value']
+        cache = self.memory_cache['shared_data']
+        value = cache.get(key)
+        if value is ABSENT:
+            return None
+        if value is not MISSING:
+            return value
             
-        # Check database
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT value FROM shared_memory 
+        # A write still waiting for (or in) a flush, then the database
+        now = time.time()
+        with self._lock:
+            result = self._pending.get(key) or self._flushing.get(key)
+        if result is None and self._reader is not None:
+            result = self._reader.execute("""
+                SELECT key, value, agent_owner, timestamp, expires_at FROM shared_memory 
                 WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)
-            """, (key, time.time()))
+            """, (key, now)).fetchone()
             
-            result = cursor.fetchone()
-            if result:
-                value = json.loads(result[0])
-                # Update cache
-                self.memory_cache['shared_data'][key] = {
-                    'value': value,
-                    'timestamp': time.time()
-                }
-                return value
-                
-        return None
+        if result is None or (result[4] is not None and result[4] <= now):
+            cache.put_negative(key)
+            return None
+            
+        value = json.loads(result[1])
+        # Update cache for the rest of the key's lifetime
+        cache.put(key, value, ttl=result[4] - now if result[4] is not None else None, size=len(result[1]))
+        return value
         
     def update_agent_status(self, agent: str, status: Dict[str, Any]):
         """Update agent status in shared memory"""
@@ -125,12 +315,16 @@ class SharedMemorySystem:
     def get_all_agent_status(self) -> Dict[str, Any]:
         """Get status of all agents"""
         return self.memory_cache['agent_status']
+        
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Get hit rate and memory footprint of the in-memory tier"""
+        return self.memory_cache['shared_data'].get_metrics()
 
 class RealTimeCommunicationHub:
     """Real-time communication hub for all AI agents"""
     
-    def __init__(self):
-        self.shared_memory = SharedMemorySystem()
+    def __init__(self, shared_memory: Optional[SharedMemorySystem] = None):
+        self.shared_memory = shared_memory or SharedMemorySystem()
         self.message_queues = {
             'amazon_q': asyncio.Queue(),
             'claude': asyncio.Queue(),
@@ -163,23 +357,16 @@ class RealTimeCommunicationHub:
     async def send_message(self, message: AIMessage):
         """Send message between AI agents"""
         # Store in database for persistence
-        with sqlite3.connect(self.shared_memory.db_path) as conn:
-            # Convert message to dict and handle datetime serialization
-            message_dict = asdict(message)
-            message_dict['timestamp'] = message.timestamp.isoformat()
-            
-            conn.execute("""
-                INSERT INTO agent_messages 
-                (from_agent, to_agent, message_type, content, timestamp, priority)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                message.from_agent,
-                message.to_agent,
-                message.message_type,
-                json.dumps(message_dict),
-                time.time(),
-                message.priority
-            ))
+        # Convert message to dict and handle datetime serialization
+        message_dict = asdict(message)
+        message_dict['timestamp'] = message.timestamp.isoformat()
+        self.shared_memory.log_message(
+            message.from_agent,
+            message.to_agent,
+            message.message_type,
+            json.dumps(message_dict),
+            message.priority
+        )
             
         # Route to appropriate queue
         if message.to_agent == "ALL":
@@ -246,13 +433,9 @@ class RealTimeCommunicationHub:
         """Clean up expired data from shared memory"""
         while self.running:
             try:
-                with sqlite3.connect(self.shared_memory.db_path) as conn:
-                    # Remove expired entries
-                    conn.execute("""
-                        DELETE FROM shared_memory 
-                        WHERE expires_at IS NOT NULL AND expires_at < ?
-                    """, (time.time(),))
-                    
+                # Remove expired entries
+                self.shared_memory.purge_expired()
+                
                 await asyncio.sleep(60)  # Cleanup every minute
                 
             except Exception as e:
@@ -391,5 +574,108 @@ async def main():
     # Stop the hub
     comm_hub.running = False
 
+class _ConnectPerCallMemory(SharedMemorySystem):
+    """The previous write path, for comparison: a new connection and commit per write"""
+    
+    def __init__(self, db_path: Path):
+        super().__init__(db_path, durability='memory')
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS shared_memory (key TEXT PRIMARY KEY, value TEXT, "
+                         "agent_owner TEXT, timestamp REAL, expires_at REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS agent_messages (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "from_agent TEXT, to_agent TEXT, message_type TEXT, content TEXT, timestamp REAL, "
+                         "priority INTEGER, processed BOOLEAN DEFAULT FALSE)")
+            
+    def _connect_and_write(self, sql: str, params: tuple):
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute(sql, params)
+        conn.close()
+        
+    def store(self, key: str, value: Any, agent: str, expires_in: Optional[int] = None):
+        super().store(key, value, agent, expires_in)
+        self._connect_and_write("INSERT OR REPLACE INTO shared_memory (key, value, agent_owner, timestamp, expires_at) "
+                                "VALUES (?, ?, ?, ?, ?)", (key, json.dumps(value), agent, time.time(), None))
+        
+    def _committed(self, batch: Dict[str, tuple]):
+        """Stop serving a flushed batch from memory (runs on the writer thread)"""
+        with self._flushing_lock:
+            for key, row in batch.items():
+                if self._flushing.get(key) is row:
+                    self._flushing.pop(key, None)
+            
+    def log_message(self, from_agent: str, to_agent: str, message_type: str, content: str, priority: int):
+        self._connect_and_write("INSERT INTO agent_messages (from_agent, to_agent, message_type, content, timestamp, "
+                                "priority) VALUES (?, ?, ?, ?, ?, ?)",
+                                (from_agent, to_agent, message_type, content, time.time(), priority))
+        
+async def hub_benchmark(messages: int = 1000):
+    """Messages per second through a loaded hub for each shared-memory write path"""
+    import contextlib
+    import io
+    import tempfile
+    
+    agents = ['amazon_q', 'claude', 'gemini', 'tabnine', 'copilot', 'cursor']
+    
+    async def run(shared_memory: SharedMemorySystem) -> float:
+        processed = 0
+        done = asyncio.Event()
+        
+        async def handler(message: AIMessage):
+            # Agents keep working state in shared memory, like handle_data_share
+            nonlocal processed
+            shared_memory.store(f"progress_{message.content['task'] % 20}", message.content, message.to_agent)
+            processed += 1
+            if processed == messages:
+                done.set()
+                
+        with contextlib.redirect_stdout(io.StringIO()):
+            hub = RealTimeCommunicationHub(shared_memory)
+            for agent in agents:
+                await hub.register_agent(agent, handler)
+            hub_task = asyncio.create_task(hub.start_communication_hub())
+            start_time = time.perf_counter()
+            for number in range(messages):
+                await hub.send_message(AIMessage(
+                    from_agent='broadcast',
+                    to_agent=agents[number % len(agents)],
+                    message_type='task',
+                    content={'task': number},
+                    timestamp=datetime.now()
+                ))
+            await done.wait()
+            elapsed = time.perf_counter() - start_time
+            hub.running = False
+            hub_task.cancel()
+        return messages / elapsed
+        
+    print("🔧 AI Team shared memory write benchmark")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = _ConnectPerCallMemory(Path(directory) / 'legacy.db')
+        baseline = await run(legacy)
+        print(f"🐢 connection per write: {baseline:,.0f} messages/s")
+        legacy.close()
+        
+        for durability in SharedMemorySystem.DURABILITY_MODES:
+            shared_memory = SharedMemorySystem(Path(directory) / f'{durability}.db', durability=durability)
+            rate = await run(shared_memory)
+            shared_memory.close()
+            metrics = shared_memory.get_write_metrics()
+            detail = ""
+            if durability == 'batched':
+                detail = (f" | {metrics['stores']:,} stores -> {metrics['rows_written']:,} rows in "
+                          f"{metrics['flushes']} transactions ({metrics['coalesced']:,} coalesced)")
+            cache = shared_memory.get_cache_metrics()
+            print(f"🚀 {durability}: {rate:,.0f} messages/s ({rate / baseline:.1f}x){detail}")
+            print(f"   cache: hit rate {cache['hit_rate'] * 100:.0f}% ({cache['negative_hits']:,} negative) | "
+                  f"{cache['entries']} keys, {cache['bytes']:,} bytes")
+            
+        # Batched writes survive a clean shutdown
+        conn = sqlite3.connect(Path(directory) / 'batched.db')
+        rows = conn.execute("SELECT COUNT(*) FROM shared_memory").fetchone()[0]
+        conn.close()
+        print(f"💾 Keys on disk after closing the batched store: {rows}")
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(hub_benchmark() if '--benchmark' in sys.argv else main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+🏁 GEM OS - Speculative ASR Ensemble Scheduling
+Launches the speech engines worth launching, returns as soon as one result is trusted
+enough, cancels the stragglers and learns each engine's latency and accuracy as it goes.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from rover_alignment import normalize_words, word_edit_distance
+
+EngineCall = Callable[..., Awaitable[Tuple[str, float]]]
+
+# Per-request accuracy/latency trade-offs: (confidence threshold, deadline seconds, max engines)
+QUALITY_PRESETS = {
+    'fast': (0.7, 2.0, 2),
+    'balanced': (0.8, 5.0, 3),
+    'accurate': (None, 15.0, None),  # No early exit - wait for every engine
+}
+
+
+@dataclass
+class EngineStats:
+    """Running latency/accuracy statistics for one engine"""
+    accuracy: float
+    latencies: deque = field(default_factory=lambda: deque(maxlen=50))
+    launched: int = 0
+    completed: int = 0
+    empty: int = 0
+    cancelled: int = 0
+    early_exits: int = 0
+    last_agreement: Optional[float] = None  # From the last decision with other engines to check against
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+    def to_dict(self) -> Dict:
+        return {
+            'accuracy': round(self.accuracy, 3),
+            'p50_latency': self.latency_percentile(0.5),
+            'p95_latency': self.latency_percentile(0.95),
+            'launched': self.launched,
+            'completed': self.completed,
+            'empty': self.empty,
+            'cancelled': self.cancelled,
+            'early_exits': self.early_exits,
+            'last_agreement': self.last_agreement
+        }
+
+
+@dataclass
+class EnsembleOutcome:
+    """What finished before the scheduler stopped waiting"""
+    results: List[Tuple[str, float, str]]
+    early_exit: Optional[str]
+    launched: List[str]
+    cancelled: List[str]
+    elapsed: float
+
+
+class EnsembleScheduler:
+    """Early-exit scheduler over async ASR engines returning ``(text, confidence)``.
+
+    An engine's result ends the race when ``confidence * accuracy`` clears the
+    request's threshold. Accuracy is learned from agreement with the final ensemble
+    decision, latency from completed runs; both decide which engines get launched.
+    """
+
+    def __init__(self, engines: Dict[str, EngineCall], prior_accuracy: Optional[Dict[str, float]] = None,
+                 accuracy_adapt_rate: float = 0.1, min_samples: int = 5):
+        self.engines = engines
+        prior_accuracy = prior_accuracy or {}
+        self.stats = {name: EngineStats(accuracy=prior_accuracy.get(name, 0.8)) for name in engines}
+        self.accuracy_adapt_rate = accuracy_adapt_rate
+        self.min_samples = min_samples
+
+    def select_engines(self, deadline: float, max_engines: Optional[int] = None) -> List[str]:
+        """Rank engines by expected accuracy per second, dropping those that can't meet the deadline"""
+        ranked = []
+        for name, stats in self.stats.items():
+            p50 = stats.latency_percentile(0.5)
+            known = len(stats.latencies) >= self.min_samples
+            if known and p50 > deadline:
+                continue
+            ranked.append((stats.accuracy / max(p50 if known else 1.0, 0.05), name))
+        ranked.sort(reverse=True)
+        selected = [name for _, name in ranked]
+        if not selected and self.stats:
+            # Nothing is expected to make it - still try the historically fastest engine
+            selected = [min(self.stats, key=lambda name: self.stats[name].latency_percentile(0.5) or 0.0)]
+        return selected[:max_engines] if max_engines else selected
+
+    async def run(self, audio, quality: str = 'balanced', confidence_threshold: Optional[float] = None,
+                  deadline: Optional[float] = None, max_engines: Optional[int] = None) -> EnsembleOutcome:
+        """Race the selected engines on ``audio`` under the request's quality settings"""
+        preset_threshold, preset_deadline, preset_max = QUALITY_PRESETS.get(quality, QUALITY_PRESETS['balanced'])
+        threshold = preset_threshold if confidence_threshold is None else confidence_threshold
+        deadline = preset_deadline if deadline is None else deadline
+        max_engines = preset_max if max_engines is None else max_engines
+
+        start_time = time.time()
+        launched = self.select_engines(deadline, max_engines)
+        pending = {}
+        for name in launched:
+            self.stats[name].launched += 1
+            task = asyncio.create_task(self.engines[name](audio), name=name)
+            pending[task] = time.time()
+
+        results = []
+        early_exit = None
+        try:
+            while pending:
+                remaining = deadline - (time.time() - start_time)
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=remaining,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    launched_at = pending.pop(task)
+                    name = task.get_name()
+                    stats = self.stats[name]
+                    if task.cancelled() or task.exception() is not None:
+                        stats.empty += 1
+                        continue
+                    text, confidence = task.result()
+                    stats.latencies.append(time.time() - launched_at)
+                    stats.completed += 1
+                    if not text.strip():
+                        stats.empty += 1
+                        continue
+                    results.append((text, confidence, name))
+                    if threshold is not None and early_exit is None and \
+                            confidence * stats.accuracy >= threshold:
+                        early_exit = name
+                        stats.early_exits += 1
+                if early_exit:
+                    break
+        finally:
+            # Stragglers (or everything, if we were cancelled ourselves)
+            cancelled = [task.get_name() for task in pending]
+            for task in pending:
+                task.cancel()
+                self.stats[task.get_name()].cancelled += 1
+
+        return EnsembleOutcome(results=results, early_exit=early_exit, launched=launched,
+                               cancelled=cancelled, elapsed=time.time() - start_time)
+
+    def record_decision(self, outcome: EnsembleOutcome, final_text: str):
+        """Update each engine's accuracy from its agreement with the final decision.
+
+        An engine whose own text became the decision - a lone result, or the early-exit
+        winner - can't be checked against it, so it is recorded at the agreement it reached
+        the last time it was verified against other engines - otherwise early exits would
+        freeze the weights or confirm themselves.
+        """
+        if not final_text or not outcome.results:
+            return
+        unverified = outcome.early_exit
+        if len(outcome.results) == 1:
+            unverified = outcome.results[0][2]
+        reference = normalize_words(final_text)
+        for text, _, name in outcome.results:
+            stats = self.stats[name]
+            if name == unverified:
+                if stats.last_agreement is not None:
+                    stats.accuracy += self.accuracy_adapt_rate * (stats.last_agreement - stats.accuracy)
+                continue
+            errors = word_edit_distance(reference, normalize_words(text))
+            agreement = max(0.0, 1.0 - errors / max(len(reference), 1))
+            stats.accuracy += self.accuracy_adapt_rate * (agreement - stats.accuracy)
+            stats.last_agreement = agreement
+
+    def get_stats(self) -> Dict[str, Dict]:
+        return {name: stats.to_dict() for name, stats in self.stats.items()}
+
+
+def main():
+    """Simulate gather-all against early exit with fake engines"""
+    import random
+
+    random.seed(7)
+
+    def fake_engine(latency: float, confidence: float, text: str) -> EngineCall:
+        async def transcribe(audio):
+            await asyncio.sleep(latency * random.uniform(0.8, 1.3))
+            return text, confidence
+        return transcribe
+
+    engines = {
+        'whisper': fake_engine(0.9, 0.92, "ligar a luz da sala"),
+        'google': fake_engine(0.35, 0.90, "ligar a luz da sala"),
+        'sphinx': fake_engine(0.15, 0.55, "ligar luz da sala"),
+    }
+
+    async def run():
+        print("🏁 GEM OS - ASR ensemble scheduling simulation")
+        print("=" * 50)
+
+        start_time = time.time()
+        for _ in range(10):
+            await asyncio.gather(*(engine(None) for engine in engines.values()))
+        print(f"⏳ gather-all: {(time.time() - start_time) / 10 * 1000:.0f}ms per utterance")
+
+        scheduler = EnsembleScheduler(engines, {'whisper': 0.95, 'google': 0.90, 'sphinx': 0.75})
+        for quality in ('fast', 'balanced', 'accurate'):
+            timings = []
+            for _ in range(10):
+                outcome = await scheduler.run(None, quality=quality)
+                scheduler.record_decision(outcome, "ligar a luz da sala")
+                timings.append(outcome.elapsed)
+            print(f"⚡ {quality}: {sum(timings) / len(timings) * 1000:.0f}ms per utterance "
+                  f"(last: launched {outcome.launched}, early exit {outcome.early_exit}, "
+                  f"cancelled {outcome.cancelled})")
+
+        for name, stats in scheduler.get_stats().items():
+            print(f"   {name}: accuracy {stats['accuracy']:.2f} | p50 {stats['p50_latency'] or 0:.2f}s | "
+                  f"early exits {stats['early_exits']} | cancelled {stats['cancelled']}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+📡 GEM OS - Async Audio Channel
+Event-driven handoff from the audio capture thread to asyncio coroutines.
+The capture thread writes into an AudioRingBuffer and only wakes the event loop
+(via call_soon_threadsafe) when a coroutine is actually waiting for audio.
+"""
+
+import asyncio
+from typing import Optional
+
+import numpy as np
+
+from audio_ring_buffer import AudioRingBuffer
+
+
+class AudioChannel:
+    """Thread-safe producer / asyncio consumer channel over an AudioRingBuffer.
+
+    Backpressure is bounded by ``max_backlog_seconds``: if the consumer falls
+    further behind than that, the oldest frames are dropped so recognition
+    always works on fresh audio instead of a growing backlog.
+    """
+
+    def __init__(self, ring: AudioRingBuffer, max_backlog_seconds: float = 2.0,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.ring = ring
+        self.max_backlog = max(ring.frame_size,
+                               int(max_backlog_seconds * ring.sample_rate) // ring.frame_size * ring.frame_size)
+        self._loop = loop or asyncio.get_running_loop()
+        self._waiter: Optional[asyncio.Future] = None
+        self._wakeup_pending = False
+        self._closed = False
+        self._closed_event = asyncio.Event()
+
+        self.dropped_frames = 0
+        self.wakeups = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, block):
+        """Write a block from the capture thread and wake a waiting consumer"""
+        if self._closed:
+            return
+        self.ring.write(block)
+        # Only pay for a loop wakeup when a coroutine is parked on get_frame()
+        if self._waiter is not None and not self._wakeup_pending:
+            self._wakeup_pending = True
+            self._loop.call_soon_threadsafe(self._wake)
+
+    def close(self):
+        """Stop the channel and release any waiting consumer (thread-safe)"""
+        self._closed = True
+        try:
+            self._loop.call_soon_threadsafe(self._close_on_loop)
+        except RuntimeError:
+            pass  # Loop already closed
+
+    async def wait_closed(self):
+        await self._closed_event.wait()
+
+    async def get_frame(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Wait for the next frame and return it as a view into the ring.
+
+        Returns ``None`` on timeout or once the channel is closed.
+        """
+        while True:
+            frame = self._next_frame()
+            if frame is not None or self._closed:
+                return frame
+
+            waiter = self._loop.create_future()
+            self._waiter = waiter
+            try:
+                # Re-check after registering so a frame written in between is not missed
+                frame = self._next_frame()
+                if frame is not None:
+                    return frame
+                if timeout is None:
+                    await waiter
+                else:
+                    try:
+                        await asyncio.wait_for(waiter, timeout)
+                    except asyncio.TimeoutError:
+                        return None
+            finally:
+                self._waiter = None
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        backlog = self.ring.available()
+        if backlog < self.ring.frame_size:
+            return None
+        if backlog > self.max_backlog:
+            # Drop oldest audio rather than fall further behind real time
+            excess = (backlog - self.max_backlog) // self.ring.frame_size * self.ring.frame_size
+            self.ring.skip(excess)
+            self.dropped_frames += excess // self.ring.frame_size
+        return self.ring.read()
+
+    def _wake(self):
+        self._wakeup_pending = False
+        self.wakeups += 1
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _close_on_loop(self):
+        self._closed_event.set()
+        self._wake()
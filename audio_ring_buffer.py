@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+🎚️ GEM OS - Zero-Copy Audio Ring Buffer
+Preallocated single-producer/single-consumer PCM ring buffer shared by the voice front-ends.
+The audio callback writes into fixed storage; readers get NumPy views instead of copies.
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Lock-free SPSC ring buffer for mono PCM audio.
+
+    The producer (audio callback thread) only advances ``write_position`` and the
+    consumer only advances ``read_position``. Both are absolute sample counters, so
+    an utterance can be addressed by ``(start, stop)`` positions and sliced out
+    later without collecting chunks. Views returned by ``read`` and ``slice`` stay
+    valid until the producer laps them, i.e. for ``capacity`` samples.
+    """
+
+    def __init__(self, capacity_seconds: float = 30.0, sample_rate: int = 16000,
+                 frame_size: int = 1024, dtype=np.float32):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+
+        # Round capacity up to whole frames so frame-sized reads never wrap
+        frames = max(2, int(np.ceil(capacity_seconds * sample_rate / frame_size)))
+        self.capacity = frames * frame_size
+        self._buffer = np.zeros(self.capacity, dtype=dtype)
+
+        self._write_pos = 0
+        self._read_pos = 0
+        self.overruns = 0
+
+    @property
+    def dtype(self):
+        return self._buffer.dtype
+
+    @property
+    def write_position(self) -> int:
+        """Total samples written since creation"""
+        return self._write_pos
+
+    @property
+    def read_position(self) -> int:
+        """Total samples consumed since creation"""
+        return self._read_pos
+
+    def write(self, block) -> int:
+        """Copy one block into preallocated storage (producer side only)"""
+        samples = np.asarray(block).reshape(-1)
+        n = samples.shape[0]
+        write_pos = self._write_pos
+
+        if n > self.capacity:
+            # Only the newest `capacity` samples can survive anyway
+            write_pos += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        start = write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        if first < n:
+            self._buffer[:n - first] = samples[first:]
+
+        # Publish only after the data is in place
+        self._write_pos = write_pos + n
+        return n
+
+    def available(self) -> int:
+        """Samples ready for the consumer"""
+        self._check_overrun()
+        return self._write_pos - self._read_pos
+
+    def read(self, n: Optional[int] = None) -> np.ndarray:
+        """Consume ``n`` samples (default one frame) and return them as a view.
+
+        Reads that are a whole number of frames never straddle the wrap point, so
+        they are always zero-copy. Other sizes fall back to one copy on wrap.
+        """
+        if n is None:
+            n = self.frame_size
+        self._check_overrun()
+        n = min(n, self._write_pos - self._read_pos)
+        start = self._read_pos
+        self._read_pos += n
+        return self._view(start, start + n)
+
+    def slice(self, start: int, stop: int) -> Optional[np.ndarray]:
+        """Return samples between two absolute positions without consuming them.
+
+        Returns ``None`` if the start has already been overwritten.
+        """
+        stop = min(stop, self._write_pos)
+        if start < self._write_pos - self.capacity or stop <= start:
+            return None
+        return self._view(start, stop)
+
+    def skip(self, n: int):
+        """Consume ``n`` samples without reading them"""
+        self._check_overrun()
+        self._read_pos += min(n, self._write_pos - self._read_pos)
+
+    def discard(self):
+        """Drop everything buffered so the next read starts with fresh audio"""
+        self._read_pos = self._write_pos - (self._write_pos % self.frame_size)
+
+    def _view(self, start: int, stop: int) -> np.ndarray:
+        begin = start % self.capacity
+        end = begin + (stop - start)
+        if end <= self.capacity:
+            return self._buffer[begin:end]
+        # Wrapped region - one copy per utterance rather than one per callback
+        return np.concatenate((self._buffer[begin:], self._buffer[:end - self.capacity]))
+
+    def _check_overrun(self):
+        oldest = self._write_pos - self.capacity
+        if self._read_pos < oldest:
+            # Consumer fell a full lap behind; skip to the oldest intact frame
+            self._read_pos = oldest + (-oldest % self.frame_size)
+            self.overruns += 1
+
+
+def _measure_allocations(step, blocks: int):
+    """Run ``step`` per block and return traced bytes allocated and GC collections"""
+    import gc
+    import tracemalloc
+
+    collections = [0]
+
+    def on_gc(phase, info):
+        if phase == 'start':
+            collections[0] += 1
+
+    gc.callbacks.append(on_gc)
+    tracemalloc.start()
+    allocated_bytes = 0
+    allocations = 0
+    previous, _ = tracemalloc.get_traced_memory()
+    start_time = time.perf_counter()
+
+    for i in range(blocks):
+        step(i)
+        current, _ = tracemalloc.get_traced_memory()
+        if current > previous:
+            allocated_bytes += current - previous
+            allocations += 1
+        previous = current
+
+    elapsed = time.perf_counter() - start_time
+    tracemalloc.stop()
+    gc.callbacks.remove(on_gc)
+    return allocated_bytes, allocations, collections[0], elapsed
+
+
+def main():
+    """Benchmark queue.Queue copies against the ring buffer for always-on capture"""
+    import queue
+
+    sample_rate = 16000
+    block = 160  # 10 ms callbacks
+    seconds = 60
+    blocks = seconds * sample_rate // block
+    utterance_blocks = 150  # 1.5 s utterances
+    indata = (np.random.randn(block, 1) * 0.1).astype(np.float32)
+
+    print("🎚️ GEM OS - Audio capture allocation benchmark")
+    print("=" * 50)
+    print(f"📊 Simulating {seconds}s of 10 ms callbacks at {sample_rate} Hz")
+
+    # Before: copy each block into a queue, concatenate per utterance
+    audio_queue = queue.Queue()
+    chunks = []
+
+    def queue_step(i):
+        audio_queue.put(indata.copy())
+        chunks.append(audio_queue.get())
+        if len(chunks) == utterance_blocks:
+            np.concatenate(chunks)
+            chunks.clear()
+
+    # After: write into the ring, read frame views, slice the utterance once
+    ring = AudioRingBuffer(capacity_seconds=30, sample_rate=sample_rate, frame_size=block)
+    utterance_start = [0]
+
+    def ring_step(i):
+        ring.write(indata[:, 0])
+        ring.read()
+        if ring.read_position - utterance_start[0] >= utterance_blocks * block:
+            ring.slice(utterance_start[0], ring.read_position)
+            utterance_start[0] = ring.read_position
+
+    for name, step in (('queue.Queue + copy', queue_step), ('AudioRingBuffer', ring_step)):
+        allocated, allocations, collections, elapsed = _measure_allocations(step, blocks)
+        print(f"\n🔬 {name}:")
+        print(f"   Allocations/s: {allocations / seconds:.1f}")
+        print(f"   Bytes allocated/s: {allocated / seconds / 1024:.1f} KiB")
+        print(f"   GC collections/s: {collections / seconds:.2f}")
+        print(f"   Cost per callback: {elapsed / blocks * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
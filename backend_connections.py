@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+🔌 GEM OS - Backend Connection Manager
+Long-lived, keep-alive connections for every AI backend: one aiohttp session for
+local HTTP backends (Ollama), one pooled OpenAI client per key (HTTP/2 when h2 is
+installed), Gemini configured once per key, plus async health probes and clean shutdown.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None and importlib.util.find_spec('httpx') is not None
+
+
+class BackendConnectionManager:
+    """Owns the sessions and SDK clients shared by every AI call site.
+
+    ``http_session`` returns one keep-alive ``aiohttp.ClientSession`` per event loop,
+    ``openai_client`` one ``AsyncOpenAI`` per API key over a pooled httpx client, and
+    ``gemini_model`` configures the Gemini SDK once per key and caches models by name.
+    Probe results are kept in ``health`` for the router to consult; ``close`` releases
+    everything.
+    """
+
+    def __init__(self, max_connections: int = 16, keepalive_timeout: float = 60.0, http2: Optional[bool] = None):
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2 and HTTP2_AVAILABLE
+
+        self._session = None
+        self._session_loop = None
+        self._openai_clients: Dict[str, Any] = {}
+        self._gemini_key: Optional[str] = None
+        self._gemini_models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+        self.health: Dict[str, Dict[str, Any]] = {}
+        self.metrics = {
+            'sessions_created': 0,
+            'session_reuses': 0,
+            'clients_created': 0,
+            'client_reuses': 0,
+            'probes': 0,
+            'failed_probes': 0
+        }
+
+    async def http_session(self):
+        """Shared keep-alive aiohttp session for the running event loop"""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+            self.metrics['sessions_created'] += 1
+        else:
+            self.metrics['session_reuses'] += 1
+        return self._session
+
+    def openai_client(self, api_key: str):
+        """Shared ``openai.AsyncOpenAI`` for an API key"""
+        import openai
+
+        with self._lock:
+            client = self._openai_clients.get(api_key)
+            if client is not None:
+                self.metrics['client_reuses'] += 1
+                return client
+
+            import httpx
+
+            http_client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=self.keepalive_timeout),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+            client = openai.AsyncOpenAI(api_key=api_key, http_client=http_client)
+            self._openai_clients[api_key] = client
+            self.metrics['clients_created'] += 1
+            return client
+
+    def configure_gemini(self, api_key: str):
+        """Configure the Gemini SDK, skipping the work if this key is already active"""
+        import google.generativeai as genai
+
+        with self._lock:
+            if self._gemini_key != api_key:
+                genai.configure(api_key=api_key)
+                self._gemini_key = api_key
+                self._gemini_models.clear()
+                self.metrics['clients_created'] += 1
+
+    def gemini_model(self, api_key: str, model_name: str = 'gemini-1.5-flash'):
+        """Cached ``GenerativeModel`` for a key and model name"""
+        import google.generativeai as genai
+
+        self.configure_gemini(api_key)
+        with self._lock:
+            model = self._gemini_models.get(model_name)
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                self._gemini_models[model_name] = model
+                self.metrics['clients_created'] += 1
+            else:
+                self.metrics['client_reuses'] += 1
+            return model
+
+    def _record_probe(self, name: str, healthy: bool, started: float, error: Optional[str] = None) -> bool:
+        self.metrics['probes'] += 1
+        if not healthy:
+            self.metrics['failed_probes'] += 1
+        self.health[name] = {
+            'healthy': healthy,
+            'latency': time.time() - started,
+            'checked_at': time.time(),
+            'error': error
+        }
+        return healthy
+
+    async def probe_http(self, name: str, url: str, timeout: float = 2.0) -> bool:
+        """GET ``url`` on the shared session; healthy on HTTP 200"""
+        import aiohttp
+
+        started = time.time()
+        try:
+            session = await self.http_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                await response.read()
+                return self._record_probe(name, response.status == 200, started,
+                                          None if response.status == 200 else f"HTTP {response.status}")
+        except Exception as e:
+            return self._record_probe(name, False, started, str(e) or type(e).__name__)
+
+    async def probe_openai(self, name: str, api_key: str, timeout: float = 3.0) -> bool:
+        """List models with the shared client (authenticated, not billed)"""
+        started = time.time()
+        try:
+            await asyncio.wait_for(self.openai_client(api_key).models.list(), timeout)
+            return self._record_probe(name, True, started)
+        except Exception as e:
+            return self._record_probe(name, False, started, str(e) or type(e).__name__)
+
+    async def probe_gemini(self, name: str, api_key: str, model_name: str = 'gemini-1.5-flash',
+                           timeout: float = 3.0) -> bool:
+        """Fetch model metadata (authenticated, not billed)"""
+        import google.generativeai as genai
+
+        started = time.time()
+        try:
+            self.configure_gemini(api_key)
+            await asyncio.wait_for(asyncio.to_thread(genai.get_model, f'models/{model_name}'), timeout)
+            return self._record_probe(name, True, started)
+        except Exception as e:
+            return self._record_probe(name, False, started, str(e) or type(e).__name__)
+
+    def is_healthy(self, name: str, max_age: Optional[float] = None) -> Optional[bool]:
+        """Last probe result, or None if never probed (or older than ``max_age`` seconds)"""
+        state = self.health.get(name)
+        if state is None or (max_age is not None and time.time() - state['checked_at'] > max_age):
+            return None
+        return state['healthy']
+
+    async def close(self):
+        """Close the HTTP session and every SDK client"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        for client in list(self._openai_clients.values()):
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Error closing OpenAI client: {e}")
+        self._openai_clients.clear()
+        self._gemini_models.clear()
+        self._gemini_key = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get connection reuse and health metrics"""
+        return dict(self.metrics, http2=self.http2, health=self.health)
+
+
+_shared_manager: Optional[BackendConnectionManager] = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_connection_manager() -> BackendConnectionManager:
+    """Get the process-wide connection manager, creating it on first use"""
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = BackendConnectionManager()
+        return _shared_manager
+
+
+def main():
+    """Per-request session setup against a shared keep-alive session on a local stub server"""
+    import aiohttp
+    from aiohttp import web
+
+    requests = 300
+
+    async def run():
+        connections = set()
+
+        async def chat(request):
+            connections.add(request.transport.get_extra_info('peername'))
+            return web.json_response({'message': {'role': 'assistant', 'content': 'ok'}, 'done': True})
+
+        app = web.Application()
+        app.router.add_post('/api/chat', chat)
+        app.router.add_get('/api/tags', lambda request: web.json_response({'models': []}))
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        url = f"http://{host}:{port}"
+        payload = {'model': 'phi3:mini', 'messages': [{'role': 'user', 'content': 'hi'}], 'stream': False}
+
+        print("🔌 GEM OS - Backend connection benchmark")
+        print("=" * 50)
+
+        start_time = time.perf_counter()
+        for _ in range(requests):
+            async with aiohttp.ClientSession() as session:
+                async with session.post(f"{url}/api/chat", json=payload) as response:
+                    await response.json()
+        per_request = (time.perf_counter() - start_time) / requests
+        print(f"🐢 session per request: {per_request * 1000:.2f}ms/request, {len(connections)} TCP connections")
+
+        connections.clear()
+        manager = BackendConnectionManager()
+        start_time = time.perf_counter()
+        for _ in range(requests):
+            session = await manager.http_session()
+            async with session.post(f"{url}/api/chat", json=payload) as response:
+                await response.json()
+        shared = (time.perf_counter() - start_time) / requests
+        print(f"🚀 shared session: {shared * 1000:.2f}ms/request, {len(connections)} TCP connections "
+              f"({(1 - shared / per_request) * 100:.0f}% less time per request)")
+
+        healthy = await manager.probe_http('ollama_local', f"{url}/api/tags")
+        down = await manager.probe_http('offline', "http://127.0.0.1:9/api/tags", timeout=0.5)
+        print(f"🩺 Probes: stub {'healthy' if healthy else 'down'} "
+              f"({manager.health['ollama_local']['latency'] * 1000:.1f}ms), "
+              f"closed port {'healthy' if down else 'down'} | HTTP/2 for SDK clients: {manager.http2}")
+
+        await manager.close()
+        await runner.cleanup()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
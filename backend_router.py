@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+🧭 GEM OS - Adaptive Backend Router
+Routes each AI request to the backend that is fastest right now, from measured
+latencies and errors instead of constants. Slow requests are hedged on a second backend
+once they pass the first one's p95, and failing backends are benched by a circuit breaker.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+BackendCall = Callable[[str], Awaitable[Any]]
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+@dataclass
+class LatencyStats:
+    """EWMA latency plus a window of recent samples for the median and percentiles"""
+    ewma: float
+    samples: deque = field(default_factory=lambda: deque(maxlen=100))
+
+    def add(self, latency: float, alpha: float):
+        self.ewma += alpha * (latency - self.ewma)
+        self.samples.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if len(self.samples) < 10:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+    def typical(self) -> float:
+        """Windowed median (the EWMA until there are enough samples) - a few tail
+        samples don't move it, so one slow answer doesn't push a backend down the ranking"""
+        median = self.percentile(0.5)
+        return self.ewma if median is None else median
+
+
+@dataclass
+class BackendState:
+    """Error rate and circuit breaker for one backend"""
+    error_rate: float
+    error_updated: float = field(default_factory=time.time)
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    probing: bool = False
+    requests: int = 0
+    failures: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    circuit_opens: int = 0
+
+
+async def _close_result(result: Any):
+    """Release a result nobody will read - e.g. the open token stream of a losing hedge"""
+    for value in result if isinstance(result, tuple) else (result,):
+        try:
+            if hasattr(value, 'aclose'):
+                await value.aclose()
+            elif hasattr(value, 'close'):
+                value.close()
+        except Exception:
+            pass
+
+
+class AdaptiveRouter:
+    """Online backend router with hedging and circuit breaking.
+
+    Latency is tracked per backend and request type (a sample window for the median and
+    p95, an EWMA until the window has enough samples); errors per backend, as an EWMA
+    that also halves every ``error_half_life`` seconds so a backend that stopped getting
+    traffic can earn it back. Backends are ranked by ``median * (1 + error_penalty *
+    error_rate)``. ``call`` starts the best backend and, if it hasn't answered by its
+    p95, hedges on the next one - the first success wins, the others are cancelled and
+    anything a losing call already returned is closed. A failure immediately moves on to the next
+    backend. After ``failure_threshold`` consecutive failures a backend's circuit opens
+    for ``cooldown`` seconds, then a single half-open trial decides whether it comes back.
+    """
+
+    def __init__(self, backends: Iterable[str], prior_latency: Optional[Dict[str, float]] = None,
+                 prior_error: Optional[Dict[str, float]] = None, alpha: float = 0.2,
+                 error_penalty: float = 4.0, error_half_life: float = 60.0,
+                 failure_threshold: int = 3, cooldown: float = 30.0,
+                 hedge: bool = True, min_hedge_delay: float = 0.05, hedge_percentile: float = 0.95):
+        prior_latency = prior_latency or {}
+        prior_error = prior_error or {}
+        self.backends = list(backends)
+        self.prior_latency = {name: prior_latency.get(name, 1.0) for name in self.backends}
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.error_half_life = error_half_life
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.hedge_percentile = hedge_percentile
+
+        self.prior_error = {name: prior_error.get(name, 0.02) for name in self.backends}
+        self.states = {name: BackendState(error_rate=self.prior_error[name]) for name in self.backends}
+        self.latency: Dict[Tuple[str, str], LatencyStats] = {}
+
+    def _latency(self, backend: str, request_type: str) -> LatencyStats:
+        key = (backend, request_type)
+        stats = self.latency.get(key)
+        if stats is None:
+            # A new request type starts from what this backend does for other types
+            known = [stats.typical() for (name, _), stats in self.latency.items() if name == backend]
+            stats = LatencyStats(ewma=sum(known) / len(known) if known else self.prior_latency[backend])
+            self.latency[key] = stats
+        return stats
+
+    def _error_rate(self, backend: str, now: float) -> float:
+        state = self.states[backend]
+        state.error_rate *= 0.5 ** ((now - state.error_updated) / self.error_half_life)
+        state.error_updated = now
+        return state.error_rate
+
+    def _allowed(self, backend: str, now: float) -> bool:
+        state = self.states[backend]
+        if state.state == OPEN and now - state.opened_at >= self.cooldown:
+            state.state = HALF_OPEN
+            state.probing = False
+        if state.state == HALF_OPEN:
+            return not state.probing  # One trial request at a time
+        return state.state == CLOSED
+
+    def rank(self, request_type: str = 'general', available: Optional[Iterable[str]] = None) -> List[str]:
+        """Backends to try, best first; open circuits are left out"""
+        now = time.time()
+        candidates = self.backends if available is None else [name for name in self.backends if name in set(available)]
+        scored = []
+        for name in candidates:
+            if not self._allowed(name, now):
+                continue
+            expected = self._latency(name, request_type).typical()
+            if self.states[name].state == HALF_OPEN:
+                # Its one trial goes first, or a benched backend would never be tried again;
+                # hedging covers the request if the backend is still slow
+                expected = 0.0
+            scored.append((expected * (1 + self.error_penalty * self._error_rate(name, now)), name))
+        scored.sort()
+        return [name for _, name in scored]
+
+    def hedge_delay(self, backend: str, request_type: str = 'general') -> float:
+        """How long to wait for ``backend`` before hedging: its p95 (2x EWMA until known)"""
+        stats = self._latency(backend, request_type)
+        delay = stats.percentile(self.hedge_percentile)
+        if delay is None:
+            delay = 2 * stats.ewma
+        return max(self.min_hedge_delay, delay)
+
+    def record(self, backend: str, request_type: str, latency: Optional[float], success: bool):
+        """Feed one outcome back (``latency`` None when it isn't meaningful, e.g. cancelled)"""
+        state = self.states[backend]
+        state.requests += 1
+        error_rate = self._error_rate(backend, time.time())
+        state.error_rate = error_rate + self.alpha * ((0.0 if success else 1.0) - error_rate)
+        if success:
+            if latency is not None:
+                self._latency(backend, request_type).add(latency, self.alpha)
+            state.consecutive_failures = 0
+            if state.state == HALF_OPEN:
+                # The trial passed: the outage is over, so its errors shouldn't keep the backend benched
+                state.error_rate = min(state.error_rate, self.prior_error[backend])
+            state.state = CLOSED
+            state.probing = False
+            return
+
+        state.failures += 1
+        state.consecutive_failures += 1
+        if state.state == HALF_OPEN or state.consecutive_failures >= self.failure_threshold:
+            if state.state != OPEN:
+                state.circuit_opens += 1
+            state.state = OPEN
+            state.opened_at = time.time()
+            state.probing = False
+
+    def begin(self, backend: str):
+        """Mark a request as started (claims the half-open trial slot)"""
+        if self.states[backend].state == HALF_OPEN:
+            self.states[backend].probing = True
+
+    async def call(self, request_type: str, call: BackendCall,
+                   available: Optional[Iterable[str]] = None) -> Tuple[Any, str]:
+        """Run ``call(backend)`` on the best backend, hedging and failing over as needed.
+
+        Returns ``(result, backend)``; raises the last error if every backend failed.
+        """
+        queue = self.rank(request_type, available)
+        if not queue:
+            raise Exception("No AI backends available")
+
+        running: Dict[asyncio.Task, Tuple[str, float, bool]] = {}
+        losers: List[asyncio.Task] = []
+        last_error: Optional[BaseException] = None
+
+        def launch(hedged: bool = False):
+            backend = queue.pop(0)
+            self.begin(backend)
+            if hedged:
+                self.states[backend].hedges += 1
+            running[asyncio.create_task(call(backend))] = (backend, time.time(), hedged)
+
+        launch()
+        try:
+            while running:
+                # Give the newest request until its p95 before hedging on the next backend
+                timeout = None
+                if self.hedge and queue:
+                    newest_backend, newest_start, _ = list(running.values())[-1]
+                    timeout = max(0.0, self.hedge_delay(newest_backend, request_type) - (time.time() - newest_start))
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    launch(hedged=True)
+                    continue
+
+                winner = None
+                for task in done:
+                    backend, started, hedged = running.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        self.record(backend, request_type, None, False)
+                        continue
+                    self.record(backend, request_type, time.time() - started, True)
+                    if winner is None:
+                        winner = (task.result(), backend)
+                        if hedged:
+                            self.states[backend].hedge_wins += 1
+                    else:
+                        losers.append(task)  # Finished in the same wakeup - only one result is used
+                if winner is not None:
+                    return winner
+
+                if not running and queue:
+                    launch()  # Straight failover - nothing is in flight
+            raise Exception(f"All AI backends failed. Last error: {last_error}")
+        finally:
+            for task in running:
+                task.cancel()
+            for backend, _, _ in running.values():
+                # Cancelled before answering: free a half-open slot without judging the backend
+                self.states[backend].probing = False
+            # A cancel can't undo a call that already finished; close whatever it opened
+            for task in losers + [task for task in running if task.done()]:
+                if not task.cancelled() and task.exception() is None:
+                    await _close_result(task.result())
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend routing statistics"""
+        stats = {}
+        for name, state in self.states.items():
+            latencies = {request_type: {'ewma': round(latency.ewma, 4),
+                                        'p50': latency.percentile(0.5),
+                                        'p95': latency.percentile(0.95)}
+                         for (backend, request_type), latency in self.latency.items() if backend == name}
+            stats[name] = {
+                'state': state.state,
+                'error_rate': round(state.error_rate, 4),
+                'requests': state.requests,
+                'failures': state.failures,
+                'hedges': state.hedges,
+                'hedge_wins': state.hedge_wins,
+                'circuit_opens': state.circuit_opens,
+                'latency': latencies
+            }
+        return stats
+
+
+def main():
+    """Simulate static first-available routing against adaptive routing on stub backends"""
+    import random
+
+    random.seed(42)
+    scale = 0.02  # Simulated seconds -> real seconds, so the run takes a few seconds
+    requests = 1500
+    outage = range(400, 700)  # google_ai fails fast for these requests
+
+    profiles = {
+        # name: (median seconds, tail probability, tail seconds)
+        'google_ai': (0.8, 0.08, 6.0),
+        'ollama_local': (1.2, 0.02, 3.0),
+        'openai': (1.0, 0.05, 5.0),
+    }
+
+    def stub(request_number: int):
+        async def call(backend: str):
+            median, tail_probability, tail = profiles[backend]
+            if backend == 'google_ai' and request_number in outage:
+                await asyncio.sleep(0.05 * scale)
+                raise ConnectionError("503 Service Unavailable")
+            latency = tail * random.uniform(0.8, 1.2) if random.random() < tail_probability \
+                else median * random.lognormvariate(0, 0.25)
+            await asyncio.sleep(latency * scale)
+            return f"answer from {backend}"
+        return call
+
+    async def static(request_number: int):
+        # The old policy: constant scores pick google_ai, then the first other backend on failure
+        call = stub(request_number)
+        for backend in ('google_ai', 'ollama_local'):
+            try:
+                return await call(backend)
+            except Exception:
+                continue
+        raise Exception("All AI backends failed")
+
+    async def measure(label: str, handler):
+        latencies, failures = [], 0
+        for wave in range(0, requests, 50):
+            async def timed(number):
+                start_time = time.perf_counter()
+                try:
+                    await handler(number)
+                    return (time.perf_counter() - start_time) / scale
+                except Exception:
+                    return None
+            results = await asyncio.gather(*(timed(number) for number in range(wave, wave + 50)))
+            failures += sum(result is None for result in results)
+            latencies += [result for result in results if result is not None]
+        latencies.sort()
+        pick = lambda percentile: latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+        print(f"{label}: p50 {pick(0.5):.2f}s | p95 {pick(0.95):.2f}s | p99 {pick(0.99):.2f}s | "
+              f"failed {failures}")
+
+    async def run():
+        print("🧭 GEM OS - Backend routing simulation (simulated seconds)")
+        print("=" * 50)
+        await measure("🐢 static + first fallback", static)
+
+        router = AdaptiveRouter(profiles, prior_latency={name: profile[0] * scale for name, profile in profiles.items()},
+                                error_half_life=30 * scale, cooldown=30 * scale, min_hedge_delay=0.1 * scale)
+        await measure("🚀 adaptive + hedging", lambda number: router.call('general', stub(number)))
+        for name, stats in router.get_stats().items():
+            print(f"   {name}: {stats['requests']} requests | error rate {stats['error_rate']:.2f} | "
+                  f"hedges {stats['hedges']} (won {stats['hedge_wins']}) | circuit opens {stats['circuit_opens']}")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -275,21 +275,27 @@ class CompleteAITeamSystem:
                 # GEMINI: AI processing
                 if self.ai_client:
                     try:
-                        ai_response = await self.ai_client.generate_response(
+                        # Speak each sentence as soon as it is generated instead of after the whole answer
+                        sentences = []
+                        async for sentence in self.ai_client.stream_response(
                             user_input,
                             accessibility_mode=True
-                        )
+                        ):
+                            sentences.append(sentence)
+                            # COPILOT: Speak response
+                            if self.voice_interface:
+                                await self.voice_interface.speak_text(sentence)
+                        ai_response = " ".join(sentences)
                         
                         # CLAUDE: Accessibility optimization
                         if self.accessibility:
                             # Add accessibility context to response
-                            ai_response += " This response is optimized for screen readers and accessibility devices."
+                            accessibility_note = "This response is optimized for screen readers and accessibility devices."
+                            ai_response += " " + accessibility_note
+                            if self.voice_interface:
+                                await self.voice_interface.speak_text(accessibility_note)
                             
                         print(f"🧠 AI Team Response: {ai_response}")
-                        
-                        # COPILOT: Speak response
-                        if self.voice_interface:
-                            await self.voice_interface.speak_text(ai_response)
                             
                     except Exception as e:
                         # CURSOR: Error handling
@@ -24,4 +24,16 @@ RESET_COMMANDS = ['reset conversation', 'clear history', 'forget everything', 's
 
 # --- Accessibility Configuration ---
 # Phrases that will toggle emergency accessibility mode. / Frases que irão ativar o modo de acessibilidade de emergência.
-ACCESSIBILITY_MODE_COMMANDS = ['emergency mode', 'accessibility on', 'screen reader mode', 'accessibility mode']
\ No newline at end of file
+ACCESSIBILITY_MODE_COMMANDS = ['emergency mode', 'accessibility on', 'screen reader mode', 'accessibility mode']
+
+# --- Spoken Prompts ---
+# Fixed phrases synthesized once at startup and replayed from the TTS cache. / Frases fixas sintetizadas uma vez na inicialização e reproduzidas do cache de TTS.
+SPOKEN_PROMPTS = [
+    f"Hello, I am ready to assist. Just say '{WAKE_WORD}' to wake me up.",
+    "I'm listening.",
+    "I'm sorry, I didn't quite catch that. Please try again.",
+    "Conversation history cleared. I'm ready for a fresh start.",
+    "Accessibility mode enabled.",
+    "Accessibility mode disabled.",
+    "I've run into a problem. My AI team is working to resolve it. I am restarting my listening cycle now.",
+]
@@ -6,17 +6,18 @@ and browser-like functionality for superior responses.
 """
 import os
 import google.generativeai as genai
-import sqlite3
-import json
-import hashlib
 from typing import List, Dict, Optional, Any
 import time
 import asyncio
-from datetime import datetime, timedelta
 import requests
 from bs4 import BeautifulSoup
 import logging
 
+from backend_connections import get_connection_manager
+from gemini_maintenance import StorageMaintenance
+from gemini_storage import GeminiStorage, hash_prompt
+from semantic_cache import SemanticCache
+
 class EnhancedGeminiClient:
     """Enhanced Gemini Pro client with advanced features."""
     
@@ -25,7 +26,7 @@ class EnhancedGeminiClient:
         if not self.api_key:
             raise ValueError("GOOGLE_AI_API_KEY environment variable not set.")
             
-        genai.configure(api_key=self.api_key)
+        get_connection_manager().configure_gemini(self.api_key)
         
         # Use Gemini Pro with advanced configuration
         self.generation_config = {
@@ -48,12 +49,18 @@ class EnhancedGeminiClient:
             safety_settings=self.safety_settings
         )
         
+        # Context management
+        self.max_context_length = 10
+        
         # Initialize database for caching and context
         self._init_database()
         
-        # Context management
-        self.conversation_context = []
-        self.max_context_length = 10
+        # Rephrased standalone questions ("what is the capital of France" / "tell me the capital of France") share one answer
+        self.semantic_cache = SemanticCache()
+        self._warm_semantic_cache()
+        
+        # One session per client; its recent turns live in the storage ring
+        self.session_id = self.storage.open_session()
         
         # Enhanced system prompt (English first, Portuguese second)
         self.system_prompt = """
@@ -83,62 +90,12 @@ You are here to make the user's life easier and more productive.
         self.logger = logging.getLogger(__name__)
         
     def _init_database(self):
-        """Initialize SQLite database for caching and context management."""
+        """Open the storage engine for caching and context management."""
         self.db_path = '/home/oem/PycharmProjects/gem/gemini_enhanced.db'
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Response cache table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS response_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                prompt_hash TEXT UNIQUE,
-                prompt TEXT,
-                response TEXT,
-                confidence_score REAL,
-                tokens_used INTEGER,
-                response_time REAL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                expiry_date DATETIME
-            )
-        ''')
-        
-        # Conversation history
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS conversation_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT,
-                role TEXT,
-                content TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                context_tags TEXT
-            )
-        ''')
-        
-        # User preferences and learning
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_preferences (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                preference_key TEXT UNIQUE,
-                preference_value TEXT,
-                last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Knowledge base for enhanced responses
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS knowledge_base (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                topic TEXT,
-                content TEXT,
-                source TEXT,
-                relevance_score REAL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        self.storage = GeminiStorage(self.db_path, session_window=self.max_context_length)
+        # Expiry sweeps, size caps and ANALYZE/VACUUM in the background
+        self.maintenance = StorageMaintenance(self.storage)
+        self.maintenance.start()
         
     def _init_chat(self):
         """Initialize enhanced chat with system prompt and context."""
@@ -159,70 +116,49 @@ You are here to make the user's life easier and more productive.
             
     def _hash_prompt(self, prompt: str) -> str:
         """Generate hash for prompt caching."""
-        return hashlib.md5(prompt.encode('utf-8')).hexdigest()
+        return hash_prompt(prompt)
         
-    def _check_cache(self, prompt: str) -> Optional[str]:
-        """Check if response is cached and still valid."""
+    def _warm_semantic_cache(self):
+        """Load the most recent unexpired cached answers into the semantic index."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            prompt_hash = self._hash_prompt(prompt)
-            
-            cursor.execute('''
-                SELECT response, expiry_date FROM response_cache 
-                WHERE prompt_hash = ? AND expiry_date > datetime('now')
-            ''', (prompt_hash,))
-            
-            result = cursor.fetchone()
-            conn.close()
+            rows = self.storage.recent_cached(self.semantic_cache.capacity)
+            for prompt, response in reversed(rows):
+                self.semantic_cache.store(prompt, response)
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Semantic cache warm-up failed: {e}") # Falha ao aquecer o cache semântico
             
-            if result:
-                return result[0]
+    def _check_cache(self, prompt: str) -> Optional[str]:
+        """Check if response is cached and still valid (exact match, then a rephrased match)."""
+        try:
+            cached_response = self.storage.get_cached_response(self._hash_prompt(prompt))
+            if cached_response:
+                return cached_response
                 
         except Exception as e:
             self.logger.error(f"Cache check failed: {e}") # Falha na verificação do cache
             
+        match = self.semantic_cache.lookup(prompt)
+        if match:
+            self.logger.info(f"Semantic cache hit ({match['similarity']:.2f}): '{match['prompt']}'")
+            return match['response']
+            
         return None
         
     def _cache_response(self, prompt: str, response: str, response_time: float, tokens_used: int = 0):
-        """Cache response for future use."""
+        """Cache response for future use (written behind; visible to lookups at once)."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            prompt_hash = self._hash_prompt(prompt)
-            expiry_date = datetime.now() + timedelta(hours=24)  # Cache for 24 hours
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO response_cache 
-                (prompt_hash, prompt, response, response_time, tokens_used, expiry_date)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (prompt_hash, prompt, response, response_time, tokens_used, expiry_date))
-            
-            conn.commit()
-            conn.close()
+            self.storage.cache_response(self._hash_prompt(prompt), prompt, response, response_time,
+                                        tokens_used, ttl=24 * 3600)  # Cache for 24 hours
             
         except Exception as e:
             self.logger.error(f"Failed to cache response: {e}") # Falha ao armazenar a resposta no cache
             
+        self.semantic_cache.store(prompt, response)
+            
     def _store_conversation(self, role: str, content: str, context_tags: List[str] = None):
-        """Store conversation in database for context management."""
+        """Queue a conversation turn for the database (off the response path)."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            session_id = f"session_{int(time.time())}"
-            tags_json = json.dumps(context_tags or [])
-            
-            cursor.execute('''
-                INSERT INTO conversation_history 
-                (session_id, role, content, context_tags)
-                VALUES (?, ?, ?, ?)
-            ''', (session_id, role, content, tags_json))
-            
-            conn.commit()
-            conn.close()
+            self.storage.store_conversation(self.session_id, role, content, context_tags)
             
         except Exception as e:
             self.logger.error(f"Failed to store conversation: {e}") # Falha ao armazenar a conversa
@@ -231,11 +167,12 @@ You are here to make the user's life easier and more productive.
         """Enhance prompt with context and user preferences."""
         enhanced_prompt = prompt
         
-        # Add recent conversation context
-        if self.conversation_context:
+        # Add recent conversation context (from the session ring, no disk access)
+        recent_turns = self.storage.recent_turns(self.session_id, 3)
+        if recent_turns:
             context_str = "\n".join([
                 f"{item['role']}: {item['content'][:100]}..."
-                for item in self.conversation_context[-3:]
+                for item in recent_turns
             ])
             enhanced_prompt = f"Recent conversation context:\n{context_str}\n\nCurrent question: {prompt}"
             
@@ -320,30 +257,12 @@ You are here to make the user's life easier and more productive.
                     
             print()  # New line after streaming
             
-            # Store conversation context
-            self.conversation_context.append({
-                'role': 'user',
-                'content': prompt,
-                'timestamp': datetime.now(),
-                'intent': intent
-            })
-            
-            self.conversation_context.append({
-                'role': 'assistant',
-                'content': full_response,
-                'timestamp': datetime.now()
-            })
-            
-            # Keep context manageable
-            if len(self.conversation_context) > self.max_context_length:
-                self.conversation_context = self.conversation_context[-self.max_context_length:]
-                
             response_time = time.time() - start_time
             
             # Cache the response
             self._cache_response(prompt, full_response, response_time)
             
-            # Store in database
+            # Store conversation context (session ring now, database behind)
             self._store_conversation('user', prompt, intent.get('topics', []))
             self._store_conversation('assistant', full_response)
             
@@ -364,11 +283,12 @@ You are here to make the user's life easier and more productive.
                 
     def get_conversation_summary(self) -> str:
         """Get summary of recent conversation."""
-        if not self.conversation_context:
+        recent_turns = self.storage.recent_turns(self.session_id, 5)
+        if not recent_turns:
             return "No recent conversation." # Nenhuma conversa recente.
             
         summary = "Summary of recent conversation:\n" # Resumo da conversa recente:
-        for item in self.conversation_context[-5:]:
+        for item in recent_turns:
             role_emoji = "👤" if item['role'] == 'user' else "🤖"
             content_preview = item['content'][:100] + "..." if len(item['content']) > 100 else item['content']
             summary += f"{role_emoji} {content_preview}\n"
@@ -376,37 +296,29 @@ You are here to make the user's life easier and more productive.
         return summary
         
     def clear_context(self):
-        """Clear conversation context."""
-        self.conversation_context = []
+        """Clear conversation context by starting a new session."""
+        self.session_id = self.storage.open_session()
         print("🧽 Conversation context cleared.") # Contexto da conversa limpo.
         
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_queries,
-                    AVG(response_time) as avg_response_time,
-                    AVG(tokens_used) as avg_tokens,
-                    COUNT(CASE WHEN expiry_date > datetime('now') THEN 1 END) as cached_responses
-                FROM response_cache
-                WHERE timestamp > datetime('now', '-7 days')
-            ''')
-            
-            stats = cursor.fetchone()
-            conn.close()
-            
-            return {
-                'total_queries': stats[0] or 0,
-                'avg_response_time': round(stats[1] or 0, 2),
-                'avg_tokens': int(stats[2] or 0),
-                'cached_responses': stats[3] or 0,
-                'context_items': len(self.conversation_context)
-            }
+            stats = self.storage.performance_stats()
+            stats['context_items'] = len(self.storage.recent_turns(self.session_id))
+            stats['session_id'] = self.session_id
+            stats['storage'] = self.storage.get_metrics()
+            stats['maintenance'] = self.maintenance.metrics
+            return stats
             
         except Exception as e:
             self.logger.error(f"Failed to get performance stats: {e}") # Falha ao obter estatísticas de desempenho
-            return {}
\ No newline at end of file
+            return {}
+            
+    def get_session_history(self, cursor=None, limit: int = 50):
+        """Page through this session's stored turns, newest first; returns (turns, next_cursor)."""
+        return self.storage.conversation_page(self.session_id, cursor, limit)
+        
+    def close(self):
+        """Stop maintenance, commit queued writes and close the storage engine."""
+        self.maintenance.stop()
+        self.storage.close()
@@ -16,6 +16,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
 
+from backend_connections import get_connection_manager
+
 # Load environment variables
 load_dotenv()
 
@@ -34,6 +36,9 @@ class GemUnifiedSystem:
             'debug': os.getenv('DEBUG', 'true').lower() == 'true'
         }
         
+        # Long-lived AI clients, shared across user turns
+        self.connections = get_connection_manager()
+        
         # System state
         self.is_running = False
         self.user_context = {}
@@ -225,9 +230,7 @@ class GemUnifiedSystem:
         # Try OpenAI first
         if self.config['openai_key']:
             try:
-                import openai
-                
-                client = openai.AsyncOpenAI(api_key=self.config['openai_key'])
+                client = self.connections.openai_client(self.config['openai_key'])
                 
                 # Build context from conversation history
                 messages = []
@@ -262,10 +265,7 @@ class GemUnifiedSystem:
         # Try Gemini as fallback
         if self.config['gemini_key']:
             try:
-                import google.generativeai as genai
-                
-                genai.configure(api_key=self.config['gemini_key'])
-                model = genai.GenerativeModel('gemini-1.5-flash')
+                model = self.connections.gemini_model(self.config['gemini_key'], 'gemini-1.5-flash')
                 
                 # Build context
                 context = "You are GEM, an accessibility-first AI assistant.\n\n"
@@ -396,6 +396,7 @@ async def main():
         print(f"\n❌ Fatal error: {e}")
         gem_system.logger.error(f"Fatal error: {e}")
     finally:
+        await gem_system.connections.close()
         print("\n💎 GEM OS session complete")
 
 if __name__ == "__main__":
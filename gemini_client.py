@@ -6,14 +6,17 @@ English first, Portuguese (pt-BR) second.
 """
 import os
 import google.generativeai as genai
-import re
+
+from backend_connections import get_connection_manager
+from sentence_segmenter import SentenceSegmenter
 
 class GeminiProClient:
-    def __init__(self):
+    def __init__(self, language_code: str = 'en-US'):
+        self.language_code = language_code  # Picks the segmenter's abbreviation list
         self.api_key = os.getenv("GOOGLE_AI_API_KEY")
         if not self.api_key:
             raise ValueError("GOOGLE_AI_API_KEY environment variable not set.")
-        genai.configure(api_key=self.api_key)
+        get_connection_manager().configure_gemini(self.api_key)
         self.model = genai.GenerativeModel('gemini-pro')
         self.reset_chat()
 
@@ -22,23 +25,14 @@ class GeminiProClient:
         try:
             print("🧠 Gemini is thinking...")
             response = self.chat.send_message(prompt, stream=True)
-            buffer = ""
+            segmenter = SentenceSegmenter(self.language_code)
             for chunk in response:
                 print(chunk.text, end="", flush=True)
-                buffer += chunk.text
-                # Split the buffer into sentences, keeping the delimiter.
-                sentences = re.split(r'(?<=[.?!])\s*', buffer)
-                
-                # The last part of the split is an incomplete sentence, so we keep it in the buffer.
-                if len(sentences) > 1:
-                    for sentence in sentences[:-1]:
-                        if sentence.strip():
-                            yield sentence.strip()
-                    buffer = sentences[-1]
+                # Only the new characters are scanned; complete sentences come out as soon as they end.
+                yield from segmenter.feed(chunk.text)
         
             # Yield any remaining text in the buffer after the loop finishes.
-            if buffer.strip():
-                yield buffer.strip()
+            yield from segmenter.flush()
             print()  # Newline after streaming is complete
         except Exception as e:
             print(f"❌ Error communicating with Gemini Pro: {e}")
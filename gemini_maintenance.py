@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+🧹 GEM OS - Gemini Storage Maintenance
+Keeps the Enhanced Gemini database bounded: a background sweeper deletes expired cache
+rows and old conversation turns in small batches, size caps evict the least recently
+used answers, ANALYZE/VACUUM run on a schedule, and a compaction report says what it did.
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from gemini_storage import GeminiStorage, hash_prompt
+
+logger = logging.getLogger(__name__)
+
+_DELETE_EXPIRED = '''
+    DELETE FROM response_cache WHERE id IN (
+        SELECT id FROM response_cache WHERE expiry_date <= datetime('now') LIMIT ?
+    )
+'''
+_EVICT_LRU = '''
+    DELETE FROM response_cache WHERE id IN (
+        SELECT id FROM response_cache ORDER BY last_used LIMIT ?
+    )
+'''
+_DELETE_OLD_HISTORY = '''
+    DELETE FROM conversation_history WHERE id IN (
+        SELECT id FROM conversation_history WHERE timestamp < datetime('now', ?) LIMIT ?
+    )
+'''
+_TRIM_HISTORY = '''
+    DELETE FROM conversation_history WHERE id IN (
+        SELECT id FROM conversation_history ORDER BY id LIMIT ?
+    )
+'''
+_LOOKUP = "SELECT response FROM response_cache WHERE prompt_hash = ? AND expiry_date > datetime('now')"
+
+
+class StorageMaintenance:
+    """Incremental upkeep for a ``GeminiStorage`` database.
+
+    Every ``sweep_interval`` seconds ``run_once`` deletes expired cache rows, conversation
+    turns older than ``history_retention_days`` and rows over ``max_cache_rows`` (least
+    recently used first) / ``max_history_rows`` (oldest first). Deletes run in batches of
+    ``batch_size`` on the storage's writer thread, each batch its own transaction, so
+    queued writes interleave instead of waiting for a long purge; at most ``max_batches``
+    per step per tick. ANALYZE runs every ``analyze_interval`` seconds; VACUUM once free
+    pages pass ``vacuum_free_ratio`` of the file and ``vacuum_interval`` has elapsed.
+    """
+
+    def __init__(self, storage: GeminiStorage, sweep_interval: float = 60.0, batch_size: int = 1000,
+                 max_batches: int = 20, max_cache_rows: int = 100_000, max_history_rows: int = 1_000_000,
+                 history_retention_days: float = 90.0, analyze_interval: float = 6 * 3600.0,
+                 vacuum_interval: float = 7 * 24 * 3600.0, vacuum_free_ratio: float = 0.25):
+        self.storage = storage
+        self.sweep_interval = sweep_interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.max_cache_rows = max_cache_rows
+        self.max_history_rows = max_history_rows
+        self.history_retention_days = history_retention_days
+        self.analyze_interval = analyze_interval
+        self.vacuum_interval = vacuum_interval
+        self.vacuum_free_ratio = vacuum_free_ratio
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_analyze = 0.0
+        self._last_vacuum = 0.0
+
+        self.metrics = {
+            'ticks': 0,
+            'expired_deleted': 0,
+            'lru_evicted': 0,
+            'history_expired': 0,
+            'history_trimmed': 0,
+            'analyze_runs': 0,
+            'vacuum_runs': 0,
+            'bytes_reclaimed': 0,
+            'last_tick_seconds': 0.0,
+            'last_tick_at': None
+        }
+
+    def start(self):
+        """Run the sweeper on a daemon thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gemini-storage-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the sweeper after its current batch"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Storage maintenance failed: {e}")
+
+    def _on_writer(self, function: Callable[[sqlite3.Connection], Any]) -> Any:
+        return self.storage.writer.submit(function).result()
+
+    def _batched_delete(self, sql: str, params: Callable[[int], tuple], limit: Optional[int] = None) -> int:
+        """Delete in batches until a batch comes back short, ``limit`` rows or ``max_batches``"""
+        deleted = 0
+        for _ in range(self.max_batches):
+            if self._stop.is_set() and self._thread is not None:
+                break
+            size = self.batch_size if limit is None else min(self.batch_size, limit - deleted)
+            if size <= 0:
+                break
+            count = self._on_writer(lambda conn: conn.execute(sql, params(size)).rowcount)
+            deleted += count
+            if count < size:
+                break
+        return deleted
+
+    def _count(self, table: str) -> int:
+        return self._on_writer(lambda conn: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0])
+
+    def _page_stats(self) -> Dict[str, int]:
+        def read(conn):
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            return {
+                'page_size': page_size,
+                'pages': conn.execute('PRAGMA page_count').fetchone()[0],
+                'free_pages': conn.execute('PRAGMA freelist_count').fetchone()[0]
+            }
+        return self._on_writer(read)
+
+    def run_once(self, force_analyze: bool = False, force_vacuum: bool = False) -> Dict[str, Any]:
+        """One maintenance pass; returns what it did"""
+        start_time = time.time()
+        tick = {
+            'expired_deleted': self._batched_delete(_DELETE_EXPIRED, lambda size: (size,)),
+            'history_expired': self._batched_delete(
+                _DELETE_OLD_HISTORY, lambda size: (f'-{self.history_retention_days} days', size))
+        }
+
+        excess = self._count('response_cache') - self.max_cache_rows
+        tick['lru_evicted'] = self._batched_delete(_EVICT_LRU, lambda size: (size,), excess) if excess > 0 else 0
+        excess = self._count('conversation_history') - self.max_history_rows
+        tick['history_trimmed'] = self._batched_delete(_TRIM_HISTORY, lambda size: (size,), excess) if excess > 0 else 0
+
+        now = time.time()
+        tick['analyzed'] = force_analyze or now - self._last_analyze >= self.analyze_interval
+        if tick['analyzed']:
+            # A bounded sample keeps ANALYZE cheap on large tables
+            self._on_writer(lambda conn: conn.executescript('PRAGMA analysis_limit=1000; ANALYZE;'))
+            self._last_analyze = now
+            self.metrics['analyze_runs'] += 1
+
+        pages = self._page_stats()
+        free_ratio = pages['free_pages'] / pages['pages'] if pages['pages'] else 0.0
+        tick['vacuumed'] = force_vacuum or (free_ratio >= self.vacuum_free_ratio
+                                            and now - self._last_vacuum >= self.vacuum_interval)
+        if tick['vacuumed']:
+            self._on_writer(lambda conn: conn.execute('VACUUM'))
+            after = self._page_stats()
+            self.metrics['bytes_reclaimed'] += (pages['pages'] - after['pages']) * pages['page_size']
+            self._last_vacuum = now
+            self.metrics['vacuum_runs'] += 1
+
+        for key in ('expired_deleted', 'history_expired', 'lru_evicted', 'history_trimmed'):
+            self.metrics[key] += tick[key]
+        self.metrics['ticks'] += 1
+        self.metrics['last_tick_seconds'] = time.time() - start_time
+        self.metrics['last_tick_at'] = start_time
+        tick['seconds'] = self.metrics['last_tick_seconds']
+        return tick
+
+    def report(self) -> Dict[str, Any]:
+        """Compaction report: table sizes, file usage and everything removed so far"""
+        pages = self._page_stats()
+        return dict(
+            self.metrics,
+            cache_rows=self._count('response_cache'),
+            history_rows=self._count('conversation_history'),
+            file_bytes=os.path.getsize(self.storage.db_path) if os.path.exists(self.storage.db_path) else 0,
+            used_bytes=(pages['pages'] - pages['free_pages']) * pages['page_size'],
+            free_bytes=pages['free_pages'] * pages['page_size'],
+            last_analyze_at=self._last_analyze or None,
+            last_vacuum_at=self._last_vacuum or None
+        )
+
+
+def _fill(conn: sqlite3.Connection, start: int, end: int):
+    response = "Open Settings, choose Accessibility and say the option name."
+    rows = ((hash_prompt(f"question {number}"), f"question {number}", response, 1.0, 0,
+             '2099-01-01 00:00:00', float(number)) for number in range(start, end))
+    conn.executemany('''
+        INSERT INTO response_cache
+        (prompt_hash, prompt, response, response_time, tokens_used, expiry_date, last_used)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    turns = ((f"session_{number // 20}", 'user' if number % 2 else 'assistant', response, '[]')
+             for number in range(start, end))
+    conn.executemany('INSERT INTO conversation_history (session_id, role, content, context_tags) VALUES (?, ?, ?, ?)',
+                     turns)
+    conn.commit()
+
+
+def _lookup_ms(conn: sqlite3.Connection, rows: int, samples: int = 2000) -> Dict[str, float]:
+    import random
+
+    random.seed(rows)
+    start_time = time.perf_counter()
+    for _ in range(samples):
+        conn.execute(_LOOKUP, (hash_prompt(f"question {random.randrange(rows)}"),)).fetchone()
+    cache = (time.perf_counter() - start_time) / samples * 1000
+
+    history_samples = max(5, samples // 100)
+    start_time = time.perf_counter()
+    for _ in range(history_samples):
+        conn.execute('''
+            SELECT role, content FROM conversation_history WHERE session_id = ? ORDER BY timestamp DESC LIMIT 20
+        ''', (f"session_{random.randrange(rows // 20)}",)).fetchall()
+    history = (time.perf_counter() - start_time) / history_samples * 1000
+    return {'cache': cache, 'history': history}
+
+
+def main():
+    """Lookup latency as the tables grow, with and without indexes; then a sweep and its report"""
+    target = int(sys.argv[sys.argv.index('--rows') + 1]) if '--rows' in sys.argv else 1_000_000
+    sizes = [size for size in (10_000, 100_000, 1_000_000, 10_000_000) if size <= target]
+
+    print("🧹 GEM OS - Gemini storage maintenance benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as directory:
+        indexed = GeminiStorage(os.path.join(directory, 'indexed.db'))
+        indexed.close()
+        bare = GeminiStorage(os.path.join(directory, 'bare.db'))
+        bare.close()
+
+        connections = {'indexed': sqlite3.connect(os.path.join(directory, 'indexed.db')),
+                       'bare': sqlite3.connect(os.path.join(directory, 'bare.db'))}
+        # The old schema: only the implicit prompt_hash index
+        for (name,) in connections['bare'].execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'").fetchall():
+            connections['bare'].execute(f'DROP INDEX {name}')
+
+        filled = 0
+        for size in sizes:
+            for conn in connections.values():
+                _fill(conn, filled, size)
+            filled = size
+            bare = _lookup_ms(connections['bare'], size)
+            indexed = _lookup_ms(connections['indexed'], size)
+            print(f"📏 {size:>9,} rows | cache lookup {indexed['cache']:.3f}ms | "
+                  f"session history: {bare['history']:.3f}ms unindexed -> {indexed['history']:.3f}ms indexed")
+        for conn in connections.values():
+            conn.close()
+
+        # Expire half the cache and push both tables past their caps, then sweep
+        conn = sqlite3.connect(os.path.join(directory, 'indexed.db'))
+        conn.execute("UPDATE response_cache SET expiry_date = '2000-01-01 00:00:00' WHERE id % 2 = 0")
+        conn.commit()
+        conn.close()
+        storage = GeminiStorage(os.path.join(directory, 'indexed.db'))
+        maintenance = StorageMaintenance(storage, batch_size=5000, max_batches=1_000_000,
+                                         max_cache_rows=filled // 4, max_history_rows=filled // 2)
+        tick = maintenance.run_once(force_vacuum=True)
+        report = maintenance.report()
+        print(f"🧹 Sweep in {tick['seconds']:.1f}s: {tick['expired_deleted']:,} expired, "
+              f"{tick['lru_evicted']:,} LRU-evicted, {tick['history_trimmed']:,} history turns trimmed")
+        print(f"📋 Report: {report['cache_rows']:,} cache rows, {report['history_rows']:,} history rows, "
+              f"{report['file_bytes'] / 1e6:.1f} MB file, {report['bytes_reclaimed'] / 1e6:.1f} MB reclaimed by VACUUM")
+
+        survivor = hash_prompt(f"question {filled - 1}")
+        start_time = time.perf_counter()
+        for _ in range(2000):
+            storage._reader.execute(_LOOKUP, (survivor,)).fetchone()
+        print(f"⚡ Lookup after compaction: {(time.perf_counter() - start_time) / 2000 * 1000:.3f}ms")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
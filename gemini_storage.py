@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+💾 GEM OS - Enhanced Gemini Storage Engine
+The response cache and conversation log behind EnhancedGeminiClient: one long-lived
+WAL read connection, writes queued on the background writer, and an in-memory front
+cache so a conversation turn no longer opens, commits and closes SQLite four times.
+Each session keeps its last turns in an in-memory ring for prompt context; older
+history is read back a page at a time.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlite_writer import BackgroundSQLiteWriter, connect
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS response_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        prompt_hash TEXT UNIQUE,
+        prompt TEXT,
+        response TEXT,
+        confidence_score REAL,
+        tokens_used INTEGER,
+        response_time REAL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        expiry_date DATETIME,
+        last_used REAL
+    );
+
+    CREATE TABLE IF NOT EXISTS conversation_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT,
+        role TEXT,
+        content TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        context_tags TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS user_preferences (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        preference_key TEXT UNIQUE,
+        preference_value TEXT,
+        last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS knowledge_base (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        topic TEXT,
+        content TEXT,
+        source TEXT,
+        relevance_score REAL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+'''
+
+# Created after the migration below; the stats one covers the whole 7-day aggregate
+_INDEXES = '''
+    CREATE INDEX IF NOT EXISTS idx_response_cache_expiry ON response_cache (expiry_date);
+    CREATE INDEX IF NOT EXISTS idx_response_cache_last_used ON response_cache (last_used);
+    CREATE INDEX IF NOT EXISTS idx_response_cache_recent
+        ON response_cache (timestamp, expiry_date, response_time, tokens_used);
+    CREATE INDEX IF NOT EXISTS idx_conversation_session ON conversation_history (session_id, timestamp);
+    CREATE INDEX IF NOT EXISTS idx_conversation_timestamp ON conversation_history (timestamp);
+'''
+
+# Fixed SQL text, so sqlite3's per-connection statement cache reuses the prepared statements
+_SELECT_CACHED = '''
+    SELECT response, (julianday(expiry_date) - julianday('now')) * 86400.0 FROM response_cache
+    WHERE prompt_hash = ? AND expiry_date > datetime('now')
+'''
+_UPSERT_CACHED = '''
+    INSERT OR REPLACE INTO response_cache
+    (prompt_hash, prompt, response, response_time, tokens_used, expiry_date, last_used)
+    VALUES (?, ?, ?, ?, ?, datetime('now', ?), ?)
+'''
+_TOUCH_CACHED = 'UPDATE response_cache SET last_used = ? WHERE prompt_hash = ?'
+_INSERT_CONVERSATION = '''
+    INSERT INTO conversation_history (session_id, role, content, timestamp, context_tags)
+    VALUES (?, ?, ?, ?, ?)
+'''
+# Keyset pagination over idx_conversation_session: (timestamp, id) of the last row seen
+_SELECT_SESSION_PAGE = '''
+    SELECT id, role, content, timestamp, context_tags FROM conversation_history
+    WHERE session_id = ? AND (timestamp, id) < (?, ?)
+    ORDER BY timestamp DESC, id DESC LIMIT ?
+'''
+_SELECT_RECENT_CACHED = '''
+    SELECT prompt, response FROM response_cache
+    WHERE expiry_date > datetime('now')
+    ORDER BY timestamp DESC LIMIT ?
+'''
+_SELECT_STATS = '''
+    SELECT
+        COUNT(*) as total_queries,
+        AVG(response_time) as avg_response_time,
+        AVG(tokens_used) as avg_tokens,
+        COUNT(CASE WHEN expiry_date > datetime('now') THEN 1 END) as cached_responses
+    FROM response_cache
+    WHERE timestamp > datetime('now', '-7 days')
+'''
+
+
+def _create_schema(conn: sqlite3.Connection):
+    """Tables, the ``last_used`` column on databases that predate it, then the indexes"""
+    conn.executescript(_SCHEMA)
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(response_cache)')}
+    if 'last_used' not in columns:
+        conn.execute('ALTER TABLE response_cache ADD COLUMN last_used REAL')
+        conn.execute("UPDATE response_cache SET last_used = CAST(strftime('%s', timestamp) AS REAL)")
+        conn.commit()
+    conn.executescript(_INDEXES)
+
+
+def new_session_id() -> str:
+    """Unique, time-ordered session id"""
+    return f"session_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+
+
+def hash_prompt(prompt: str) -> str:
+    """Cache key for a prompt (same digest the table has always used)"""
+    return hashlib.md5(prompt.encode('utf-8')).hexdigest()
+
+
+class GeminiStorage:
+    """Write-behind store for cached answers and conversation turns.
+
+    Reads go to a bounded LRU front cache first and then to one persistent WAL
+    connection; writes update the front cache immediately and are queued on a
+    ``BackgroundSQLiteWriter``, so callers never wait for a commit and always read
+    their own writes. Queries that aggregate the tables (``performance_stats``) see
+    queued writes only once the writer commits them, within ``flush_interval``.
+    Hits refresh ``last_used`` (at most every ``touch_interval`` seconds per entry) so
+    ``StorageMaintenance`` can evict the least recently used rows.
+
+    Conversation turns also go into a ring of the last ``session_window`` turns per
+    session (for the ``max_sessions`` most recently used sessions), so ``recent_turns``
+    never reads the disk once a session is open; ``conversation_page`` walks a
+    session's full committed history newest first.
+    """
+
+    def __init__(self, db_path: str, writer: Optional[BackgroundSQLiteWriter] = None,
+                 front_cache_entries: int = 256, cache_ttl: float = 24 * 3600.0, touch_interval: float = 60.0,
+                 session_window: int = 20, max_sessions: int = 64):
+        self.db_path = db_path
+        self.front_cache_entries = front_cache_entries
+        self.cache_ttl = cache_ttl
+        self.touch_interval = touch_interval
+        self.session_window = session_window
+        self.max_sessions = max_sessions
+
+        self._owns_writer = writer is None
+        self.writer = writer or BackgroundSQLiteWriter(db_path, name="gemini-storage-writer")
+        self.writer.submit(_create_schema).result()
+        self._reader = connect(db_path)
+
+        self._front: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()  # response, expires, touched
+        self._rings: "OrderedDict[str, deque]" = OrderedDict()
+        self.metrics = {
+            'front_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'cache_writes': 0,
+            'conversation_writes': 0,
+            'ring_loads': 0,
+            'read_time': 0.0
+        }
+
+    def _remember(self, prompt_hash: str, response: str, expires_at: float, touched_at: float):
+        self._front[prompt_hash] = (response, expires_at, touched_at)
+        self._front.move_to_end(prompt_hash)
+        while len(self._front) > self.front_cache_entries:
+            self._front.popitem(last=False)
+
+    def get_cached_response(self, prompt_hash: str) -> Optional[str]:
+        """Unexpired cached answer for a prompt hash, or None"""
+        start_time = time.perf_counter()
+        try:
+            now = time.time()
+            entry = self._front.get(prompt_hash)
+            if entry is not None:
+                response, expires_at, touched_at = entry
+                if expires_at > now:
+                    self._front.move_to_end(prompt_hash)
+                    if now - touched_at > self.touch_interval:
+                        self._touch(prompt_hash, response, expires_at, now)
+                    self.metrics['front_hits'] += 1
+                    return response
+                del self._front[prompt_hash]
+
+            row = self._reader.execute(_SELECT_CACHED, (prompt_hash,)).fetchone()
+            if row is None:
+                self.metrics['misses'] += 1
+                return None
+            self._touch(prompt_hash, row[0], now + row[1], now)
+            self.metrics['disk_hits'] += 1
+            return row[0]
+        finally:
+            self.metrics['read_time'] += time.perf_counter() - start_time
+
+    def _touch(self, prompt_hash: str, response: str, expires_at: float, now: float):
+        self._remember(prompt_hash, response, expires_at, now)
+        self.writer.execute(_TOUCH_CACHED, (now, prompt_hash))
+
+    def cache_response(self, prompt_hash: str, prompt: str, response: str, response_time: float,
+                       tokens_used: int = 0, ttl: Optional[float] = None):
+        """Cache an answer for ``ttl`` seconds (default ``cache_ttl``) without waiting for disk"""
+        ttl = self.cache_ttl if ttl is None else ttl
+        now = time.time()
+        self._remember(prompt_hash, response, now + ttl, now)
+        self.writer.execute(_UPSERT_CACHED, (prompt_hash, prompt, response, response_time, tokens_used,
+                                             f'+{int(ttl)} seconds', now))
+        self.metrics['cache_writes'] += 1
+
+    def _ring(self, session_id: str, load: bool = True) -> deque:
+        """A session's ring, loading its last turns from disk the first time it is seen"""
+        ring = self._rings.get(session_id)
+        if ring is None:
+            ring = deque(maxlen=self.session_window)
+            if load:
+                ring.extend(reversed(self.conversation_page(session_id, limit=self.session_window)[0]))
+                self.metrics['ring_loads'] += 1
+            self._rings[session_id] = ring
+            while len(self._rings) > self.max_sessions:
+                self._rings.popitem(last=False)
+        self._rings.move_to_end(session_id)
+        return ring
+
+    def open_session(self, session_id: Optional[str] = None) -> str:
+        """Start a new session (or resume ``session_id``); returns its id"""
+        if session_id is None:
+            session_id = new_session_id()
+            self._ring(session_id, load=False)
+        else:
+            self._ring(session_id)
+        return session_id
+
+    def store_conversation(self, session_id: str, role: str, content: str, context_tags: Optional[List[str]] = None):
+        """Append a turn to the session's ring and queue it for disk"""
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        tags = context_tags or []
+        self._ring(session_id).append({'id': None, 'role': role, 'content': content,
+                                       'timestamp': timestamp, 'context_tags': tags})
+        self.writer.execute(_INSERT_CONVERSATION, (session_id, role, content, timestamp, json.dumps(tags)))
+        self.metrics['conversation_writes'] += 1
+
+    def recent_turns(self, session_id: str, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The session's last ``count`` turns (default: the whole ring), oldest first"""
+        ring = self._ring(session_id)
+        count = len(ring) if count is None else min(count, len(ring))
+        return list(islice(reversed(ring), count))[::-1]
+
+    def conversation_page(self, session_id: str, cursor: Optional[Tuple[str, int]] = None,
+                          limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        """One page of a session's committed history, newest first.
+
+        Pass the returned cursor back to get the next (older) page; it is None after
+        the last page. Turns still queued on the writer appear once committed.
+        """
+        timestamp, row_id = cursor or ('9999-12-31 23:59:59', 2 ** 63 - 1)
+        rows = self._reader.execute(_SELECT_SESSION_PAGE, (session_id, timestamp, row_id, limit)).fetchall()
+        turns = [{'id': row[0], 'role': row[1], 'content': row[2], 'timestamp': row[3],
+                  'context_tags': json.loads(row[4] or '[]')} for row in rows]
+        next_cursor = (rows[-1][3], rows[-1][0]) if len(rows) == limit else None
+        return turns, next_cursor
+
+    def recent_cached(self, limit: int) -> List[Tuple[str, str]]:
+        """Most recent unexpired ``(prompt, response)`` pairs, newest first"""
+        return self._reader.execute(_SELECT_RECENT_CACHED, (limit,)).fetchall()
+
+    def performance_stats(self) -> Dict[str, Any]:
+        """Last 7 days of cached answers: count, mean response time and tokens"""
+        stats = self._reader.execute(_SELECT_STATS).fetchone()
+        return {
+            'total_queries': stats[0] or 0,
+            'avg_response_time': round(stats[1] or 0, 2),
+            'avg_tokens': int(stats[2] or 0),
+            'cached_responses': stats[3] or 0
+        }
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write is committed"""
+        return self.writer.flush(timeout)
+
+    def close(self):
+        """Close the read connection (and the writer if this engine created it)"""
+        self._reader.close()
+        if self._owns_writer:
+            self.writer.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get front cache and write-behind metrics"""
+        reads = self.metrics['front_hits'] + self.metrics['disk_hits'] + self.metrics['misses']
+        return {
+            'front_cache_entries': len(self._front),
+            'front_hits': self.metrics['front_hits'],
+            'disk_hits': self.metrics['disk_hits'],
+            'misses': self.metrics['misses'],
+            'front_hit_rate': self.metrics['front_hits'] / reads if reads else 0.0,
+            'avg_read_ms': self.metrics['read_time'] / reads * 1000 if reads else 0.0,
+            'cache_writes': self.metrics['cache_writes'],
+            'conversation_writes': self.metrics['conversation_writes'],
+            'open_sessions': len(self._rings),
+            'ring_loads': self.metrics['ring_loads'],
+            'writer': self.writer.get_metrics()
+        }
+
+
+def _legacy_turn(db_path: str, prompt: str, response: str) -> Optional[str]:
+    """The previous per-turn storage work: four connect/execute/commit/close cycles"""
+    prompt_hash = hash_prompt(prompt)
+    conn = sqlite3.connect(db_path)
+    cached = conn.execute("SELECT response FROM response_cache WHERE prompt_hash = ? AND expiry_date > datetime('now')",
+                          (prompt_hash,)).fetchone()
+    conn.close()
+    if cached:
+        return cached[0]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(_UPSERT_CACHED, (prompt_hash, prompt, response, 1.0, 0, '+86400 seconds', time.time()))
+    conn.commit()
+    conn.close()
+    for role, content in (('user', prompt), ('assistant', response)):
+        conn = sqlite3.connect(db_path)
+        conn.execute('INSERT INTO conversation_history (session_id, role, content, context_tags) VALUES (?, ?, ?, ?)',
+                     (f"session_{int(time.time())}", role, content, '[]'))
+        conn.commit()
+        conn.close()
+    return None
+
+
+def main():
+    """Per-turn storage overhead: connection per operation vs the storage engine"""
+    import random
+
+    random.seed(3)
+    turns = 1000
+    prompts = [f"how do I change accessibility setting {number}?" for number in range(400)]
+    stream = [random.choice(prompts[:100]) if random.random() < 0.5 else random.choice(prompts) for _ in range(turns)]
+    response = "Open Settings, choose Accessibility and say the name of the option. " * 4
+
+    print("💾 GEM OS - Enhanced Gemini storage benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, 'legacy.db')
+        GeminiStorage(legacy_path).close()  # Same schema for both runs
+        latencies = []
+        for prompt in stream:
+            start_time = time.perf_counter()
+            _legacy_turn(legacy_path, prompt, response)
+            latencies.append(time.perf_counter() - start_time)
+        latencies.sort()
+        legacy_mean = sum(latencies) / turns
+        print(f"🐢 connection per operation: {legacy_mean * 1000:.3f}ms/turn | "
+              f"p99 {latencies[int(turns * 0.99) - 1] * 1000:.3f}ms")
+
+        storage = GeminiStorage(os.path.join(directory, 'engine.db'))
+        session = storage.open_session()
+        latencies = []
+        for prompt in stream:
+            start_time = time.perf_counter()
+            prompt_hash = hash_prompt(prompt)
+            if storage.get_cached_response(prompt_hash) is None:
+                storage.cache_response(prompt_hash, prompt, response, 1.0)
+                storage.store_conversation(session, 'user', prompt)
+                storage.store_conversation(session, 'assistant', response)
+            latencies.append(time.perf_counter() - start_time)
+        storage.flush()
+        latencies.sort()
+        engine_mean = sum(latencies) / turns
+        metrics = storage.get_metrics()
+        print(f"🚀 storage engine: {engine_mean * 1000:.3f}ms/turn | p99 {latencies[int(turns * 0.99) - 1] * 1000:.3f}ms "
+              f"({legacy_mean / engine_mean:.0f}x less) | front cache hit rate {metrics['front_hit_rate'] * 100:.0f}% | "
+              f"avg write batch {metrics['writer']['avg_batch_size']:.0f}")
+        print(f"📊 Stats after flush: {storage.performance_stats()}")
+
+        # Prompt context: the ring against a per-turn history query
+        start_time = time.perf_counter()
+        for _ in range(1000):
+            storage.recent_turns(session, 3)
+        ring_time = (time.perf_counter() - start_time) / 1000
+        start_time = time.perf_counter()
+        for _ in range(1000):
+            storage.conversation_page(session, limit=3)
+        query_time = (time.perf_counter() - start_time) / 1000
+        pages, cursor = 1, storage.conversation_page(session, limit=100)[1]
+        while cursor:
+            cursor = storage.conversation_page(session, cursor, limit=100)[1]
+            pages += 1
+        print(f"🧵 Last 3 turns: ring {ring_time * 1e6:.1f}µs vs SQLite {query_time * 1e6:.1f}µs | "
+              f"{metrics['conversation_writes']} turns paged in {pages} keyset pages")
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
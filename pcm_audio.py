@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+🔊 GEM OS - In-Memory PCM Conversion
+Turns int16 capture buffers straight into the float32 16 kHz arrays Whisper expects,
+so transcription never round-trips through temporary WAV files and ffmpeg.
+"""
+
+import time
+from typing import Union
+
+import numpy as np
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+def pcm16_to_float32(pcm: Union[bytes, bytearray, memoryview, np.ndarray], channels: int = 1) -> np.ndarray:
+    """Convert interleaved int16 PCM to mono float32 in [-1, 1) with a single allocation"""
+    samples = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+        audio = samples.mean(axis=1, dtype=np.float32)
+    else:
+        audio = samples.astype(np.float32)
+    audio *= 1.0 / 32768.0
+    return audio
+
+
+def resample(audio: np.ndarray, source_rate: int, target_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """Linear-interpolation resample (no-op when the rates already match)"""
+    if source_rate == target_rate or len(audio) < 2:
+        return audio
+    target_length = int(round(len(audio) * target_rate / source_rate))
+    positions = np.arange(target_length, dtype=np.float64) * (source_rate / target_rate)
+    index = positions.astype(np.int64)
+    np.minimum(index, len(audio) - 2, out=index)
+    fraction = (positions - index).astype(np.float32)
+    # Lerp in float32: cheaper than np.interp, which works in float64 with a search
+    resampled = audio[index]
+    resampled += (audio[index + 1] - resampled) * fraction
+    return resampled
+
+
+def to_whisper_input(pcm, sample_rate: int, channels: int = 1) -> np.ndarray:
+    """int16 capture buffer -> contiguous float32 mono at 16 kHz"""
+    audio = resample(pcm16_to_float32(pcm, channels), sample_rate, WHISPER_SAMPLE_RATE)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _wav_file_path(pcm: bytes, sample_rate: int, channels: int) -> np.ndarray:
+    """The old path: temp WAV -> ffmpeg decode (as whisper.audio.load_audio does) -> unlink"""
+    import os
+    import shutil
+    import subprocess
+    import tempfile
+    import wave
+
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
+        with wave.open(temp_file.name, 'wb') as wav_file:
+            wav_file.setnchannels(channels)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes(pcm)
+    try:
+        if shutil.which('ffmpeg'):
+            output = subprocess.run(
+                ['ffmpeg', '-nostdin', '-threads', '0', '-i', temp_file.name,
+                 '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(WHISPER_SAMPLE_RATE), '-'],
+                capture_output=True, check=True
+            ).stdout
+        else:
+            # No ffmpeg here - still pay for the file round trip
+            with wave.open(temp_file.name, 'rb') as wav_file:
+                output = wav_file.readframes(wav_file.getnframes())
+        return np.frombuffer(output, np.int16).flatten().astype(np.float32) / 32768.0
+    finally:
+        os.unlink(temp_file.name)
+
+
+def main():
+    """Benchmark temp-WAV transcription input against the in-memory path"""
+    import shutil
+
+    print("🔊 GEM OS - Whisper input latency benchmark")
+    print("=" * 50)
+    if not shutil.which('ffmpeg'):
+        print("⚠️ ffmpeg not found - temp-file timings exclude the decode step")
+
+    runs = 20
+    for label, seconds, sample_rate in (('wake word chunk', 1.0, 16000),
+                                        ('command utterance', 5.0, 16000),
+                                        ('44.1 kHz device', 5.0, 44100)):
+        pcm = (np.random.randn(int(seconds * sample_rate)) * 3000).astype(np.int16).tobytes()
+
+        timings = {}
+        for name, convert in (('temp WAV + ffmpeg', _wav_file_path), ('in-memory', to_whisper_input)):
+            samples = []
+            for _ in range(runs):
+                start_time = time.perf_counter()
+                convert(pcm, sample_rate, 1)
+                samples.append((time.perf_counter() - start_time) * 1000)
+            samples.sort()
+            timings[name] = (samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1])
+
+        print(f"\n🎤 {label} ({seconds:.0f}s @ {sample_rate} Hz):")
+        for name, (p50, p95) in timings.items():
+            print(f"   {name}: p50 {p50:.2f}ms | p95 {p95:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
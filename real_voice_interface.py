@@ -7,7 +7,6 @@ Real microphone input, speaker output, wake word detection, audio processing
 
 import asyncio
 import pyaudio
-import wave
 import numpy as np
 import threading
 import queue
@@ -17,6 +16,13 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Callable
 import logging
 
+from audio_ring_buffer import AudioRingBuffer
+from pcm_audio import pcm16_to_float32, resample, to_whisper_input
+from stt_worker_pool import get_stt_pool
+from tts_cache import PhraseAudioCache
+from voice_activity import VoiceActivityDetector
+from wake_word_detector import create_wake_word_detector
+
 class RealVoiceInterface:
     """REAL voice interface implementation - COPILOT's contribution"""
     
@@ -39,6 +45,10 @@ class RealVoiceInterface:
             'help me'
         ]
         
+        # Local wake word engine - full STT only runs after it fires
+        self.wake_word_engine = os.getenv('GEM_WAKE_WORD_ENGINE', 'template').lower()
+        self.wake_word_detector = None
+        
         # Voice processing components
         self.audio_interface = None
         self.input_stream = None
@@ -46,8 +56,22 @@ class RealVoiceInterface:
         self.is_listening = False
         self.is_speaking = False
         
+        # Rendered pyttsx3 phrases, replayed through the output stream
+        self.phrase_cache = PhraseAudioCache()
+        
         # Audio buffers and queues
-        self.audio_buffer = queue.Queue()
+        self.audio_buffer = AudioRingBuffer(
+            capacity_seconds=30.0,
+            sample_rate=self.audio_config['sample_rate'],
+            frame_size=self.audio_config['chunk_size'],
+            dtype=np.int16
+        )
+        self.voice_activity = VoiceActivityDetector(
+            sample_rate=self.audio_config['sample_rate'],
+            frame_ms=32,
+            min_speech_db=-36.0  # RMS ~500 on int16
+        )
+        self.last_audio_level = 0.0
         self.speech_queue = queue.Queue()
         self.command_queue = queue.Queue()
         
@@ -134,13 +158,12 @@ class RealVoiceInterface:
         """Initialize REAL speech-to-text engines"""
         print("\n🎤 INITIALIZING SPEECH-TO-TEXT ENGINES...")
         
-        # Try Whisper (OpenAI)
+        # Try Whisper (OpenAI) - served by the shared STT worker pool
         try:
             import whisper
-            model = whisper.load_model("base")
             self.stt_engines['whisper'] = {
                 'available': True,
-                'engine': model,
+                'engine': get_stt_pool("base"),
                 'accuracy': 0.95,
                 'latency_ms': 800
             }
@@ -293,22 +316,47 @@ class RealVoiceInterface:
             # Convert audio data to numpy array
             audio_array = np.frombuffer(in_data, dtype=np.int16)
             
-            # Simple voice activity detection
-            audio_level = np.sqrt(np.mean(audio_array**2))
-            
-            if audio_level > 500:  # Threshold for voice detection
-                self.audio_buffer.put({
-                    'data': in_data,
-                    'timestamp': time.time(),
-                    'level': audio_level
-                })
+            # Stateful voice activity detection (adaptive noise floor + hangover)
+            if self.voice_activity.is_speech(audio_array):
+                self.audio_buffer.write(audio_array)
+                self.last_audio_level = float(np.sqrt(np.mean(np.square(audio_array, dtype=np.float32))))
                 
         return (None, pyaudio.paContinue)
         
+    def initialize_wake_word_detector(self) -> bool:
+        """Initialize the local wake word engine"""
+        try:
+            self.wake_word_detector = create_wake_word_detector(
+                engine=self.wake_word_engine,
+                sample_rate=self.audio_config['sample_rate'],
+                keywords=[os.getenv('GEM_WAKE_WORD', 'gemini').lower()],
+                access_key=os.getenv('PORCUPINE_ACCESS_KEY')
+            )
+        except Exception as e:
+            self.logger.error(f"Wake word engine '{self.wake_word_engine}' failed: {e}")
+            self.wake_word_detector = None
+            
+        if self.wake_word_detector and self.wake_word_detector.ready:
+            print(f"✅ Local wake word engine ready ({self.wake_word_engine})")
+            return True
+            
+        print("⚠️ No local wake word engine (record templates with: python wake_word_detector.py --enroll \"hey gem\") - using STT")
+        return False
+        
     async def detect_wake_word(self, audio_data: bytes) -> Optional[str]:
         """REAL wake word detection"""
         try:
-            # Use best available STT engine for wake word detection
+            detector = self.wake_word_detector
+            
+            if detector and detector.ready:
+                # Cheap local keyword spotting - no STT unless it fires
+                wake_word = detector.process(np.frombuffer(audio_data, dtype=np.int16))
+                if wake_word:
+                    self.metrics['wake_word_detections'] += 1
+                    print(f"🎤 Wake word detected: '{wake_word}'")
+                return wake_word
+                
+            # Fallback: use best available STT engine for wake word detection
             best_engine = self._select_best_stt_engine()
             
             if not best_engine:
@@ -339,26 +387,19 @@ class RealVoiceInterface:
             engine_info = self.stt_engines[engine_name]
             
             if engine_name == 'whisper':
-                # Whisper transcription
-                import tempfile
-                import whisper
+                # Whisper transcription straight from the int16 capture buffer
+                audio = to_whisper_input(
+                    audio_data,
+                    self.audio_config['sample_rate'],
+                    self.audio_config['channels']
+                )
+                
+                # Transcribe on the worker pool; wake word checks get a tight deadline
+                result = await engine_info['engine'].transcribe(
+                    audio, timeout=2.0 if quick else None
+                )
+                text = result['text'].strip()
                 
-                # Save audio to temporary file
-                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                    # Convert raw audio to WAV
-                    with wave.open(temp_file.name, 'wb') as wav_file:
-                        wav_file.setnchannels(self.audio_config['channels'])
-                        wav_file.setsampwidth(2)  # 16-bit
-                        wav_file.setframerate(self.audio_config['sample_rate'])
-                        wav_file.writeframes(audio_data)
-                        
-                    # Transcribe with Whisper
-                    result = engine_info['engine'].transcribe(temp_file.name)
-                    text = result['text'].strip()
-                    
-                    # Clean up
-                    os.unlink(temp_file.name)
-                    
             elif engine_name == 'google':
                 # Google Speech Recognition
                 import speech_recognition as sr
@@ -437,9 +478,19 @@ class RealVoiceInterface:
                     engine.setProperty('rate', 150)  # Normal rate
                     engine.setProperty('volume', 0.9)
                     
-                # Speak text
-                engine.say(text)
-                engine.runAndWait()
+                if self.output_stream is not None:
+                    # Render once, then replay the cached PCM through our own output stream
+                    loop = asyncio.get_running_loop()
+                    pcm = await self.phrase_cache.get_or_synthesize(
+                        text, str(engine.getProperty('voice')), 'pyttsx3', self.audio_config['sample_rate'],
+                        lambda phrase: loop.run_in_executor(None, self._render_pyttsx3, engine, phrase),
+                        rate=engine.getProperty('rate')
+                    )
+                    await loop.run_in_executor(None, self.output_stream.write, pcm.tobytes())
+                else:
+                    # Speak text
+                    engine.say(text)
+                    engine.runAndWait()
                 
             elif best_engine == 'espeak':
                 # eSpeak synthesis
@@ -470,6 +521,23 @@ class RealVoiceInterface:
             self.logger.error(f"Speech synthesis failed: {e}")
             return False
             
+    def _render_pyttsx3(self, engine, text: str) -> np.ndarray:
+        """Render text with pyttsx3 to int16 PCM at the output sample rate"""
+        import tempfile
+        import wave
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'phrase.wav')
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            with wave.open(path, 'rb') as wav_file:
+                rate = wav_file.getframerate()
+                audio = pcm16_to_float32(wav_file.readframes(wav_file.getnframes()), wav_file.getnchannels())
+                
+        audio = resample(audio, rate, self.audio_config['sample_rate'])
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        return pcm
+        
     def _select_best_tts_engine(self) -> Optional[str]:
         """Select best available TTS engine"""
         available_engines = [(name, info) for name, info in self.tts_engines.items() if info['available']]
@@ -491,28 +559,22 @@ class RealVoiceInterface:
         print(f"🎤 Listening for command (timeout: {timeout}s)...")
         
         self.is_listening = True
-        audio_chunks = []
+        self.audio_buffer.discard()
+        required_samples = 32 * self.audio_buffer.frame_size  # ~2 seconds at 16kHz
         start_time = time.time()
         
         try:
             while time.time() - start_time < timeout:
-                try:
-                    # Get audio data from buffer
-                    audio_item = self.audio_buffer.get(timeout=0.1)
-                    audio_chunks.append(audio_item['data'])
-                    
-                    # Check if we have enough audio (2 seconds)
-                    if len(audio_chunks) >= 32:  # ~2 seconds at 16kHz
-                        break
-                        
-                except queue.Empty:
-                    continue
+                # Check if we have enough audio (2 seconds)
+                if self.audio_buffer.available() >= required_samples:
+                    break
+                await asyncio.sleep(0.05)
                     
             self.is_listening = False
             
-            if audio_chunks:
-                # Combine audio chunks
-                combined_audio = b''.join(audio_chunks)
+            if self.audio_buffer.available():
+                # Read the buffered speech as one contiguous block
+                combined_audio = self.audio_buffer.read(required_samples).tobytes()
                 
                 # Transcribe with best engine
                 best_engine = self._select_best_stt_engine()
@@ -558,7 +620,9 @@ class RealVoiceInterface:
             'avg_synthesis_time_ms': avg_synthesis_time,
             'stt_engines_available': sum(1 for engine in self.stt_engines.values() if engine['available']),
             'tts_engines_available': sum(1 for engine in self.tts_engines.values() if engine['available']),
-            'audio_system_status': 'ACTIVE' if self.input_stream and self.output_stream else 'LIMITED'
+            'wake_word_engine': self.wake_word_engine if self.wake_word_detector and self.wake_word_detector.ready else 'stt',
+            'audio_system_status': 'ACTIVE' if self.input_stream and self.output_stream else 'LIMITED',
+            'tts_cache_hit_rate': self.phrase_cache.get_stats()['hit_rate']
         }
         
     async def initialize_complete_system(self) -> bool:
@@ -574,6 +638,9 @@ class RealVoiceInterface:
         # Initialize TTS engines
         tts_status = self.initialize_tts_engines()
         
+        # Initialize local wake word engine
+        wake_word_ok = self.initialize_wake_word_detector()
+        
         # Start audio streams
         streams_ok = self.start_audio_streams() if audio_ok else False
         
@@ -587,6 +654,7 @@ class RealVoiceInterface:
         print(f"   Audio System: {'✅ OK' if audio_ok else '❌ FAILED'}")
         print(f"   STT Engines: {'✅ OK' if stt_available else '❌ FAILED'}")
         print(f"   TTS Engines: {'✅ OK' if tts_available else '❌ FAILED'}")
+        print(f"   Wake Word: {'✅ LOCAL' if wake_word_ok else '⚠️ STT FALLBACK'}")
         print(f"   Audio Streams: {'✅ OK' if streams_ok else '❌ FAILED'}")
         print(f"   Overall Status: {'✅ READY' if system_ready else '❌ LIMITED'}")
         
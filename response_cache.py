@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+📦 GEM OS - AI Response Cache
+Bounded LRU of AI answers with per-entry TTL, keyed by the normalized prompt, a digest
+of the conversation context the backend actually sees, and the response mode. Optional
+SQLite persistence goes through the background writer so lookups never wait on disk.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from sqlite_writer import BackgroundSQLiteWriter, connect
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS response_cache (
+        cache_key TEXT PRIMARY KEY,
+        response TEXT,
+        created_at REAL,
+        expires_at REAL,
+        hits INTEGER DEFAULT 0,
+        last_used REAL
+    )
+'''
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the question"""
+    return ' '.join(prompt.lower().split()).rstrip(' .?!')
+
+
+def context_digest(context: List[Dict], window: int = 5) -> str:
+    """Digest of the roles and contents of the last ``window`` messages (timestamps ignored)"""
+    messages = [(message.get('role', 'user'), message.get('content', '')) for message in context[-window:]]
+    return hashlib.blake2b(json.dumps(messages, ensure_ascii=False).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """Size- and byte-bounded LRU with TTL, optionally persisted to SQLite.
+
+    Entries expire ``ttl`` seconds after they are stored; expired entries are dropped
+    on access. The least recently used entries are evicted once the cache holds more
+    than ``max_entries`` answers or ``max_bytes`` of text. With ``db_path`` every store
+    is also written through ``BackgroundSQLiteWriter``, misses fall back to the table,
+    and the most recent live entries are loaded at startup.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 4 * 1024 * 1024, default_ttl: float = 3600.0,
+                 db_path: Optional[str] = None, writer: Optional[BackgroundSQLiteWriter] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.db_path = db_path
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.metrics = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+        self.writer = None
+        self._reader = None
+        self._owns_writer = False
+        if db_path:
+            self._owns_writer = writer is None
+            self.writer = writer or BackgroundSQLiteWriter(db_path, name="response-cache-writer")
+            self.writer.submit(lambda conn: conn.execute(_SCHEMA)).result()
+            self._reader = connect(db_path)
+            self._warm()
+
+    @staticmethod
+    def make_key(prompt: str, context: List[Dict], accessibility_mode: bool = False,
+                 emergency_mode: bool = False) -> str:
+        """Key over the normalized prompt, the context digest and the response mode"""
+        material = json.dumps([normalize_prompt(prompt), context_digest(context),
+                               accessibility_mode, emergency_mode], ensure_ascii=False)
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _warm(self):
+        rows = self._reader.execute('''
+            SELECT cache_key, response, expires_at FROM response_cache
+            WHERE expires_at > ? ORDER BY last_used DESC LIMIT ?
+        ''', (time.time(), self.max_entries)).fetchall()
+        for key, response, expires_at in reversed(rows):
+            self._remember(key, response, expires_at)
+
+    def _remember(self, key: str, response: str, expires_at: float):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old['size']
+        size = len(response.encode('utf-8'))
+        self._entries[key] = {'response': response, 'expires_at': expires_at, 'size': size}
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted['size']
+            self.metrics['evictions'] += 1
+
+    def _forget(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry['size']
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached answer for a key, or None if missing or expired"""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry['expires_at'] <= now:
+                self._forget(key)
+                self.metrics['expired'] += 1
+                self.metrics['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.metrics['hits'] += 1
+            self._touch(key, now)
+            return entry['response']
+
+        if self._reader is not None:
+            row = self._reader.execute(
+                'SELECT response, expires_at FROM response_cache WHERE cache_key = ? AND expires_at > ?',
+                (key, now)
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row[0], row[1])
+                self.metrics['hits'] += 1
+                self.metrics['disk_hits'] += 1
+                self._touch(key, now)
+                return row[0]
+
+        self.metrics['misses'] += 1
+        return None
+
+    def _touch(self, key: str, now: float):
+        if self.writer is not None:
+            self.writer.execute('UPDATE response_cache SET hits = hits + 1, last_used = ? WHERE cache_key = ?',
+                                (now, key))
+
+    def put(self, key: str, response: str, ttl: Optional[float] = None):
+        """Store an answer for ``ttl`` seconds (default ``default_ttl``)"""
+        if not response:
+            return
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        self._remember(key, response, expires_at)
+        self.metrics['stores'] += 1
+        if self.writer is not None:
+            self.writer.execute('''
+                INSERT OR REPLACE INTO response_cache (cache_key, response, created_at, expires_at, hits, last_used)
+                VALUES (?, ?, ?, ?, 0, ?)
+            ''', (key, response, now, expires_at, now))
+
+    def invalidate(self, key: str):
+        """Drop one entry"""
+        self._forget(key)
+        if self.writer is not None:
+            self.writer.execute('DELETE FROM response_cache WHERE cache_key = ?', (key,))
+
+    def clear(self):
+        """Drop every entry (memory and disk)"""
+        self._entries.clear()
+        self._bytes = 0
+        if self.writer is not None:
+            self.writer.execute('DELETE FROM response_cache')
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get hit-ratio and size metrics"""
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.metrics['hits'],
+            'disk_hits': self.metrics['disk_hits'],
+            'misses': self.metrics['misses'],
+            'expired': self.metrics['expired'],
+            'stores': self.metrics['stores'],
+            'evictions': self.metrics['evictions'],
+            'hit_ratio': self.metrics['hits'] / lookups if lookups else 0.0,
+            'persistent': self.writer is not None
+        }
+
+    def close(self):
+        """Close the read connection (and the writer if this cache created it)"""
+        if self._reader is not None:
+            self._reader.close()
+        if self._owns_writer:
+            self.writer.close()
+
+
+def main():
+    """Growth and hit ratio on a skewed query stream: unbounded dict vs bounded cache"""
+    import random
+
+    random.seed(5)
+    questions = [f"what is the status of task {number}" for number in range(2000)]
+    cumulative, total = [], 0.0
+    for rank in range(len(questions)):
+        total += 1 / (rank + 1)  # Zipf-like popularity
+        cumulative.append(total)
+    answer = "Here is a helpful, screen-reader friendly answer. " * 8
+
+    print("📦 GEM OS - Response cache benchmark")
+    print("=" * 50)
+
+    unbounded = {}
+    cache = ResponseCache(max_entries=256, max_bytes=256 * 1024)
+    start_time = time.perf_counter()
+    for _ in range(20000):
+        prompt = random.choices(questions, cum_weights=cumulative)[0]
+        key = ResponseCache.make_key(prompt, [], accessibility_mode=True)
+        unbounded.setdefault(key, answer)
+        if cache.get(key) is None:
+            cache.put(key, answer)
+    elapsed = time.perf_counter() - start_time
+
+    metrics = cache.get_metrics()
+    print(f"🐘 unbounded dict: {len(unbounded)} entries, ~{len(unbounded) * len(answer) / 1024:.0f} KiB and growing")
+    print(f"📦 bounded LRU: {metrics['entries']} entries, {metrics['bytes'] / 1024:.0f} KiB | "
+          f"hit ratio {metrics['hit_ratio'] * 100:.0f}% | {metrics['evictions']} evictions | "
+          f"{elapsed / 20000 * 1e6:.1f}µs per request")
+
+    # Old key: same last message and context length collide across conversations
+    first = [{'role': 'user', 'content': 'book a doctor'}, {'role': 'assistant', 'content': 'Done.'}]
+    second = [{'role': 'user', 'content': 'cancel my trip'}, {'role': 'assistant', 'content': 'Done.'}]
+    print(f"🔑 Different conversations, same last turn -> same key: "
+          f"{ResponseCache.make_key('and tomorrow?', first) == ResponseCache.make_key('and tomorrow?', second)}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'responses.db')
+        persistent = ResponseCache(db_path=db_path, default_ttl=0.2)
+        key = ResponseCache.make_key("What time is the meeting?", [])
+        persistent.put(key, "The meeting is at ten.")
+        persistent.put(ResponseCache.make_key("Tell me a joke", []), "Why did the robot cross the road?", ttl=60)
+        persistent.writer.flush()
+        persistent.close()
+
+        reopened = ResponseCache(db_path=db_path, default_ttl=0.2)
+        joke = reopened.get(ResponseCache.make_key("tell me a joke!", []))
+        time.sleep(0.25)
+        expired = reopened.get(key)
+        print(f"💾 After restart: normalized hit -> {joke!r}; short-TTL entry -> {expired!r}")
+        reopened.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+🧩 GEM OS - ROVER Word Alignment
+Aligns the hypotheses of several ASR engines into a word transition network with a
+NumPy edit-distance DP and votes slot by slot, so the consensus keeps word order.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ASR_HYPOTHESES_CORPUS = Path("data/asr_hypotheses.json")
+
+_PUNCTUATION = '.,!?;:"\'()[]…'
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase words with surrounding punctuation stripped"""
+    words = (word.strip(_PUNCTUATION) for word in text.lower().split())
+    return [word for word in words if word]
+
+
+def edit_distance_matrix(substitution: np.ndarray, deletion: np.ndarray, insertion: np.ndarray) -> np.ndarray:
+    """Full DP table for aligning ``n`` reference slots with ``m`` hypothesis words.
+
+    ``substitution`` is (n, m), ``deletion`` (n,) and ``insertion`` (m,). Each row is
+    computed with array ops: substitutions and deletions come from the previous row,
+    and the left-to-right insertion chain becomes a running minimum after subtracting
+    the cumulative insertion cost.
+    """
+    n, m = substitution.shape
+    insertion_cost = np.concatenate(([0.0], np.cumsum(insertion)))
+    table = np.empty((n + 1, m + 1), dtype=np.float64)
+    table[0] = insertion_cost
+    for i in range(1, n + 1):
+        previous = table[i - 1]
+        row = np.empty(m + 1, dtype=np.float64)
+        row[0] = previous[0] + deletion[i - 1]
+        row[1:] = np.minimum(previous[:-1] + substitution[i - 1], previous[1:] + deletion[i - 1])
+        # row[j] = min_k(row[k] + insertion cost k..j) == cummin(row - cost) + cost
+        table[i] = np.minimum.accumulate(row - insertion_cost) + insertion_cost
+    return table
+
+
+def word_edit_distance(reference: Sequence[str], hypothesis: Sequence[str]) -> int:
+    """Levenshtein distance over words"""
+    if not reference or not hypothesis:
+        return max(len(reference), len(hypothesis))
+    vocabulary = {word: index for index, word in enumerate(set(reference) | set(hypothesis))}
+    ref_ids = np.array([vocabulary[word] for word in reference])
+    hyp_ids = np.array([vocabulary[word] for word in hypothesis])
+    substitution = (ref_ids[:, None] != hyp_ids[None, :]).astype(np.float64)
+    table = edit_distance_matrix(substitution, np.ones(len(reference)), np.ones(len(hypothesis)))
+    return int(table[-1, -1])
+
+
+class WordLattice:
+    """Word transition network built by aligning hypotheses one at a time.
+
+    Each slot maps word -> accumulated vote weight; ``''`` is the null (skip) arc.
+    """
+
+    def __init__(self):
+        self.slots: List[Dict[str, float]] = []
+        self.total_weight = 0.0
+        self._surface: Dict[str, str] = {}
+
+    def _remember_surface(self, text: str):
+        for raw in text.split():
+            word = raw.lower().strip(_PUNCTUATION)
+            if word and word not in self._surface:
+                self._surface[word] = raw.strip(_PUNCTUATION)
+
+    def add(self, text: str, weight: float):
+        """Align ``text`` against the network and add its votes"""
+        words = normalize_words(text)
+        self._remember_surface(text)
+        if not self.slots:
+            self.slots = [{word: weight} for word in words]
+            self.total_weight = weight
+            return
+
+        # Cost of landing a word in a slot is zero if the slot already has it
+        vocabulary: Dict[str, int] = {}
+        for slot in self.slots:
+            for word in slot:
+                vocabulary.setdefault(word, len(vocabulary))
+        for word in words:
+            vocabulary.setdefault(word, len(vocabulary))
+        membership = np.zeros((len(self.slots), len(vocabulary)), dtype=bool)
+        for index, slot in enumerate(self.slots):
+            membership[index, [vocabulary[word] for word in slot]] = True
+        hyp_ids = np.array([vocabulary[word] for word in words], dtype=np.int64)
+
+        substitution = (~membership[:, hyp_ids]).astype(np.float64) if len(words) else \
+            np.zeros((len(self.slots), 0))
+        has_null = np.array(['' in slot for slot in self.slots])
+        deletion = np.where(has_null, 0.0, 1.0)
+        table = edit_distance_matrix(substitution, deletion, np.ones(len(words)))
+
+        # Backtrace into (slot, word) pairs; None marks a gap on that side
+        pairs: List[Tuple[Optional[int], Optional[int]]] = []
+        i, j = len(self.slots), len(words)
+        while i > 0 or j > 0:
+            if i > 0 and j > 0 and table[i, j] == table[i - 1, j - 1] + substitution[i - 1, j - 1]:
+                pairs.append((i - 1, j - 1))
+                i, j = i - 1, j - 1
+            elif i > 0 and table[i, j] == table[i - 1, j] + deletion[i - 1]:
+                pairs.append((i - 1, None))
+                i -= 1
+            else:
+                pairs.append((None, j - 1))
+                j -= 1
+        pairs.reverse()
+
+        slots = []
+        for slot_index, word_index in pairs:
+            if slot_index is None:
+                # Inserted word: earlier hypotheses skipped this slot
+                slot = {'': self.total_weight}
+            else:
+                slot = self.slots[slot_index]
+            word = '' if word_index is None else words[word_index]
+            slot[word] = slot.get(word, 0.0) + weight
+            slots.append(slot)
+        self.slots = slots
+        self.total_weight += weight
+
+    def best_path(self) -> str:
+        """Highest-voted arc per slot, skipping slots where the null arc wins"""
+        words = []
+        for slot in self.slots:
+            word = max(slot.items(), key=lambda item: (item[1], item[0] != ''))[0]
+            if word:
+                words.append(self._surface.get(word, word))
+        return ' '.join(words)
+
+
+def rover_combine(hypotheses: Sequence[Tuple[str, float]]) -> str:
+    """ROVER consensus over ``(text, weight)`` hypotheses (aligned heaviest first)"""
+    lattice = WordLattice()
+    for text, weight in sorted(hypotheses, key=lambda item: item[1], reverse=True):
+        if text.strip():
+            lattice.add(text, weight)
+    return lattice.best_path()
+
+
+def _bag_of_words(hypotheses: Sequence[Tuple[str, float]]) -> str:
+    """The previous ensemble_decision consensus: 10 most-weighted words, order lost"""
+    words_count: Dict[str, float] = {}
+    for text, weight in hypotheses:
+        for word in text.lower().split():
+            words_count[word] = words_count.get(word, 0.0) + weight
+    ranked = sorted(words_count.items(), key=lambda item: item[1], reverse=True)
+    return ' '.join(word for word, _ in ranked[:10])
+
+
+def _python_edit_distance(reference: Sequence[str], hypothesis: Sequence[str]) -> int:
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1]
+
+
+def load_corpus(path: Path = ASR_HYPOTHESES_CORPUS) -> List[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['utterances']
+
+
+def main():
+    """Speed/accuracy benchmark over the multi-engine hypothesis corpus"""
+    engine_accuracy = {'whisper': 0.95, 'google': 0.90, 'sphinx': 0.75}
+    corpus = load_corpus()
+
+    print("🧩 GEM OS - ROVER consensus benchmark")
+    print("=" * 50)
+
+    strategies = {
+        'best single engine': lambda hyps: max(hyps, key=lambda item: item[1])[0],
+        'bag of words (old)': _bag_of_words,
+        'ROVER alignment': rover_combine,
+    }
+    warmup = [(text, confidence) for text, confidence in corpus[0]['hypotheses'].values()]
+    for combine in strategies.values():
+        combine(warmup)
+
+    errors = {name: 0 for name in strategies}
+    timings = {name: 0.0 for name in strategies}
+    reference_words = 0
+
+    for utterance in corpus:
+        reference = normalize_words(utterance['reference'])
+        reference_words += len(reference)
+        hypotheses = [(text, confidence * engine_accuracy[engine])
+                      for engine, (text, confidence) in utterance['hypotheses'].items()]
+        for name, combine in strategies.items():
+            start_time = time.perf_counter()
+            output = combine(hypotheses)
+            timings[name] += time.perf_counter() - start_time
+            errors[name] += word_edit_distance(reference, normalize_words(output))
+
+    print(f"📚 {len(corpus)} utterances, {reference_words} reference words")
+    for name in strategies:
+        print(f"   {name}: WER {errors[name] / reference_words * 100:.1f}% | "
+              f"{timings[name] / len(corpus) * 1e6:.0f}µs per utterance")
+
+    # DP kernel: NumPy rows against a pure-Python double loop on longer inputs
+    rng = np.random.default_rng(0)
+    long_reference = [str(word) for word in rng.integers(0, 50, 200)]
+    long_hypothesis = [str(word) for word in rng.integers(0, 50, 200)]
+    for name, distance in (('pure Python DP', _python_edit_distance), ('NumPy row DP', word_edit_distance)):
+        start_time = time.perf_counter()
+        for _ in range(10):
+            distance(long_reference, long_hypothesis)
+        print(f"⏱️ {name} (200x200 words): {(time.perf_counter() - start_time) / 10 * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+🧭 GEM OS - Semantic Response Cache
+Catches rephrasings of the same question ("what's the capital of France" / "tell me
+France's capital") with a local hashing-trick TF-IDF embedding and a vectorized cosine
+nearest-neighbour search. Questions whose answer depends on time or state are never cached.
+"""
+
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+VOICE_QUERY_LOG = Path("data/voice_query_log.json")
+
+# Function words in English and pt-BR (accent-folded) that carry no meaning for matching.
+# Polarity words ("on"/"off", "nao") are deliberately kept - see POLARITY_WORDS.
+STOPWORDS = frozenset('''
+    a an the is are was were be been am do does did to of in at for with about from by as and or
+    what whats which who whom whose how why where when can could would should will shall may
+    might must please tell me my i you your we our us let lets give show know want need some any
+    just really
+    o os as um uma uns umas de do da dos das no na nos nas em por para com sobre que qual quais
+    quem como onde quando porque e ou eu meu minha voce seu sua pode poderia
+    quero queria preciso favor diga fale mostre sabe sao ser esta estou
+'''.split())
+
+# Two queries only match if they agree on these words (and on every number). Synonyms and
+# pt-BR conjugations share a canonical form, so "enable" and "ligue" both count as "on".
+POLARITY_WORDS = {word: canonical for canonical, words in {
+    'on': 'on enable activate ligar ligue ligo ativar ative ativo',
+    'off': 'off disable deactivate desligar desligue desligo desativar desative desativo',
+    'not': 'not no never without nao nunca sem',
+    'start': 'start begin iniciar inicie comecar',
+    'stop': 'stop end parar pare terminar',
+    'open': 'open abrir abra abro',
+    'close': 'close fechar feche fecho',
+    'up': 'up increase raise bigger larger louder more aumentar aumente mais maior',
+    'down': 'down decrease lower smaller quieter less diminuir diminua menos menor',
+    'next': 'next proximo',
+    'previous': 'previous anterior',
+}.items() for word in words.split()}
+
+# The question word decides what is asked ("where is" vs "what is the Eiffel Tower"), so
+# it joins the signature too. A request without one ("tell me France's capital") asks "what".
+QUESTION_WORDS = {word: canonical for canonical, words in {
+    'what': 'what whats which que qual quais',
+    'who': 'who whom whose quem',
+    'how': 'how como',
+    'why': 'why porque',
+    'where': 'where onde',
+    'when': 'when quando',
+}.items() for word in words.split()}
+
+# Answers to these change with time or with device/user state
+VOLATILE_PATTERN = re.compile(
+    r"\b(time|date|day|today|tonight|tomorrow|yesterday|now|current(ly)?|latest|recent|news|weather|"
+    r"forecast|temperature|battery|volume|status|remind(er)?|timer|alarm|schedule|calendar|"
+    r"price|stock|score|traffic|"
+    r"hora|horas|data|dia|hoje|amanh[ãa]|ontem|agora|atual|[úu]ltim[ao]s?|not[íi]cias|tempo|clima|"
+    r"previs[ãa]o|temperatura|bateria|volume|lembrete|alarme|agenda|pre[çc]o|tr[âa]nsito)\b"
+)
+
+# Pronouns that point back into the conversation - the question isn't standalone
+CONTEXT_PATTERN = re.compile(
+    r"\b(it|that|this|those|these|they|them|he|she|his|her|again|ele|ela|eles|elas|isso|isto|"
+    r"aquilo|dele|dela|de novo)\b"
+)
+
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents ("você" -> "voce")"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", _fold(text))
+
+
+def is_cacheable(prompt: str) -> bool:
+    """Standalone questions whose answer doesn't depend on time or state"""
+    lowered = prompt.lower()
+    return not VOLATILE_PATTERN.search(lowered) and not CONTEXT_PATTERN.search(lowered)
+
+
+class HashingEmbedder:
+    """Hashing-trick features: content words, word bigrams and character trigrams.
+
+    ``embed`` returns sublinear term frequencies; ``SemanticCache`` applies IDF from
+    its own document frequencies, so no vocabulary or model file is needed.
+    """
+
+    def __init__(self, dim: int = 2048):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> int:
+        return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=4).digest(), 'little') % self.dim
+
+    def features(self, text: str) -> Tuple[List[str], FrozenSet[str]]:
+        """Hashable features plus the signature (polarity, numbers, question word) that must match exactly"""
+        tokens = [POLARITY_WORDS.get(token, token) for token in tokenize(text)]
+        questions = {f"?{QUESTION_WORDS[token]}" for token in tokens if token in QUESTION_WORDS} or {'?what'}
+        signature = frozenset(token for token in tokens if token in POLARITY_WORDS or token.isdigit()) | questions
+        content = [token for token in tokens if token not in STOPWORDS]
+        features = [f"w:{token}" for token in content]
+        features += [f"b:{first}_{second}" for first, second in zip(content, content[1:])]
+        for token in content:
+            padded = f"^{token}$"
+            features += [f"c:{padded[index:index + 3]}" for index in range(len(padded) - 2)]
+        return features, signature
+
+    def embed(self, text: str) -> Tuple[np.ndarray, FrozenSet[str]]:
+        """Dense sublinear term-frequency vector and signature"""
+        features, signature = self.features(text)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in features:
+            vector[self._bucket(feature)] += 1.0
+        np.log1p(vector, out=vector)
+        return vector, signature
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of answers over TF-IDF embeddings.
+
+    Embeddings live in one preallocated ``capacity x dim`` matrix; a lookup is a single
+    matrix-vector product restricted to live entries of the same ``scope`` and signature
+    (polarity words, numbers and question word). A hit needs cosine similarity of at least ``threshold``. Entries expire
+    after ``ttl`` seconds and the least recently used entry is evicted when full.
+    """
+
+    def __init__(self, capacity: int = 1000, threshold: float = 0.8, dim: int = 2048,
+                 ttl: float = 24 * 3600.0):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.embedder = HashingEmbedder(dim)
+
+        self._tf = np.zeros((capacity, dim), dtype=np.float32)
+        self._weighted: Optional[np.ndarray] = None  # Live rows' TF-IDF, normalized; rebuilt after changes
+        self._weighted_slots = np.zeros(0, dtype=np.int64)
+        self._df = np.zeros(dim, dtype=np.float32)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * capacity
+
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'uncacheable': 0,
+            'stores': 0,
+            'evictions': 0,
+            'lookup_time': 0.0
+        }
+
+    def _idf(self) -> np.ndarray:
+        documents = float(self._live.sum())
+        return np.log((documents + 1.0) / (self._df + 1.0)) + 1.0
+
+    def _reweight(self):
+        self._weighted_slots = np.flatnonzero(self._live)
+        weighted = self._tf[self._weighted_slots] * self._idf()
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        np.divide(weighted, norms, out=weighted, where=norms > 0)
+        self._weighted = weighted
+
+    def _remove(self, slot: int):
+        self._df -= self._tf[slot] > 0
+        self._tf[slot] = 0.0
+        self._live[slot] = False
+        self._entries[slot] = None
+        self._weighted = None
+
+    def lookup(self, prompt: str, scope: str = '') -> Optional[Dict[str, Any]]:
+        """Closest cached answer as ``{'response', 'prompt', 'similarity'}``, or None"""
+        if not is_cacheable(prompt):
+            self.metrics['uncacheable'] += 1
+            return None
+        start_time = time.perf_counter()
+        try:
+            now = time.time()
+            for slot in np.flatnonzero(self._live & (self._expires <= now)):
+                self._remove(slot)
+            if not self._live.any():
+                self.metrics['misses'] += 1
+                return None
+            if self._weighted is None:
+                self._reweight()
+
+            vector, signature = self.embedder.embed(prompt)
+            vector *= self._idf()
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                self.metrics['misses'] += 1
+                return None
+            similarities = self._weighted @ (vector / norm)
+
+            for row in np.argsort(similarities)[::-1][:5]:
+                if similarities[row] < self.threshold:
+                    break
+                slot = self._weighted_slots[row]
+                entry = self._entries[slot]
+                if entry['scope'] != scope or entry['signature'] != signature:
+                    continue
+                self._last_used[slot] = now
+                self.metrics['hits'] += 1
+                return {'response': entry['response'], 'prompt': entry['prompt'],
+                        'similarity': float(similarities[row])}
+            self.metrics['misses'] += 1
+            return None
+        finally:
+            self.metrics['lookup_time'] += time.perf_counter() - start_time
+
+    def store(self, prompt: str, response: str, scope: str = '', ttl: Optional[float] = None) -> bool:
+        """Cache an answer; volatile or context-dependent prompts are skipped"""
+        if not response or not is_cacheable(prompt):
+            return False
+        vector, signature = self.embedder.embed(prompt)
+        if not vector.any():
+            return False
+
+        free = np.flatnonzero(~self._live)
+        if len(free):
+            slot = int(free[0])
+        else:
+            slot = int(np.argmin(self._last_used))
+            self._remove(slot)
+            self.metrics['evictions'] += 1
+
+        now = time.time()
+        self._tf[slot] = vector
+        self._df += vector > 0
+        self._live[slot] = True
+        self._expires[slot] = now + (self.ttl if ttl is None else ttl)
+        self._last_used[slot] = now
+        self._entries[slot] = {'prompt': prompt, 'response': response, 'scope': scope, 'signature': signature}
+        self._weighted = None
+        self.metrics['stores'] += 1
+        return True
+
+    def clear(self):
+        for slot in np.flatnonzero(self._live):
+            self._remove(slot)
+
+    def __len__(self) -> int:
+        return int(self._live.sum())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get hit-rate metrics"""
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        return {
+            'entries': len(self),
+            'hits': self.metrics['hits'],
+            'misses': self.metrics['misses'],
+            'uncacheable': self.metrics['uncacheable'],
+            'stores': self.metrics['stores'],
+            'evictions': self.metrics['evictions'],
+            'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0,
+            'avg_lookup_ms': self.metrics['lookup_time'] / lookups * 1000 if lookups else 0.0
+        }
+
+
+def load_query_log(path: Path = VOICE_QUERY_LOG) -> List[Dict[str, str]]:
+    """Recorded voice queries, each labelled with the intent it asks about"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['queries']
+
+
+def main():
+    """Replay the recorded query log: exact-match vs semantic hit rate and false hits"""
+    log = load_query_log()
+    print("🧭 GEM OS - Semantic cache benchmark")
+    print("=" * 50)
+
+    exact: Dict[str, str] = {}
+    exact_hits = 0
+    cache = SemanticCache()
+    wrong = []
+    for entry in log:
+        query, intent = entry['query'], entry['intent']
+        normalized = ' '.join(tokenize(query))
+        if normalized in exact:
+            exact_hits += 1
+        elif is_cacheable(query):
+            exact[normalized] = intent
+
+        match = cache.lookup(query)
+        if match is None:
+            cache.store(query, intent)
+        elif match['response'] != intent:
+            wrong.append((query, match['prompt'], match['similarity']))
+
+    metrics = cache.get_metrics()
+    print(f"📜 {len(log)} queries, {metrics['uncacheable']} volatile/contextual (never cached)")
+    print(f"🔤 exact match: {exact_hits / len(log) * 100:.0f}% hit rate")
+    print(f"🧭 semantic: {metrics['hits'] / len(log) * 100:.0f}% hit rate | wrong answers: {len(wrong)} | "
+          f"avg lookup {metrics['avg_lookup_ms']:.3f}ms")
+    for query, matched, similarity in wrong:
+        print(f"   ⚠️ '{query}' matched '{matched}' ({similarity:.2f})")
+
+    # Lookup cost with a full index
+    full = SemanticCache(capacity=1000)
+    for number in range(1000):
+        full.store(f"how do I configure accessibility option number {number} for the reader", "answer")
+    start_time = time.perf_counter()
+    for _ in range(100):
+        full.lookup("how can I configure the accessibility option for my screen reader")
+    print(f"⚡ Lookup over 1000 entries: {(time.perf_counter() - start_time) / 100 * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+✂️ GEM OS - Streaming Sentence Segmentation
+Turns a stream of model output chunks into speakable sentences. Each character is
+scanned once, abbreviations (per language: English or pt-BR), initials, decimals and
+list markers don't end a sentence, and the first clause can be released early so
+speech starts before the first full sentence has arrived.
+"""
+
+import os
+import re
+import time
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+DEFAULT_LANGUAGE = os.getenv('GEM_LANGUAGE', 'en')
+
+# Lowercase, without the trailing period. 'etc' is left out on purpose: it usually ends a sentence.
+ABBREVIATIONS = {
+    'en': {
+        'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'mt', 'vs', 'approx', 'dept', 'inc',
+        'ltd', 'corp', 'jan', 'feb', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov',
+        'dec', 'mon', 'tue', 'thu', 'fri'
+    },
+    'pt': {
+        'sr', 'sra', 'srta', 'dr', 'dra', 'prof', 'profa', 'eng', 'av', 'nº', 'núm', 'pág', 'pp',
+        'exa', 'obs', 'cia', 'ltda', 'dept', 'depto', 'máx', 'aprox', 'tel', 'séc', 'fev', 'abr',
+        'mai', 'ago', 'dez', 'seg', 'qua', 'qui', 'sáb'
+    }
+}
+
+# Also ordinary words ("no", "set", "ter"), so they only count as abbreviations when a
+# number follows ("No. 5", "p. 12"); a lowercase word after any period already keeps
+# the sentence going
+AMBIGUOUS_ABBREVIATIONS = {
+    'en': {'no', 'co', 'est', 'fig', 'vol', 'mar', 'wed', 'sat', 'sun'},
+    'pt': {'r', 'n', 'p', 'ex', 'min', 'cap', 'art', 'vol', 'set', 'out', 'ter', 'sex', 'dom'}
+}
+
+SENTENCE_END = '.?!…'
+CLAUSE_END = ',;:'
+CLOSERS = '"\')]}»”’'
+
+
+class SentenceSegmenter:
+    """Incremental sentence boundary detector.
+
+    ``feed`` takes the next chunk and returns the sentences it completed; ``flush``
+    returns whatever is left at the end of the stream. Only unemitted text is kept and
+    each character is examined once, so a long answer costs O(n) overall.
+
+    A period ends a sentence only when it is followed by whitespace, the next word
+    doesn't start in lowercase, and the word before it isn't an abbreviation of
+    ``language`` ('en' or 'pt', locale codes like 'pt-BR' work too), a single initial or
+    a list number. Line breaks always end a sentence. Until the first
+    sentence is out, a clause (``, ; :``) at least ``first_clause_chars`` long is emitted
+    on its own; a sentence running past ``max_chars`` is broken at the next space.
+    """
+
+    def __init__(self, language: str = DEFAULT_LANGUAGE, first_clause_chars: Optional[int] = 40,
+                 max_chars: int = 300):
+        self.language = language.split('-')[0].lower()
+        self.abbreviations = ABBREVIATIONS.get(self.language, ABBREVIATIONS['en'])
+        self.ambiguous_abbreviations = AMBIGUOUS_ABBREVIATIONS.get(self.language, AMBIGUOUS_ABBREVIATIONS['en'])
+        self.first_clause_chars = first_clause_chars
+        self.max_chars = max_chars
+        self.reset()
+
+    def reset(self):
+        """Forget buffered text and start a new response"""
+        self._buffer = ""
+        self._pos = 0  # Next character to examine
+        self._emitted = 0
+
+    def _is_abbreviation(self, end: int, next_char: str) -> bool:
+        """Whether the word ending right before the period at ``end`` is an abbreviation"""
+        start = end
+        while start > 0 and (self._buffer[start - 1].isalnum() or self._buffer[start - 1] in '.º'):
+            start -= 1
+        word = self._buffer[start:end]
+        if not word:
+            return False
+        if '.' in word:
+            return True  # e.g., i.e., U.S.
+        if len(word) == 1 and word.isalpha() and word.isupper():
+            return True  # Initial: "J. R. R. Tolkien"
+        if word.isdigit() and not self._buffer[:start].strip():
+            return True  # List marker: "1. Primeiro passo"
+        word = word.lower()
+        if word in self.ambiguous_abbreviations:
+            return next_char.isdigit()
+        return word in self.abbreviations
+
+    def _boundary(self, index: int) -> Optional[int]:
+        """End (exclusive) of a sentence whose punctuation starts at ``index``.
+
+        Returns None when it isn't a boundary, -1 when more text is needed to decide.
+        """
+        buffer = self._buffer
+        char = buffer[index]
+        end = index + 1
+        # A run of punctuation ("?!", "...") and closing quotes/brackets stays with the sentence
+        while end < len(buffer) and buffer[end] in SENTENCE_END + CLOSERS:
+            end += 1
+        if end >= len(buffer):
+            return -1
+        if not buffer[end].isspace():
+            return None  # "3.14", "gem.os", "U.S"
+        if char in '.…':
+            following = end
+            while following < len(buffer) and buffer[following] in ' \t':
+                following += 1
+            if following >= len(buffer):
+                return -1
+            if end == index + 1 and char == '.' and self._is_abbreviation(index, buffer[following]):
+                return None
+            # A lowercase continuation ("Yes... almost", "e.g. the") means it wasn't a sentence end
+            if buffer[following].islower():
+                return None
+        return end
+
+    def _take(self, end: int) -> Optional[str]:
+        sentence = self._buffer[:end].strip()
+        self._buffer = self._buffer[end:]
+        self._pos -= end
+        if sentence:
+            self._emitted += 1
+            return sentence
+        return None
+
+    def feed(self, text: str) -> List[str]:
+        """Add a chunk of streamed text; returns the sentences it completed"""
+        self._buffer += text
+        sentences = []
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+            end = None
+            if char in SENTENCE_END:
+                end = self._boundary(self._pos)
+                if end == -1:
+                    break  # Wait for the next chunk to decide
+            elif char == '\n':
+                end = self._pos + 1
+            elif char in CLAUSE_END and self._emitted == 0 and self.first_clause_chars is not None \
+                    and self._pos >= self.first_clause_chars:
+                if self._pos + 1 >= len(self._buffer):
+                    break
+                if self._buffer[self._pos + 1].isspace():
+                    end = self._pos + 1
+            elif self._pos >= self.max_chars and char.isspace():
+                end = self._pos + 1
+
+            if end is None:
+                self._pos += 1
+                continue
+            self._pos = end
+            sentence = self._take(end)
+            if sentence:
+                sentences.append(sentence)
+        return sentences
+
+    def flush(self) -> List[str]:
+        """End of stream: return the remaining text, if any"""
+        sentences = self.feed("")
+        self._pos = len(self._buffer)
+        sentence = self._take(len(self._buffer))
+        if sentence:
+            sentences.append(sentence)
+        self.reset()
+        return sentences
+
+
+def iter_sentences(chunks: Iterable[str], **options) -> Iterator[str]:
+    """Re-chunk a synchronous text stream into sentences"""
+    segmenter = SentenceSegmenter(**options)
+    for chunk in chunks:
+        yield from segmenter.feed(chunk)
+    yield from segmenter.flush()
+
+
+async def aiter_sentences(chunks: AsyncIterable[str], **options) -> AsyncIterator[str]:
+    """Re-chunk an asynchronous text stream into sentences"""
+    segmenter = SentenceSegmenter(**options)
+    async for chunk in chunks:
+        for sentence in segmenter.feed(chunk):
+            yield sentence
+    for sentence in segmenter.flush():
+        yield sentence
+
+
+def _regex_resplit(chunks: Iterable[str]) -> Iterator[str]:
+    """The previous approach: re-split the whole buffer on every chunk"""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        sentences = re.split(r'(?<=[.?!])\s*', buffer)
+        if len(sentences) > 1:
+            for sentence in sentences[:-1]:
+                if sentence.strip():
+                    yield sentence.strip()
+            buffer = sentences[-1]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def main():
+    """Compare boundaries and cost against regex re-splitting"""
+    answers = {
+        'pt': "O Dr. Silva chega às 14h, e a consulta custa R$ 3.50 na Av. Paulista. Vai ter. "
+              "Veja a p. 12 do manual.\n1. Abra o app.\n2. Diga 'gemini'. ",
+        'en': "Mr. Smith, e.g. the new client, asked about version 2.5 of GEM OS! Is it ready? "
+              "Yes... almost. The answer is no. See No. 5 in the list. ",
+    }
+    chunks = {language: [answer[index:index + 7] for index in range(0, len(answer), 7)]
+              for language, answer in answers.items()}
+
+    print("✂️ GEM OS - Streaming sentence segmentation")
+    print("=" * 50)
+    for language in answers:
+        print(f"Regex re-split ({language}):")
+        for sentence in _regex_resplit(chunks[language]):
+            print(f"   | {sentence}")
+        print(f"Incremental segmenter ({language}):")
+        for sentence in iter_sentences(chunks[language], language=language):
+            print(f"   | {sentence}")
+
+    # Cost on a long answer where the regex keeps re-splitting an unfinished tail
+    long_answer = "Passo um, configure o microfone, ajuste o volume, teste a saída e confirme " * 200 + "."
+    long_chunks = [long_answer[index:index + 4] for index in range(0, len(long_answer), 4)]
+    for name, function in (("regex re-split", _regex_resplit), ("segmenter", iter_sentences)):
+        start_time = time.perf_counter()
+        for _ in range(5):
+            list(function(long_chunks))
+        print(f"⏱️ {name}: {(time.perf_counter() - start_time) / 5 * 1000:.2f}ms for {len(long_answer)} chars")
+
+    # First speakable text: characters consumed before the first emission
+    segmenter = SentenceSegmenter('pt')
+    for consumed, chunk in enumerate(chunks['pt'], start=1):
+        first = segmenter.feed(chunk)
+        if first:
+            print(f"⚡ First chunk to speak after {consumed * 7} chars: '{first[0]}'")
+            break
+
+
+if __name__ == "__main__":
+    main()
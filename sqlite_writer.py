@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+🗄️ GEM OS - Background SQLite Writer
+One long-lived WAL connection on its own thread, fed by a queue. Writes are batched
+into a single transaction and committed when a batch fills up or a time limit passes,
+so callers on the event loop never wait for the disk.
+"""
+
+import atexit
+import itertools
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Objects to close at interpreter exit, held weakly so registering doesn't keep them alive
+_exit_closers: "weakref.WeakValueDictionary[int, Any]" = weakref.WeakValueDictionary()
+_exit_order = itertools.count()
+
+
+def close_at_exit(resource: Any):
+    """Call ``resource.close()`` at exit if it is still alive then.
+
+    Resources are closed newest first, so a store that flushes into its own writer
+    closes before that writer does.
+    """
+    _exit_closers[next(_exit_order)] = resource
+
+
+@atexit.register
+def _close_registered():
+    for order in sorted(_exit_closers.keys(), reverse=True):
+        resource = _exit_closers.get(order)
+        if resource is None:
+            continue
+        try:
+            resource.close()
+        except Exception as e:
+            logger.error(f"Closing {resource!r} at exit failed: {e}")
+
+
+def connect(db_path: str, timeout: float = 5.0) -> sqlite3.Connection:
+    """Open a connection with the WAL settings every GEM OS store uses.
+
+    WAL lets readers keep working while the background writer commits.
+    """
+    conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class BackgroundSQLiteWriter:
+    """Queue-fed, batching SQLite writer.
+
+    ``execute`` never touches the database on the calling thread: statements are
+    queued and applied by the writer thread, consecutive identical statements
+    through ``executemany``. A batch is committed once it holds ``batch_size``
+    statements or its oldest statement has waited ``flush_interval`` seconds.
+    ``submit`` runs an arbitrary callable on the writer connection, and ``flush``
+    waits until everything queued so far is committed.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 64, flush_interval: float = 0.5,
+                 max_queue: int = 10000, name: str = "sqlite-writer"):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+
+        self.metrics = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped': 0,
+            'errors': 0,
+            'commit_latencies': []
+        }
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        close_at_exit(self)
+
+    def execute(self, sql: str, params: Sequence[Any] = (), block: bool = False) -> bool:
+        """Queue a write. Returns False if the queue is full (unless ``block``) or the writer is closed"""
+        if self._closed:
+            return False
+        try:
+            self._queue.put((sql, tuple(params), time.time()), block=block)
+        except queue.Full:
+            self.metrics['dropped'] += 1
+            return False
+        self.metrics['enqueued'] += 1
+        return True
+
+    def submit(self, function: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Run ``function(connection)`` on the writer thread after the queued writes"""
+        future: Future = Future()
+        if self._closed:
+            future.set_exception(RuntimeError("SQLite writer is closed"))
+            return future
+        self._queue.put((function, future, time.time()))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued before this call is committed"""
+        try:
+            self.submit(lambda conn: None).result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending writes, stop the thread and close the connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        conn = connect(self.db_path)
+        batch: List = []
+        batch_started = 0.0
+        try:
+            while True:
+                timeout = None
+                if batch:
+                    timeout = max(0.0, self.flush_interval - (time.time() - batch_started))
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is None:
+                    # Time limit reached for the open batch
+                    self._commit(conn, batch)
+                    batch = []
+                    continue
+
+                if item is _STOP:
+                    self._commit(conn, batch)
+                    # Drain anything that raced with close()
+                    while True:
+                        try:
+                            late = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if late is not _STOP:
+                            self._commit(conn, [late])
+                    return
+
+                if callable(item[0]):
+                    # Callables see every earlier write already committed
+                    self._commit(conn, batch)
+                    batch = []
+                    self._commit(conn, [item])
+                    continue
+
+                if not batch:
+                    batch_started = item[2]
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._commit(conn, batch)
+                    batch = []
+        finally:
+            conn.close()
+
+    def _apply(self, conn: sqlite3.Connection, batch: List, results: List) -> int:
+        """Run a batch inside the current transaction; returns the number of row writes.
+
+        Callable results are appended to ``results`` as ``(future, value)`` - the caller
+        resolves them once the transaction has committed.
+        """
+        writes = 0
+        index = 0
+        while index < len(batch):
+            item = batch[index]
+            if callable(item[0]):
+                function, future = item[0], item[1]
+                if not future.done():  # Already failed in an earlier attempt
+                    try:
+                        results.append((future, function(conn)))
+                    except Exception as e:
+                        conn.rollback()
+                        future.set_exception(e)
+                index += 1
+                continue
+            # Group consecutive rows for the same statement
+            sql = item[0]
+            end = index
+            while end < len(batch) and batch[end][0] == sql:
+                end += 1
+            conn.executemany(sql, [row[1] for row in batch[index:end]])
+            writes += end - index
+            index = end
+        return writes
+
+    def _commit(self, conn: sqlite3.Connection, batch: List):
+        if not batch:
+            return
+        results: List = []
+        try:
+            writes = self._apply(conn, batch, results)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"SQLite batch of {len(batch)} failed ({e}), retrying one by one")
+            # Isolate the bad statement so the rest of the batch still lands; callables
+            # whose work was rolled back run again
+            writes = 0
+            results = []
+            for item in batch:
+                item_results: List = []
+                try:
+                    writes += self._apply(conn, [item], item_results)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    self.metrics['errors'] += 1
+                    logger.error(f"SQLite write failed: {e}")
+                    for future, _ in item_results:
+                        future.set_exception(e)
+                    continue
+                results += item_results
+        # Only now is the callables' work durable
+        for future, value in results:
+            future.set_result(value)
+
+        now = time.time()
+        self.metrics['written'] += writes
+        self.metrics['batches'] += 1
+        latencies = self.metrics['commit_latencies']
+        latencies.extend(now - item[2] for item in batch)
+        if len(latencies) > 1000:
+            del latencies[:-1000]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get writer performance metrics"""
+        latencies = sorted(self.metrics['commit_latencies'])
+        return {
+            'pending': self.pending,
+            'enqueued': self.metrics['enqueued'],
+            'written': self.metrics['written'],
+            'batches': self.metrics['batches'],
+            'dropped': self.metrics['dropped'],
+            'errors': self.metrics['errors'],
+            'avg_batch_size': self.metrics['written'] / self.metrics['batches'] if self.metrics['batches'] else 0.0,
+            'p99_commit_latency_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0
+        }
+
+
+def _percentile(samples: List[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, int(len(ordered) * percentile) - 1)]
+
+
+def main():
+    """Benchmark per-call connect/commit against the background writer"""
+    rows = 2000
+    schema = '''
+        CREATE TABLE IF NOT EXISTS recognition_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            audio_hash TEXT, whisper_result TEXT, google_result TEXT, sphinx_result TEXT,
+            final_result TEXT, confidence_score REAL, processing_time REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    '''
+    insert = '''
+        INSERT INTO recognition_history
+        (audio_hash, whisper_result, google_result, sphinx_result,
+         final_result, confidence_score, processing_time)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    row = ('abc123', 'ligar a luz', 'ligar a luz', 'ligar luz', 'ligar a luz', 0.91, 0.42)
+
+    print("🗄️ GEM OS - SQLite write path benchmark")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'bench.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute(schema)
+        conn.close()
+
+        # Old path: connect, insert, commit, close on the caller's thread
+        call_latencies = []
+        start_time = time.perf_counter()
+        for _ in range(rows):
+            call_start = time.perf_counter()
+            conn = sqlite3.connect(db_path)
+            conn.execute(insert, row)
+            conn.commit()
+            conn.close()
+            call_latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start_time
+        print(f"🐢 connect-per-insert: {rows / elapsed:,.0f} rows/s | "
+              f"p99 caller latency {_percentile(call_latencies, 0.99) * 1000:.3f}ms")
+
+        writer = BackgroundSQLiteWriter(db_path, batch_size=64, flush_interval=0.25)
+        call_latencies = []
+        start_time = time.perf_counter()
+        for _ in range(rows):
+            call_start = time.perf_counter()
+            writer.execute(insert, row)
+            call_latencies.append(time.perf_counter() - call_start)
+        writer.flush()
+        elapsed = time.perf_counter() - start_time
+        metrics = writer.get_metrics()
+        writer.close()
+        print(f"🚀 background writer: {rows / elapsed:,.0f} rows/s | "
+              f"p99 caller latency {_percentile(call_latencies, 0.99) * 1000:.3f}ms | "
+              f"avg batch {metrics['avg_batch_size']:.0f} | "
+              f"p99 enqueue-to-commit {metrics['p99_commit_latency_ms']:.1f}ms")
+
+        conn = sqlite3.connect(db_path)
+        print(f"📊 Rows stored by both runs: {conn.execute('SELECT COUNT(*) FROM recognition_history').fetchone()[0]}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+📝 GEM OS - Streaming Transcription State
+Tracks partial hypotheses produced over a growing window of live audio and decides
+which words are stable enough to show (or act on) before the speaker finishes.
+"""
+
+from typing import Any, Dict, List
+
+
+class PartialHypothesisTracker:
+    """Local-agreement stability tracking for one utterance.
+
+    A word prefix is considered stable once ``agreement`` consecutive hypotheses
+    agree on it. A hypothesis that is identical to the previous one is flagged
+    ``is_stable`` - that is the signal used for early command dispatch.
+    """
+
+    def __init__(self, agreement: int = 2):
+        self.agreement = max(1, agreement)
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance"""
+        self._history: List[List[str]] = []
+        self.revision = 0
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return word.lower().strip('.,!?;:"\'')
+
+    def _stable_prefix(self) -> List[str]:
+        recent = self._history[-self.agreement:]
+        if len(recent) < self.agreement:
+            return []
+        prefix = []
+        for words in zip(*recent):
+            normalized = {self._normalize(word) for word in words}
+            if len(normalized) != 1:
+                break
+            prefix.append(words[-1])
+        return prefix
+
+    def update(self, text: str, confidence: float) -> Dict[str, Any]:
+        """Record a partial hypothesis and return the partial result to emit"""
+        words = text.split()
+        previous = self._history[-1] if self._history else None
+        self._history.append(words)
+        self.revision += 1
+
+        stable = self._stable_prefix()
+        is_stable = previous is not None and \
+            [self._normalize(w) for w in previous] == [self._normalize(w) for w in words]
+
+        return {
+            'text': text.strip(),
+            'stable_text': ' '.join(stable),
+            'unstable_text': ' '.join(words[len(stable):]),
+            'confidence': confidence,
+            'is_stable': is_stable,
+            'is_final': False,
+            'revision': self.revision
+        }
+
+    def finalize(self, text: str, confidence: float) -> Dict[str, Any]:
+        """Commit the endpoint result for the utterance"""
+        self.revision += 1
+        result = {
+            'text': text.strip(),
+            'stable_text': text.strip(),
+            'unstable_text': '',
+            'confidence': confidence,
+            'is_stable': True,
+            'is_final': True,
+            'revision': self.revision
+        }
+        self._history.clear()
+        return result
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+🧵 GEM OS - Speech-to-Text Worker Pool
+Runs Whisper inference off the asyncio event loop so emergency handling and audio
+capture keep running while a transcription is in progress.
+Each worker loads the model once; requests are bounded, deadline-aware and cancellable.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+# Per-worker model storage (per thread for the thread backend, per process otherwise)
+_worker_state = threading.local()
+
+
+class STTQueueFullError(Exception):
+    """Raised when the pool already has ``max_pending`` requests in flight"""
+
+
+class STTDeadlineExceeded(Exception):
+    """Raised when a request misses its deadline"""
+
+
+def _load_worker_model(model_name: str):
+    """Executor initializer - load the Whisper model once per worker"""
+    import whisper
+    _worker_state.model = whisper.load_model(model_name)
+
+
+def _run_transcription(audio, options: Dict[str, Any], deadline: Optional[float]) -> Dict[str, Any]:
+    """Worker entry point"""
+    if deadline is not None and time.time() > deadline:
+        # Expired while queued - don't burn inference time on stale audio
+        raise STTDeadlineExceeded("Request expired before a worker was free")
+    start_time = time.time()
+    result = _worker_state.model.transcribe(audio, **options)
+    result['inference_time'] = time.time() - start_time
+    return result
+
+
+def _warmup():
+    return getattr(_worker_state, 'model', None) is not None
+
+
+class STTWorkerPool:
+    """Dedicated execution service for Whisper transcription.
+
+    The thread backend relies on PyTorch releasing the GIL during inference; the
+    process backend sidesteps the GIL entirely at the cost of pickling audio.
+    """
+
+    def __init__(self, model_name: str = "base", workers: int = 1, max_pending: int = 4,
+                 use_processes: bool = False, default_timeout: float = 30.0):
+        self.model_name = model_name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.default_timeout = default_timeout
+        self.backend = 'process' if use_processes else 'thread'
+
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = executor_class(
+            max_workers=workers,
+            initializer=_load_worker_model,
+            initargs=(model_name,)
+        )
+        # Jobs admitted and not yet finished in a worker (a timed-out job still counts
+        # until its inference returns); released from the executor future's callback
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        self.metrics = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'expired': 0,
+            'cancelled': 0,
+            'failed': 0,
+            'inference_times': []
+        }
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def warmup(self) -> bool:
+        """Spawn every worker now so the first request doesn't pay for model loading"""
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *[loop.run_in_executor(self._executor, _warmup) for _ in range(self.workers)],
+            return_exceptions=True
+        )
+        return all(result is True for result in results)
+
+    async def transcribe(self, audio, timeout: Optional[float] = None, **options) -> Dict[str, Any]:
+        """Submit audio (float32 array or file path) and await the Whisper result.
+
+        Raises STTQueueFullError when the pool is saturated and STTDeadlineExceeded
+        when the result isn't ready within ``timeout`` seconds. Cancelling the
+        awaiting task drops the request if no worker has started it yet.
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self.metrics['rejected'] += 1
+                raise STTQueueFullError(f"STT pool busy ({self._pending} requests pending)")
+            self._pending += 1
+
+        timeout = self.default_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        self.metrics['submitted'] += 1
+        try:
+            job = self._executor.submit(_run_transcription, audio, options, deadline)
+        except Exception:
+            self._release()
+            self.metrics['failed'] += 1
+            raise
+        job.add_done_callback(self._release)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+        except asyncio.TimeoutError:
+            self.metrics['expired'] += 1
+            raise STTDeadlineExceeded(f"Transcription missed its {timeout:.1f}s deadline")
+        except STTDeadlineExceeded:
+            self.metrics['expired'] += 1
+            raise
+        except asyncio.CancelledError:
+            self.metrics['cancelled'] += 1
+            raise
+        except Exception:
+            self.metrics['failed'] += 1
+            raise
+
+        self.metrics['completed'] += 1
+        self.metrics['inference_times'].append(result.get('inference_time', 0.0))
+        if len(self.metrics['inference_times']) > 100:
+            self.metrics['inference_times'] = self.metrics['inference_times'][-100:]
+        return result
+
+    def _release(self, _job=None):
+        """Free an admission slot once the worker is really done (runs on the worker thread)"""
+        with self._pending_lock:
+            self._pending -= 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get pool performance metrics"""
+        times = self.metrics['inference_times']
+        return {
+            'backend': self.backend,
+            'workers': self.workers,
+            'pending': self._pending,
+            'submitted': self.metrics['submitted'],
+            'completed': self.metrics['completed'],
+            'rejected': self.metrics['rejected'],
+            'expired': self.metrics['expired'],
+            'cancelled': self.metrics['cancelled'],
+            'failed': self.metrics['failed'],
+            'avg_inference_ms': (sum(times) / len(times) * 1000) if times else 0.0
+        }
+
+    def shutdown(self, wait: bool = False):
+        """Stop the workers, dropping requests that haven't started"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_shared_pools: Dict[str, STTWorkerPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_stt_pool(model_name: str = "base") -> STTWorkerPool:
+    """Get the process-wide pool for a model, creating it on first use.
+
+    Configured through GEM_STT_WORKERS, GEM_STT_MAX_PENDING and GEM_STT_BACKEND
+    ('thread' or 'process').
+    """
+    with _shared_pools_lock:
+        pool = _shared_pools.get(model_name)
+        if pool is None:
+            pool = STTWorkerPool(
+                model_name=model_name,
+                workers=int(os.getenv('GEM_STT_WORKERS', '1')),
+                max_pending=int(os.getenv('GEM_STT_MAX_PENDING', '4')),
+                use_processes=os.getenv('GEM_STT_BACKEND', 'thread').lower() == 'process'
+            )
+            _shared_pools[model_name] = pool
+        return pool
+
+
+def shutdown_stt_pools():
+    """Shut down every shared pool"""
+    with _shared_pools_lock:
+        for pool in _shared_pools.values():
+            pool.shutdown()
+        _shared_pools.clear()
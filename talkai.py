@@ -19,6 +19,7 @@ from pathlib import Path
 from datetime import datetime
 from voice_interface import VoiceInterface
 from gemini_client import GeminiProClient
+from sentence_segmenter import iter_sentences
 import config  # Import the new configuration file
 
 # Import enhanced AI coordination system
@@ -76,7 +77,8 @@ async def handle_interaction(voice: VoiceInterface, gemini: GeminiProClient, ai_
             
             # Get enhanced response
             ai_response = await ai_system.generate_response(ai_request)
-            response_generator = (chunk for chunk in [ai_response])
+            # Speak the answer sentence by sentence instead of as one long Polly request
+            response_generator = iter_sentences([ai_response], language=config.LANGUAGE_CODE)
             
             # Log interaction for team coordination
             await coordination_system.add_task(Task(
@@ -195,7 +197,9 @@ async def main():
             language_code=config.LANGUAGE_CODE,
             polly_voice=config.POLLY_VOICE
         )
-        gemini = GeminiProClient()
+        gemini = GeminiProClient(language_code=config.LANGUAGE_CODE)
+        # Synthesize the fixed prompts in the background; they play from the cache afterwards
+        prewarm_task = asyncio.create_task(voice.prewarm_prompts(config.SPOKEN_PROMPTS))
         
         print("✅ Core systems initialized successfully")
         
@@ -247,6 +251,11 @@ async def main():
                 
                 await asyncio.sleep(2)
     finally:
+        # Stop prompt synthesis if it's still running and write the TTS cache index
+        if not prewarm_task.done():
+            prewarm_task.cancel()
+        await asyncio.gather(prewarm_task, return_exceptions=True)
+        voice.phrase_cache.close()
         # This block will execute when the loop breaks, ensuring mission state is saved.
         await shutdown(coordination_system)
 
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Early Command Dispatch Tests
+Commands acted on from a stable partial must run to completion and must not run again
+when the endpoint transcript arrives.
+"""
+
+import asyncio
+
+from advanced_voice_system import AdvancedVoiceSystem
+
+
+def make_system():
+    system = AdvancedVoiceSystem()
+    system.streaming_mode = True
+    system.ai_learning_enabled = False
+    system.command_patterns = {'media': ['music', 'play'], 'time': ['time', 'clock']}
+    return system
+
+
+def early(system, text):
+    system._early_result = {'text': text, 'confidence': 0.9, 'engine': 'whisper', 'partial': True}
+
+
+def test_final_extending_the_partial_is_not_dispatched_again():
+    system = make_system()
+    early(system, "stop the music")
+    assert system._was_handled_early({'text': "Stop the music now.", 'confidence': 0.9})
+
+
+def test_final_repeating_the_partial_is_not_dispatched_again():
+    system = make_system()
+    early(system, "stop the music")
+    assert system._was_handled_early({'text': "stop the  music!", 'confidence': 0.9})
+
+
+def test_corrected_final_in_the_same_category_is_dispatched():
+    system = make_system()
+    early(system, "stop the music")
+    assert not system._was_handled_early({'text': "play music", 'confidence': 0.9})
+
+
+def test_different_command_is_dispatched():
+    system = make_system()
+    early(system, "stop the music")
+    assert not system._was_handled_early({'text': "what time is it", 'confidence': 0.9})
+    # A word that merely starts with the partial's last word isn't an extension
+    early(system, "open the")
+    assert not system._was_handled_early({'text': "open theme settings", 'confidence': 0.9})
+
+
+def test_nothing_dispatched_early():
+    system = make_system()
+    assert not system._was_handled_early({'text': "stop the music", 'confidence': 0.9})
+
+
+def test_endpoint_cancel_does_not_cut_short_an_early_command():
+    system = make_system()
+    finished = []
+
+    async def recognize(engine, audio):
+        return {'text': "stop the music", 'confidence': 0.95, 'engine': engine}
+
+    async def handler(result):
+        await asyncio.sleep(0.05)
+        finished.append(result['text'])
+
+    system.recognize_with_engine = recognize
+    system.on_command_recognized = handler
+
+    async def run():
+        # Two identical partials make the hypothesis stable and trigger the dispatch
+        await system.transcribe_partial(b'')
+        system._partial_task = asyncio.create_task(system.transcribe_partial(b''))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        # Endpoint: collect_speech_audio cancels whatever partial is in flight
+        system._partial_task.cancel()
+        assert system._early_dispatch_task is not None
+        await system._early_dispatch_task
+
+    asyncio.run(run())
+    assert finished == ["stop the music"]
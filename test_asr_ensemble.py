@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - ASR Ensemble Learning Tests
+Engine accuracy weights must keep learning when early exit leaves a single result.
+"""
+
+from asr_ensemble import EnsembleOutcome, EnsembleScheduler
+
+
+def outcome(*results, early_exit=None):
+    return EnsembleOutcome(results=list(results), early_exit=early_exit, launched=[r[2] for r in results],
+                           cancelled=[], elapsed=0.1)
+
+
+def make_scheduler():
+    async def engine(audio):
+        return "", 0.0
+    return EnsembleScheduler({'whisper': engine, 'sphinx': engine}, {'whisper': 0.9, 'sphinx': 0.9})
+
+
+def test_multi_result_decision_records_agreement():
+    scheduler = make_scheduler()
+    scheduler.record_decision(outcome(("ligar a luz da sala", 0.9, 'whisper'),
+                                      ("ligar luz da sala", 0.6, 'sphinx')), "ligar a luz da sala")
+    assert scheduler.stats['whisper'].last_agreement == 1.0
+    assert scheduler.stats['sphinx'].last_agreement == 0.8
+    assert scheduler.stats['sphinx'].accuracy < 0.9
+
+
+def test_lone_result_uses_last_verified_agreement():
+    scheduler = make_scheduler()
+    scheduler.record_decision(outcome(("ligar a luz da sala", 0.9, 'whisper'),
+                                      ("ligar luz da sala", 0.6, 'sphinx')), "ligar a luz da sala")
+    before = scheduler.stats['sphinx'].accuracy
+    for _ in range(20):
+        scheduler.record_decision(outcome(("ligar luz da sala", 0.9, 'sphinx')), "ligar luz da sala")
+    after = scheduler.stats['sphinx'].accuracy
+    # Keeps moving toward the verified 0.8, not toward a self-confirmed 1.0
+    assert after < before
+    assert abs(after - 0.8) < 0.02
+
+
+def test_lone_result_without_verification_leaves_weight_alone():
+    scheduler = make_scheduler()
+    scheduler.record_decision(outcome(("ligar a luz", 0.9, 'whisper')), "ligar a luz")
+    assert scheduler.stats['whisper'].accuracy == 0.9
+
+
+def test_early_exit_winner_does_not_confirm_itself():
+    scheduler = make_scheduler()
+    scheduler.record_decision(outcome(("ligar a luz da sala", 0.9, 'whisper'),
+                                      ("ligar luz da sala", 0.6, 'sphinx')), "ligar luz da sala")
+    verified = scheduler.stats['whisper'].last_agreement
+    assert verified == 0.75
+    before = scheduler.stats['whisper'].accuracy
+    # whisper exited early; the straggler that also finished is still scored against it
+    scheduler.record_decision(outcome(("ligar a luz da sala", 0.95, 'whisper'),
+                                      ("ligar a luz da sala", 0.6, 'sphinx'), early_exit='whisper'),
+                              "ligar a luz da sala")
+    assert scheduler.stats['whisper'].last_agreement == verified
+    assert scheduler.stats['whisper'].accuracy < before
+    assert scheduler.stats['sphinx'].last_agreement == 1.0
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Adaptive Backend Router Tests
+Ranking must follow the typical latency rather than a few tail samples, a benched
+backend must get its half-open trial, and a hedge that loses must not leak what it opened.
+"""
+
+import asyncio
+
+from backend_router import HALF_OPEN, AdaptiveRouter
+
+
+class Stream:
+    """Stands in for an open token stream"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_tail_samples_do_not_demote_a_fast_backend():
+    router = AdaptiveRouter(['fast', 'steady'], prior_latency={'fast': 0.8, 'steady': 1.0})
+    for _ in range(17):
+        router.record('fast', 'general', 0.8, True)
+        router.record('steady', 'general', 1.0, True)
+    for _ in range(3):
+        router.record('fast', 'general', 6.0, True)
+        router.record('steady', 'general', 1.0, True)
+
+    assert router.latency[('fast', 'general')].ewma > 1.0  # A mean would rank it last
+    assert router.rank('general') == ['fast', 'steady']
+
+
+def test_half_open_backend_gets_its_trial():
+    router = AdaptiveRouter(['primary', 'backup'], prior_latency={'primary': 0.8, 'backup': 1.0},
+                            failure_threshold=1, cooldown=0.0)
+    router.record('primary', 'general', None, False)
+
+    assert router.rank('general') == ['primary', 'backup']
+    assert router.states['primary'].state == HALF_OPEN
+
+    router.begin('primary')
+    router.record('primary', 'general', 0.8, True)
+    assert router.states['primary'].error_rate <= router.prior_error['primary']
+    assert router.rank('general') == ['primary', 'backup']
+
+
+def test_losing_hedge_result_is_closed():
+    router = AdaptiveRouter(['slow', 'fast'], prior_latency={'slow': 0.01, 'fast': 0.01},
+                            min_hedge_delay=0.01)
+    streams = {}
+
+    async def run():
+        hedged = asyncio.Event()
+
+        async def call(backend):
+            streams[backend] = Stream()
+            if backend == 'slow':
+                await hedged.wait()
+            else:
+                hedged.set()  # Both calls finish in the same wakeup
+            return streams[backend], backend
+
+        (stream, token), backend = await router.call('general', call)
+        return stream, backend
+
+    stream, backend = asyncio.run(run())
+    loser = streams['fast' if backend == 'slow' else 'slow']
+
+    assert not stream.closed
+    assert loser.closed
+
+
+def test_cancelled_hedge_is_not_counted():
+    router = AdaptiveRouter(['slow', 'fast'], prior_latency={'slow': 0.01, 'fast': 0.01},
+                            min_hedge_delay=0.01)
+
+    async def call(backend):
+        await asyncio.sleep(1.0 if backend == 'slow' else 0.01)
+        return backend
+
+    result, backend = asyncio.run(router.call('general', call))
+
+    assert (result, backend) == ('fast', 'fast')
+    assert router.states['fast'].hedge_wins == 1
+    assert router.states['slow'].requests == 0
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - ROVER Alignment Tests
+Alignment and voting checked against the multi-engine hypothesis corpus in data/.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from rover_alignment import (WordLattice, _python_edit_distance, load_corpus, normalize_words,
+                             rover_combine, word_edit_distance)
+
+CORPUS = Path(__file__).parent / 'data' / 'asr_hypotheses.json'
+ENGINE_ACCURACY = {'whisper': 0.95, 'google': 0.90, 'sphinx': 0.75}
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return load_corpus(CORPUS)
+
+
+def weighted(utterance):
+    return [(text, confidence * ENGINE_ACCURACY[engine])
+            for engine, (text, confidence) in utterance['hypotheses'].items()]
+
+
+def corpus_errors(corpus, combine):
+    return sum(word_edit_distance(normalize_words(utterance['reference']),
+                                  normalize_words(combine(weighted(utterance))))
+               for utterance in corpus)
+
+
+def test_rover_matches_every_reference(corpus):
+    for utterance in corpus:
+        assert normalize_words(rover_combine(weighted(utterance))) == normalize_words(utterance['reference'])
+
+
+def test_rover_beats_best_single_engine(corpus):
+    best_single = corpus_errors(corpus, lambda hyps: max(hyps, key=lambda item: item[1])[0])
+    assert corpus_errors(corpus, rover_combine) <= best_single
+
+
+def test_rover_is_deterministic(corpus):
+    for utterance in corpus:
+        hypotheses = weighted(utterance)
+        assert rover_combine(hypotheses) == rover_combine(list(reversed(hypotheses)))
+
+
+def test_consensus_keeps_word_order():
+    # Bag-of-words voting used to reorder these by weight
+    hypotheses = [("abrir o navegador agora", 0.9), ("abrir navegador agora", 0.8), ("abri o navegador", 0.5)]
+    assert rover_combine(hypotheses) == "abrir o navegador agora"
+
+
+def test_insertion_from_a_lighter_hypothesis_is_outvoted():
+    lattice = WordLattice()
+    lattice.add("ligar a luz", 1.0)
+    lattice.add("ligar a luz", 0.9)
+    lattice.add("ligar toda a luz", 0.5)
+    assert len(lattice.slots) == 4
+    assert lattice.best_path() == "ligar a luz"
+
+
+def test_surface_form_is_kept():
+    assert rover_combine([("Tocar música.", 0.9), ("tocar musica", 0.5)]) == "Tocar música"
+
+
+def test_empty_hypotheses_are_ignored():
+    assert rover_combine([("", 0.9), ("   ", 0.8)]) == ""
+    assert rover_combine([("", 0.9), ("ligar a luz", 0.4)]) == "ligar a luz"
+
+
+def test_numpy_edit_distance_matches_reference_dp():
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        reference = [str(word) for word in rng.integers(0, 6, rng.integers(0, 12))]
+        hypothesis = [str(word) for word in rng.integers(0, 6, rng.integers(0, 12))]
+        assert word_edit_distance(reference, hypothesis) == _python_edit_distance(reference, hypothesis)
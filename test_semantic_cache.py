@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Semantic Cache Tests
+Rephrasings of one question share an answer; questions that differ in polarity or in
+what they ask about must not.
+"""
+
+from semantic_cache import SemanticCache
+
+
+def make_cache():
+    cache = SemanticCache(capacity=16)
+    cache.store("What is the Eiffel Tower?", "A wrought-iron tower in Paris.")
+    cache.store("How do I turn on the screen reader?", "Press Alt+Super+S.")
+    return cache
+
+
+def test_rephrasing_hits():
+    cache = make_cache()
+    cache.store("What is the capital of France?", "Paris.")
+    assert cache.lookup("Tell me the capital of France")['response'] == "Paris."
+    assert cache.lookup("How can I enable the screen reader?")['response'] == "Press Alt+Super+S."
+
+
+def test_different_question_word_misses():
+    cache = make_cache()
+    assert cache.lookup("Where is the Eiffel Tower?") is None
+    assert cache.lookup("Who built the Eiffel Tower?") is None
+    assert cache.lookup("Onde fica a Eiffel Tower?") is None
+
+
+def test_different_polarity_misses():
+    cache = make_cache()
+    assert cache.lookup("How do I turn off the screen reader?") is None
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Sentence Segmentation Tests
+Ordinary words that double as abbreviations must not hold back the first sentence.
+"""
+
+import pytest
+
+from sentence_segmenter import SentenceSegmenter, iter_sentences
+
+
+def split(text, language, chunk=5):
+    return list(iter_sentences([text[index:index + chunk] for index in range(0, len(text), chunk)],
+                               language=language, first_clause_chars=None))
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("I am going out. See you soon.", ["I am going out.", "See you soon."]),
+    ("The answer is no. But yes.", ["The answer is no.", "But yes."]),
+    ("Everything is set. Let us begin.", ["Everything is set.", "Let us begin."]),
+    ("It costs 5 min. Then done.", ["It costs 5 min.", "Then done."]),
+    ("See No. 5 in the list. Then stop.", ["See No. 5 in the list.", "Then stop."]),
+    ("Ask Dr. Smith. He knows.", ["Ask Dr. Smith.", "He knows."]),
+])
+def test_english(text, expected):
+    assert split(text, 'en') == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("Ele vai ter. Depois volta.", ["Ele vai ter.", "Depois volta."]),
+    ("Ele saiu. Out. Volta logo.", ["Ele saiu.", "Out.", "Volta logo."]),
+    ("Espere 5 min. Depois siga.", ["Espere 5 min.", "Depois siga."]),
+    ("Leia a p. 12 agora. Pronto.", ["Leia a p. 12 agora.", "Pronto."]),
+    ("Reunião em 3 de set. 2025. Confirme.", ["Reunião em 3 de set. 2025.", "Confirme."]),
+    ("O Dr. Silva chegou. Pode entrar.", ["O Dr. Silva chegou.", "Pode entrar."]),
+])
+def test_portuguese(text, expected):
+    assert split(text, 'pt') == expected
+
+
+def test_locale_codes_pick_the_language():
+    assert SentenceSegmenter('pt-BR').language == 'pt'
+    assert split("Ele vai ter. Depois volta.", 'pt-BR') == ["Ele vai ter.", "Depois volta."]
+
+
+def test_lowercase_continuation_keeps_an_ambiguous_word_attached():
+    assert split("Turn it to no. later it changes.", 'en') == ["Turn it to no. later it changes."]
+
+
+def test_first_sentence_is_emitted_without_waiting_for_the_stream_end():
+    segmenter = SentenceSegmenter('en', first_clause_chars=None)
+    assert segmenter.feed("The answer is no. B") == ["The answer is no."]
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Shared Memory Tests
+A batched store must stay readable while its flush is on the way to disk.
+"""
+
+import threading
+
+from ai_team_realtime_communication import SharedMemorySystem
+
+
+def test_key_in_flight_is_not_cached_as_missing(tmp_path):
+    memory = SharedMemorySystem(tmp_path / "shared.db", durability='batched', flush_interval=60.0)
+    try:
+        release = threading.Event()
+        memory.writer.submit(lambda conn: release.wait(5))  # Hold the writer thread
+
+        memory.store('greeting', {'text': 'hello'}, 'gemini')
+        memory.flush(wait=False)  # Popped from _pending, not committed yet
+        memory.memory_cache['shared_data'].invalidate('greeting')  # As if evicted
+
+        assert memory.retrieve('greeting') == {'text': 'hello'}
+        release.set()
+        memory.flush()
+        memory.memory_cache['shared_data'].invalidate('greeting')
+        assert memory.retrieve('greeting') == {'text': 'hello'}
+    finally:
+        release.set()
+        memory.close()
+
+
+def test_deleted_key_in_flight_reads_as_missing(tmp_path):
+    memory = SharedMemorySystem(tmp_path / "shared.db", durability='batched', flush_interval=60.0)
+    try:
+        release = threading.Event()
+        memory.writer.submit(lambda conn: release.wait(5))
+
+        memory.store('greeting', {'text': 'hello'}, 'gemini')
+        memory.flush(wait=False)
+        memory.delete('greeting')
+
+        assert memory.retrieve('greeting') is None
+    finally:
+        release.set()
+        memory.close()
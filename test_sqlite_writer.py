@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Background SQLite Writer Tests
+A submitted callable may only report success once its work is committed.
+"""
+
+import sqlite3
+
+import pytest
+
+from sqlite_writer import BackgroundSQLiteWriter, connect
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS parent (id INTEGER PRIMARY KEY);
+    CREATE TABLE IF NOT EXISTS child (
+        id INTEGER PRIMARY KEY,
+        parent_id INTEGER REFERENCES parent(id) DEFERRABLE INITIALLY DEFERRED
+    );
+'''
+
+
+@pytest.fixture
+def writer(tmp_path):
+    db_path = str(tmp_path / "writer.db")
+    conn = connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    writer = BackgroundSQLiteWriter(db_path)
+    writer.submit(lambda conn: conn.execute("PRAGMA foreign_keys=ON")).result(5)
+    yield writer
+    writer.close()
+
+
+def rows(writer, table):
+    conn = connect(writer.db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_callable_result_after_commit(writer):
+    writer.execute("INSERT INTO parent (id) VALUES (1)")
+    result = writer.submit(lambda conn: conn.execute("INSERT INTO child (parent_id) VALUES (1)").rowcount)
+    assert result.result(5) == 1
+    assert rows(writer, 'child') == 1
+
+
+def test_callable_whose_commit_fails_reports_the_error(writer):
+    def orphan(conn):
+        # The deferred foreign key is only checked at COMMIT
+        conn.execute("INSERT INTO child (parent_id) VALUES (99)")
+        return "inserted"
+
+    future = writer.submit(orphan)
+    with pytest.raises(sqlite3.IntegrityError):
+        future.result(5)
+    assert rows(writer, 'child') == 0
+    assert writer.get_metrics()['errors'] == 1
+
+
+def test_failed_callable_is_not_run_again(writer):
+    calls = []
+
+    def broken(conn):
+        calls.append(1)
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        writer.submit(broken).result(5)
+    assert writer.flush(5)
+    assert calls == [1]
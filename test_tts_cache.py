@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Phrase Audio Cache Tests
+Only prompts and repeated phrases reach the disk; the store stays under its caps.
+"""
+
+import asyncio
+
+import numpy as np
+
+from tts_cache import PhraseAudioCache
+
+SAMPLE_RATE = 16000
+
+
+def synthesizer(calls):
+    async def synthesize(text):
+        calls.append(text)
+        return np.full(len(text) * 10, 100, dtype=np.int16)
+    return synthesize
+
+
+def say(cache, text, calls):
+    return asyncio.run(cache.get_or_synthesize(text, 'Joanna', 'neural', SAMPLE_RATE, synthesizer(calls)))
+
+
+def test_one_off_sentence_stays_in_memory(tmp_path):
+    cache = PhraseAudioCache(tmp_path)
+    calls = []
+    say(cache, "Here is answer number 1.", calls)
+    assert cache.get_stats()['phrases'] == 0
+    assert cache.data_path.stat().st_size == 0
+    # Still served from memory
+    say(cache, "Here is answer number 1.", calls)
+    assert len(calls) == 1
+    cache.close()
+
+
+def test_repeated_phrase_is_persisted(tmp_path):
+    cache = PhraseAudioCache(tmp_path, persist_after=2)
+    calls = []
+    say(cache, "Turning on the lights.", calls)
+    say(cache, "Turning on the lights.", calls)
+    assert cache.get_stats()['phrases'] == 1
+    cache.close()
+    reopened = PhraseAudioCache(tmp_path)
+    assert reopened.get("Turning on the lights.", 'Joanna', 'neural', SAMPLE_RATE) is not None
+    reopened.close()
+
+
+def test_prewarmed_prompts_are_persisted_and_pinned(tmp_path):
+    cache = PhraseAudioCache(tmp_path, max_phrases=4)
+    calls = []
+    asyncio.run(cache.prewarm(["I'm listening."], 'Joanna', 'neural', SAMPLE_RATE, synthesizer(calls)))
+    for number in range(10):
+        cache.put(f"phrase {number}", 'Joanna', 'neural', SAMPLE_RATE, np.ones(100, dtype=np.int16))
+    assert cache.get_stats()['phrases'] <= 4
+    assert cache.get("I'm listening.", 'Joanna', 'neural', SAMPLE_RATE) is not None
+    assert cache.get_stats()['evictions'] > 0
+    cache.close()
+
+
+def test_index_writes_are_batched_off_the_caller(tmp_path):
+    cache = PhraseAudioCache(tmp_path, index_flush_interval=60.0)
+    for number in range(20):
+        cache.put(f"phrase {number}", 'Joanna', 'neural', SAMPLE_RATE, np.ones(100, dtype=np.int16))
+    assert cache.get_stats()['index_writes'] == 0
+    assert not cache.index_path.exists()
+    cache.close()
+    assert cache.get_stats()['index_writes'] == 1
+    reopened = PhraseAudioCache(tmp_path)
+    assert reopened.get_stats()['phrases'] == 20
+    reopened.close()
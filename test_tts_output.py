@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Streaming Speech Output Tests
+Drives the output callback by hand, block by block, so jitter-buffer underruns,
+gaps and barge-in are checked deterministically without a sound card.
+"""
+
+import asyncio
+
+import numpy as np
+
+from tts_output import JitterBuffer, StreamingAudioOutput
+
+SAMPLE_RATE = 16000
+BLOCK = 320  # 20 ms
+
+
+class ManualStream:
+    """Output stream whose callback only runs when the test pulls a block"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+    def pull(self) -> np.ndarray:
+        block = np.full((BLOCK, 1), 7, dtype=np.int16)  # Garbage the callback must overwrite
+        self.callback(block, BLOCK, None, None)
+        return block[:, 0]
+
+
+def make_output():
+    streams = []
+
+    def factory(callback):
+        streams.append(ManualStream(callback))
+        return streams[-1]
+
+    output = StreamingAudioOutput(SAMPLE_RATE, block_ms=20, prebuffer_ms=60, stream_factory=factory)
+    return output, streams
+
+
+def tone(samples):
+    return np.full(samples, 1000, dtype=np.int16)
+
+
+def test_jitter_buffer_spans_chunks_and_zero_pads():
+    buffer = JitterBuffer()
+    buffer.write(np.arange(1, 4, dtype=np.int16))
+    buffer.write(np.arange(4, 6, dtype=np.int16))
+    out = np.full(4, -1, dtype=np.int16)
+    assert buffer.read_into(out) == 4
+    assert out.tolist() == [1, 2, 3, 4]
+    assert buffer.read_into(out) == 1
+    assert out.tolist() == [5, 0, 0, 0]
+    assert buffer.buffered == 0
+
+
+def test_playback_waits_for_prebuffer():
+    async def run():
+        output, streams = make_output()
+        output.begin()
+        output.write(tone(BLOCK * 2))  # Below the 3-block prebuffer
+        assert not streams[0].pull().any()
+        output.write(tone(BLOCK))
+        assert streams[0].pull().all()
+        assert output.get_metrics()['time_to_first_audio']['count'] == 1
+    asyncio.run(run())
+
+
+def test_underrun_mid_utterance_is_counted_and_gap_measured():
+    async def run():
+        output, streams = make_output()
+        output.begin()
+        stream = streams[0]
+        output.write(tone(1000))  # 3 full blocks + 40 samples
+        for _ in range(3):
+            assert stream.pull().all()
+        partial = stream.pull()
+        assert partial[:40].all() and not partial[40:].any()
+        assert output.get_metrics()['underruns'] == 1
+
+        # Synthesis still behind: silence, and the gap keeps growing
+        assert not stream.pull().any()
+        assert output.get_metrics()['underruns'] == 1
+
+        # Next sentence arrives; playback resumes after re-buffering
+        output.write(tone(BLOCK * 3))
+        assert stream.pull().all()
+        gaps = output.get_metrics()['gaps']
+        assert gaps['count'] == 1
+        assert abs(gaps['max_ms'] - (BLOCK - 40 + BLOCK) / SAMPLE_RATE * 1000) < 1e-6
+    asyncio.run(run())
+
+
+def test_running_dry_at_the_end_is_not_an_underrun():
+    async def run():
+        output, streams = make_output()
+        output.begin()
+        output.write(tone(BLOCK + 100))
+        output.finish()
+        stream = streams[0]
+        assert stream.pull().all()            # Finished, so no prebuffer wait
+        assert stream.pull()[:100].all()
+        assert not stream.pull().any()
+        await asyncio.wait_for(output.wait_drained(), 1.0)
+        assert output.get_metrics()['underruns'] == 0
+        assert not output.is_active
+    asyncio.run(run())
+
+
+def test_barge_in_silences_the_next_block():
+    async def run():
+        output, streams = make_output()
+        output.begin()
+        output.write(tone(BLOCK * 10))
+        stream = streams[0]
+        assert stream.pull().all()
+        output.stop_now()
+        assert not stream.pull().any()
+        assert output.buffer.buffered == 0
+        await asyncio.wait_for(output.wait_drained(), 1.0)
+        assert output.get_metrics()['stop_latency']['count'] == 1
+    asyncio.run(run())
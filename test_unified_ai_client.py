@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Unified AI Client Streaming Tests
+A fake backend streams tokens; the finished answer must be teed into the response
+and semantic caches and context memory, and an unfinished one must not.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend_connections import BackendConnectionManager
+from response_cache import ResponseCache
+from unified_ai_client import UnifiedAIClient
+
+REPLY = ["Sure. ", "Open the settings ", "menu. ", "Then turn on ", "the screen reader."]
+
+
+class FakeBackend:
+    """Stands in for _stream_ollama_local; optionally fails after a number of tokens"""
+
+    def __init__(self, tokens=REPLY, fail_after=None):
+        self.tokens = tokens
+        self.fail_after = fail_after
+        self.calls = 0
+        self.closed = 0
+
+    async def __call__(self, prompt, context):
+        self.calls += 1
+        try:
+            for index, token in enumerate(self.tokens):
+                if self.fail_after is not None and index == self.fail_after:
+                    raise ConnectionError("stream reset")
+                await asyncio.sleep(0)
+                yield token
+        finally:
+            self.closed += 1
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    monkeypatch.delenv('GEM_RESPONSE_CACHE_DB', raising=False)
+    clients = []
+
+    def make(backend):
+        client = UnifiedAIClient(connections=BackendConnectionManager())
+        for name, info in client.backends.items():
+            info['available'] = name == 'ollama_local'
+        client._last_health_check = time.time()
+        client.health_check_interval = float('inf')
+        client._stream_ollama_local = backend
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        asyncio.run(client.close())
+
+
+def collect(client, prompt, **options):
+    async def run():
+        return [part async for part in client.stream_response(prompt, context=[], accessibility_mode=False,
+                                                              **options)]
+    return asyncio.run(run())
+
+
+def cache_key(prompt, emergency_mode=False):
+    return ResponseCache.make_key(prompt, [], False, emergency_mode)
+
+
+def test_finished_stream_is_teed_into_caches_and_context(make_client):
+    backend = FakeBackend()
+    client = make_client(backend)
+
+    sentences = collect(client, "How do I turn on the screen reader?")
+    assert sentences == ["Sure.", "Open the settings menu.", "Then turn on the screen reader."]
+
+    answer = ''.join(REPLY)
+    assert client.response_cache.get(cache_key("How do I turn on the screen reader?")) == answer
+    assert client.semantic_cache.lookup("how do i turn on the screen reader",
+                                        scope="accessibility=False")['response'] == answer
+    history = client.context_memory['conversation_history']
+    assert history[-1]['content'] == answer and history[-1]['backend'] == 'ollama_local'
+    assert client.metrics['streamed_responses'] == 1
+    assert backend.closed == 1
+
+
+def test_cached_answer_is_replayed_without_the_backend(make_client):
+    backend = FakeBackend()
+    client = make_client(backend)
+    first = collect(client, "How do I turn on the screen reader?")
+    again = collect(client, "How do I turn on the screen reader?")
+    assert again == first
+    assert backend.calls == 1
+    assert client.metrics['cache_hits'] == 1
+
+
+def test_raw_tokens_when_sentences_are_off(make_client):
+    client = make_client(FakeBackend())
+    assert collect(client, "Tokens please", sentences=False) == REPLY
+
+
+def test_interrupted_stream_is_not_cached(make_client):
+    backend = FakeBackend()
+    client = make_client(backend)
+
+    async def barge_in():
+        stream = client.stream_response("How do I enable high contrast?", context=[], accessibility_mode=False)
+        first = await stream.__anext__()
+        await stream.aclose()  # The user spoke over the answer
+        return first
+
+    assert asyncio.run(barge_in()) == "Sure."
+    assert client.response_cache.get(cache_key("How do I enable high contrast?")) is None
+    assert client.context_memory['conversation_history'] == []
+    assert backend.closed == 1
+
+
+def test_backend_failure_mid_stream_is_not_cached(make_client):
+    client = make_client(FakeBackend(fail_after=3))
+    with pytest.raises(ConnectionError):
+        collect(client, "How do I enable high contrast?")
+    assert client.response_cache.get(cache_key("How do I enable high contrast?")) is None
+    assert client.metrics['failed_responses'] == 1
+
+
+def test_emergency_answers_are_never_cached(make_client):
+    backend = FakeBackend()
+    client = make_client(backend)
+    collect(client, "I fell and need help", emergency_mode=True)
+    collect(client, "I fell and need help", emergency_mode=True)
+    assert backend.calls == 2
+    assert client.response_cache.get(cache_key("I fell and need help", emergency_mode=True)) is None
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+🧪 GEM OS - Wake Word Detector Tests
+Enrollment writes WAV templates; the detector built from them must fire on the keyword
+and stay quiet on silence, noise and a different sound.
+"""
+
+import numpy as np
+import pytest
+
+from wake_word_detector import (create_wake_word_detector, enroll_keyword, load_wav,
+                                synthetic_keyword, trim_silence)
+
+SAMPLE_RATE = 16000
+
+
+def noise(seconds, level, seed=1):
+    rng = np.random.default_rng(seed)
+    return (level * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def fake_microphone(jitters):
+    """Stands in for record_microphone: each take is a keyword surrounded by room noise"""
+    takes = iter(jitters)
+
+    def record(seconds, sample_rate):
+        keyword = synthetic_keyword(next(takes), sample_rate)
+        padding = noise((seconds - 0.6) / 2, 0.002)
+        return np.concatenate((padding, keyword, padding))
+    return record
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    enroll_keyword('hey gem', samples=3, directory=tmp_path, record=fake_microphone([-20.0, 0.0, 20.0]))
+    return tmp_path
+
+
+def test_enrollment_writes_trimmed_templates(template_dir):
+    paths = sorted((template_dir / 'hey_gem').glob('*.wav'))
+    assert [path.name for path in paths] == ['001.wav', '002.wav', '003.wav']
+    # Trimmed to the keyword plus padding, not the full two-second take
+    assert len(load_wav(paths[0])) < 1.0 * SAMPLE_RATE
+
+
+def test_enrollment_retries_silent_takes(tmp_path):
+    takes = iter([noise(2.0, 0.001), synthetic_keyword(0.0)])
+    paths = enroll_keyword('hey gem', samples=1, directory=tmp_path, record=lambda seconds, rate: next(takes))
+    assert len(paths) == 1
+
+
+def test_enrollment_appends_to_existing_templates(template_dir):
+    enroll_keyword('hey gem', samples=1, directory=template_dir, record=fake_microphone([5.0]))
+    assert (template_dir / 'hey_gem' / '004.wav').exists()
+
+
+def test_detector_from_enrolled_templates_is_ready(template_dir):
+    detector = create_wake_word_detector(template_dir=template_dir)
+    assert detector.ready
+    assert set(detector.templates) == {'hey gem'}
+
+
+def test_detects_keyword(template_dir):
+    detector = create_wake_word_detector(template_dir=template_dir)
+    clip = np.concatenate((noise(0.5, 0.005), synthetic_keyword(10.0, seed=3), noise(0.5, 0.005)))
+    assert detector.detect(clip) == 'hey gem'
+
+
+@pytest.mark.parametrize('clip', [
+    noise(2.0, 0.002),                                   # Quiet room
+    noise(2.0, 0.2, seed=2),                             # Loud broadband noise
+    np.concatenate((noise(0.5, 0.005), synthetic_keyword(0.0, descending=True), noise(0.5, 0.005))),
+], ids=['silence', 'noise', 'other-sound'])
+def test_rejects_non_keywords(template_dir, clip):
+    detector = create_wake_word_detector(template_dir=template_dir)
+    assert detector.detect(clip) is None
+
+
+def test_no_templates_means_not_ready(tmp_path):
+    assert not create_wake_word_detector(template_dir=tmp_path / 'missing').ready
+
+
+def test_trim_silence_of_quiet_audio_is_empty():
+    assert len(trim_silence(noise(1.0, 0.001))) == 0
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+🗃️ GEM OS - Transcription Cache
+Content-addressed cache of transcriptions keyed by a stable blake2b digest of the
+preprocessed PCM, with an opt-in perceptual (MFCC + DTW) match for short repeated
+commands. Hot entries live in an in-memory LRU; everything persists in SQLite.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from sqlite_writer import BackgroundSQLiteWriter, connect
+from wake_word_detector import mfcc, subsequence_dtw
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS transcription_cache (
+        digest TEXT PRIMARY KEY,
+        language TEXT,
+        text TEXT,
+        confidence REAL,
+        duration REAL,
+        features BLOB,
+        hits INTEGER DEFAULT 0,
+        created_at REAL,
+        last_used REAL
+    )
+'''
+
+
+@dataclass
+class CacheKey:
+    """Fingerprint of one preprocessed utterance"""
+    digest: str
+    duration: float
+    features: Optional[np.ndarray]  # Voiced-region MFCCs, only for short utterances
+
+
+class TranscriptionCache:
+    """Two-level transcription cache: memory LRU in front of a SQLite table.
+
+    Exact matches use a blake2b digest of the language and PCM bytes. When
+    ``perceptual`` is on, utterances up to ``max_perceptual_seconds`` also carry
+    MFCC features; a miss on the digest is then compared against cached entries of
+    similar length (mean-MFCC prefilter, then DTW), and a distance under
+    ``perceptual_threshold`` counts as a hit. It is off by default: a perceptual hit
+    skips every ASR engine, and the threshold has only been tuned on synthetic tone
+    sweeps, not recorded speech. Only results at or above ``min_confidence`` are cached.
+    """
+
+    def __init__(self, db_path: str, writer: Optional[BackgroundSQLiteWriter] = None,
+                 language: str = 'pt-BR', sample_rate: int = 16000, capacity: int = 256,
+                 perceptual: bool = False, perceptual_threshold: float = 3.0,
+                 max_perceptual_seconds: float = 2.5, min_confidence: float = 0.8):
+        self.db_path = db_path
+        self.language = language
+        self.sample_rate = sample_rate
+        self.capacity = capacity
+        self.perceptual = perceptual
+        self.perceptual_threshold = perceptual_threshold
+        self.max_perceptual_seconds = max_perceptual_seconds
+        self.min_confidence = min_confidence
+
+        self._owns_writer = writer is None
+        self.writer = writer or BackgroundSQLiteWriter(db_path, name="transcription-cache-writer")
+        self.writer.submit(lambda conn: conn.execute(_SCHEMA)).result()
+        self._reader = connect(db_path)
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.metrics = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'perceptual_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'lookup_time': 0.0
+        }
+        self._warm()
+
+    def _warm(self):
+        """Load the most recently used entries for this language into memory"""
+        rows = self._reader.execute('''
+            SELECT digest, text, confidence, duration, features FROM transcription_cache
+            WHERE language = ? ORDER BY last_used DESC LIMIT ?
+        ''', (self.language, self.capacity)).fetchall()
+        for digest, text, confidence, duration, features in reversed(rows):
+            self._entries[digest] = self._entry(text, confidence, duration, features)
+
+    @staticmethod
+    def _entry(text: str, confidence: float, duration: float, features: Optional[bytes]) -> Dict[str, Any]:
+        matrix = None
+        if features:
+            matrix = np.frombuffer(features, dtype=np.float16).astype(np.float32).reshape(-1, 12)
+        return {'text': text, 'confidence': confidence, 'duration': duration, 'features': matrix,
+                'mean': matrix.mean(axis=0) if matrix is not None and len(matrix) else None}
+
+    def _voiced_features(self, audio: np.ndarray) -> Optional[np.ndarray]:
+        """MFCCs of the region between the first and last clearly voiced 10 ms hop"""
+        hop = self.sample_rate // 100
+        usable = len(audio) - len(audio) % hop
+        if usable < hop * 10:
+            return None
+        levels = np.sqrt(np.mean(audio[:usable].reshape(-1, hop) ** 2, axis=1))
+        voiced = np.flatnonzero(levels > 0.1 * levels.max())
+        if not len(voiced):
+            return None
+        clip = audio[voiced[0] * hop:(voiced[-1] + 1) * hop]
+        features = mfcc(clip, self.sample_rate)
+        return features if len(features) else None
+
+    def make_key(self, pcm: np.ndarray) -> CacheKey:
+        """Fingerprint preprocessed int16 PCM"""
+        pcm = np.ascontiguousarray(pcm)
+        digest = hashlib.blake2b(pcm.tobytes(), digest_size=16,
+                                 person=self.language.encode()[:16]).hexdigest()
+        duration = len(pcm) / self.sample_rate
+        features = None
+        if self.perceptual and duration <= self.max_perceptual_seconds:
+            features = self._voiced_features(pcm.astype(np.float32) / 32768.0)
+        return CacheKey(digest=digest, duration=duration, features=features)
+
+    def _touch(self, digest: str):
+        self.writer.execute('''
+            UPDATE transcription_cache SET hits = hits + 1, last_used = ? WHERE digest = ?
+        ''', (time.time(), digest))
+
+    def _remember(self, digest: str, entry: Dict[str, Any]):
+        self._entries[digest] = entry
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.metrics['evictions'] += 1
+
+    def _perceptual_match(self, key: CacheKey) -> Optional[str]:
+        candidates = [(digest, entry) for digest, entry in self._entries.items()
+                      if entry['features'] is not None
+                      and 0.75 <= key.duration / max(entry['duration'], 1e-6) <= 1.33]
+        if not candidates:
+            return None
+        # Cheap vectorized prefilter on mean MFCCs, DTW only for the closest few
+        means = np.stack([entry['mean'] for _, entry in candidates])
+        order = np.argsort(np.linalg.norm(means - key.features.mean(axis=0), axis=1))[:3]
+        best_digest, best_distance = None, self.perceptual_threshold
+        for index in order:
+            digest, entry = candidates[index]
+            distance = subsequence_dtw(key.features, entry['features'])
+            if distance < best_distance:
+                best_digest, best_distance = digest, distance
+        return best_digest
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """Cached ``{'text', 'confidence', 'match'}`` for an utterance, or None"""
+        start_time = time.perf_counter()
+        try:
+            entry = self._entries.get(key.digest)
+            if entry is not None:
+                self._entries.move_to_end(key.digest)
+                self.metrics['memory_hits'] += 1
+                self._touch(key.digest)
+                return {'text': entry['text'], 'confidence': entry['confidence'], 'match': 'exact'}
+
+            row = self._reader.execute('''
+                SELECT text, confidence, duration, features FROM transcription_cache WHERE digest = ?
+            ''', (key.digest,)).fetchone()
+            if row is not None:
+                entry = self._entry(*row)
+                self._remember(key.digest, entry)
+                self.metrics['disk_hits'] += 1
+                self._touch(key.digest)
+                return {'text': entry['text'], 'confidence': entry['confidence'], 'match': 'exact'}
+
+            if key.features is not None:
+                digest = self._perceptual_match(key)
+                if digest is not None:
+                    entry = self._entries[digest]
+                    self._entries.move_to_end(digest)
+                    self.metrics['perceptual_hits'] += 1
+                    self._touch(digest)
+                    return {'text': entry['text'], 'confidence': entry['confidence'], 'match': 'perceptual'}
+
+            self.metrics['misses'] += 1
+            return None
+        finally:
+            self.metrics['lookup_time'] += time.perf_counter() - start_time
+
+    def put(self, key: CacheKey, text: str, confidence: float) -> bool:
+        """Cache a confident transcription (memory now, SQLite via the background writer)"""
+        if not text.strip() or confidence < self.min_confidence:
+            return False
+        features = key.features.astype(np.float16).tobytes() if key.features is not None else None
+        entry = self._entry(text, confidence, key.duration, features)
+        self._remember(key.digest, entry)
+        now = time.time()
+        self.writer.execute('''
+            INSERT OR REPLACE INTO transcription_cache
+            (digest, language, text, confidence, duration, features, hits, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)
+        ''', (key.digest, self.language, text, confidence, key.duration,
+              sqlite3.Binary(features) if features else None, now, now))
+        self.metrics['stores'] += 1
+        return True
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache hit/miss metrics"""
+        hits = self.metrics['memory_hits'] + self.metrics['disk_hits'] + self.metrics['perceptual_hits']
+        lookups = hits + self.metrics['misses']
+        return {
+            'entries': len(self._entries),
+            'memory_hits': self.metrics['memory_hits'],
+            'disk_hits': self.metrics['disk_hits'],
+            'perceptual_hits': self.metrics['perceptual_hits'],
+            'misses': self.metrics['misses'],
+            'stores': self.metrics['stores'],
+            'evictions': self.metrics['evictions'],
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'avg_lookup_ms': self.metrics['lookup_time'] / lookups * 1000 if lookups else 0.0
+        }
+
+    def close(self):
+        """Close the read connection (and the writer if this cache created it)"""
+        self._reader.close()
+        if self._owns_writer:
+            self.writer.close()
+
+
+def main():
+    """Hit rate on a simulated stream of short repeated commands"""
+    sample_rate = 16000
+    rng = np.random.default_rng(11)
+
+    def command(base: float, jitter: float, seconds: float = 0.7) -> np.ndarray:
+        # A tone sweep per command word stands in for a recorded utterance
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        f0 = base + 400 * t / t[-1] + jitter
+        tone = np.sin(2 * np.pi * np.cumsum(f0) / sample_rate) * np.hanning(len(t))
+        tone += 0.4 * np.sin(2 * np.pi * (2 * base + jitter) * t)
+        audio = 0.3 * tone + 0.004 * rng.standard_normal(len(t))
+        padding = np.zeros(int(0.2 * sample_rate))
+        return (np.concatenate((padding, audio, padding)) * 32767).astype(np.int16)
+
+    commands = {'parar': 250.0, 'ler isto': 700.0, 'ajuda': 1300.0}
+    inference_seconds = 0.8  # Typical Whisper base time for a short command
+
+    print("🗃️ GEM OS - Transcription cache benchmark")
+    print("=" * 50)
+
+    requests = 60
+    # Same command, spoken slightly differently each time (pitch/loudness)
+    stream = []
+    for _ in range(requests):
+        text = str(rng.choice(list(commands)))
+        pcm = command(commands[text], rng.uniform(-15, 15))
+        stream.append((text, (pcm * rng.uniform(0.7, 1.0)).astype(np.int16)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, perceptual in (("exact only (default)", False), ("perceptual (opt-in)", True)):
+            cache = TranscriptionCache(os.path.join(directory, f'cache_{perceptual}.db'), perceptual=perceptual)
+            wrong = 0
+            for text, pcm in stream:
+                key = cache.make_key(pcm)
+                cached = cache.get(key)
+                if cached is None:
+                    cache.put(key, text, 0.92)
+                elif cached['text'] != text:
+                    wrong += 1
+
+            # A byte-identical replay always hits exactly
+            replay = command(commands['ajuda'], 0.0)
+            key = cache.make_key(replay)
+            cache.put(key, 'ajuda', 0.95)
+            exact = cache.get(cache.make_key(replay))
+
+            metrics = cache.get_metrics()
+            saved = (metrics['memory_hits'] + metrics['disk_hits'] + metrics['perceptual_hits']) * inference_seconds
+            print(f"🎯 {label}: hit rate {metrics['hit_rate'] * 100:.0f}% "
+                  f"(exact {metrics['memory_hits'] + metrics['disk_hits']}, perceptual {metrics['perceptual_hits']}, "
+                  f"misses {metrics['misses']}) | wrong hits: {wrong}")
+            print(f"   Avg lookup: {metrics['avg_lookup_ms']:.2f}ms | inference skipped: ~{saved:.0f}s | "
+                  f"exact replay: {exact['match'] if exact else 'miss'}")
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+⏳ GEM OS - Bounded TTL Cache
+In-memory front tier for a slower store: a bounded LRU where every key can carry its
+own time to live, expired keys are found through a min-heap instead of a scan, and
+misses are remembered briefly so a key that doesn't exist isn't looked up every time.
+"""
+
+import heapq
+import itertools
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# get() results that aren't values
+MISSING = object()  # Not in the cache: ask the next tier
+ABSENT = object()   # Recently confirmed missing from the next tier (negative entry)
+
+
+def approximate_size(value: Any) -> int:
+    """Rough deep size in bytes of JSON-like values"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(key) + approximate_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(approximate_size(item) for item in value)
+    return size
+
+
+class TTLCache:
+    """LRU cache with per-key TTL, heap-driven expiry and negative entries.
+
+    ``put`` stores a value until ``ttl`` seconds pass (``default_ttl`` when omitted,
+    never when both are None). Entries beyond ``max_entries`` or ``max_bytes`` are
+    evicted least recently used first. Every entry with a deadline is also pushed on a
+    min-heap; each operation pops only the deadlines that have passed, so expiry costs
+    O(log n) per expired key and nothing for live ones. Overwritten keys leave stale
+    heap items behind, which are skipped on pop and compacted when they pile up.
+    ``put_negative`` records that the next tier doesn't have a key for ``negative_ttl``
+    seconds; ``get`` then returns ``ABSENT`` instead of ``MISSING``. ``clock`` supplies
+    the current time in seconds.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: Optional[int] = None,
+                 default_ttl: Optional[float] = None, negative_ttl: float = 5.0,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = itertools.count()
+        self._bytes = 0
+
+        self.metrics = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'negative_stores': 0,
+            'expirations': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    def _remove(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop every entry whose deadline has passed; returns how many"""
+        now = self._clock() if now is None else now
+        expired = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == expires_at:  # Otherwise a stale heap item
+                self._remove(key)
+                expired += 1
+        self.metrics['expirations'] += expired
+        return expired
+
+    def _insert(self, key: Hashable, value: Any, ttl: Optional[float], size: int):
+        now = self._clock()
+        self.expire(now)
+        self._remove(key)
+        expires_at = now + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        if expires_at is not None:
+            heapq.heappush(self._heap, (expires_at, next(self._counter), key))
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [(entry[1], next(self._counter), key) for key, entry in self._entries.items()
+                              if entry[1] is not None]
+                heapq.heapify(self._heap)
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted[2]
+            self.metrics['evictions'] += 1
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """Cache a value (``size`` in bytes if the caller already knows it)"""
+        self._insert(key, value, self.default_ttl if ttl is None else ttl,
+                     approximate_size(value) if size is None else size)
+        self.metrics['stores'] += 1
+
+    def put_negative(self, key: Hashable):
+        """Remember that the next tier has no value for ``key``"""
+        self._insert(key, ABSENT, self.negative_ttl, sys.getsizeof(key))
+        self.metrics['negative_stores'] += 1
+
+    def get(self, key: Hashable) -> Any:
+        """The cached value, ``ABSENT`` for a negative entry, or ``MISSING``"""
+        now = self._clock()
+        self.expire(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.metrics['misses'] += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        if entry[0] is ABSENT:
+            self.metrics['negative_hits'] += 1
+        else:
+            self.metrics['hits'] += 1
+        return entry[0]
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Forget a key (value or negative entry)"""
+        removed = self._remove(key)
+        if removed:
+            self.metrics['invalidations'] += 1
+        return removed
+
+    def clear(self):
+        self._entries.clear()
+        self._heap = []
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self.expire()
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] is not ABSENT
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get hit-rate and memory footprint metrics"""
+        lookups = self.metrics['hits'] + self.metrics['negative_hits'] + self.metrics['misses']
+        negative = sum(1 for entry in self._entries.values() if entry[0] is ABSENT)
+        return dict(
+            self.metrics,
+            entries=len(self._entries) - negative,
+            negative_entries=negative,
+            bytes=self._bytes,
+            heap_items=len(self._heap),
+            hit_rate=(self.metrics['hits'] + self.metrics['negative_hits']) / lookups if lookups else 0.0
+        )
+
+
+def main():
+    """Unbounded dict vs TTL cache on a stream of short-lived keys, plus negative caching"""
+    import random
+    import sqlite3
+    import tracemalloc
+
+    random.seed(11)
+    writes = 100_000
+    print("⏳ GEM OS - TTL cache benchmark")
+    print("=" * 50)
+
+    # Agents publish short-lived state (5s TTL) under ever-new keys, simulated clock
+    clock = [1_000_000.0]
+    for name, make in (("🐘 plain dict", dict),
+                       ("⏳ TTL cache", lambda: TTLCache(max_entries=8192, clock=lambda: clock[0]))):
+        tracemalloc.start()
+        store = make()
+        stale_served = 0
+        for number in range(writes):
+            clock[0] += 0.001  # 1000 writes per simulated second
+            value = {'task': number, 'status': 'running', 'agent': 'gemini'}
+            if isinstance(store, TTLCache):
+                store.put(f"task_{number}", value, ttl=5.0, size=120)
+                old = store.get(f"task_{number - 6000}") if number >= 6000 else MISSING
+                stale_served += old is not MISSING
+            else:
+                store[f"task_{number}"] = {'value': value, 'expires_at': clock[0] + 5.0}
+                stale_served += f"task_{number - 6000}" in store
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name}: {len(store):,} entries held, {current / 1e6:.1f} MB, "
+              f"expired values served: {stale_served:,}")
+
+    # Miss-heavy lookups against a SQLite tier
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE shared_memory (key TEXT PRIMARY KEY, value TEXT)')
+    conn.executemany('INSERT INTO shared_memory VALUES (?, ?)', [(f"key_{number}", '{}') for number in range(1000)])
+    keys = [f"key_{random.randrange(2000)}" for _ in range(50_000)]  # Half the keys don't exist
+    for name, negative in (("without negative caching", False), ("with negative caching", True)):
+        cache = TTLCache(max_entries=4096, negative_ttl=60.0)
+        queries = 0
+        start_time = time.perf_counter()
+        for key in keys:
+            if cache.get(key) is MISSING:
+                queries += 1
+                row = conn.execute('SELECT value FROM shared_memory WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    cache.put(key, row[0], ttl=60.0)
+                elif negative:
+                    cache.put_negative(key)
+        elapsed = time.perf_counter() - start_time
+        metrics = cache.get_metrics()
+        print(f"🔍 {name}: {queries:,} SQLite queries for {len(keys):,} lookups | "
+              f"hit rate {metrics['hit_rate'] * 100:.0f}% | {elapsed / len(keys) * 1e6:.2f}µs per lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+💾 GEM OS - Phrase Audio Cache
+Synthesized speech keyed by (text, voice, engine, sample rate, rate). Hot phrases sit
+in a memory LRU; prompts and phrases that keep coming back go to an append-only int16
+PCM file that is memory-mapped, so fixed prompts cost one synthesis ever instead of one
+network round trip per use. One-off sentences never touch the disk.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from sqlite_writer import close_at_exit
+
+TTS_CACHE_DIR = Path(os.getenv('GEM_TTS_CACHE_DIR', Path.home() / '.cache' / 'gemos' / 'tts'))
+
+
+class PhraseAudioCache:
+    """Memory LRU over an mmap-backed on-disk PCM store.
+
+    ``phrases.pcm`` holds persisted phrases back to back; ``index.json`` maps cache
+    keys to ``(offset, samples)``. Disk hits are zero-copy memmap views. Prewarmed
+    prompts are pinned to disk; any other phrase is only kept in memory until
+    ``get_or_synthesize`` has seen it ``persist_after`` times. Texts longer than
+    ``max_phrase_chars`` are not persisted. Once the store outgrows ``max_disk_bytes``
+    or ``max_phrases`` it is compacted to its pinned and most recently used half.
+    Index changes are written by a timer thread at most every ``index_flush_interval``
+    seconds, never on the caller's thread.
+    """
+
+    def __init__(self, directory: Path = TTS_CACHE_DIR, memory_budget_bytes: int = 32 * 1024 * 1024,
+                 max_disk_bytes: int = 256 * 1024 * 1024, max_phrase_chars: int = 200,
+                 max_phrases: int = 2048, persist_after: int = 2, index_flush_interval: float = 2.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.data_path = self.directory / 'phrases.pcm'
+        self.index_path = self.directory / 'index.json'
+        self.memory_budget_bytes = memory_budget_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_phrase_chars = max_phrase_chars
+        self.max_phrases = max_phrases
+        self.persist_after = persist_after
+        self.index_flush_interval = index_flush_interval
+
+        self._index: Dict[str, Dict[str, Any]] = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        self.data_path.touch(exist_ok=True)
+        self._map: Optional[np.memmap] = None
+        self._mapped_size = 0
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        # Uses of phrases not persisted yet (bounded, oldest forgotten first)
+        self._sightings: "OrderedDict[str, int]" = OrderedDict()
+        self._max_sightings = 4 * max_phrases
+
+        self._index_lock = threading.Lock()
+        self._index_timer: Optional[threading.Timer] = None
+        self._closed = False
+        close_at_exit(self)
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'skipped': 0,
+            'memory_only': 0,
+            'index_writes': 0
+        }
+
+    @staticmethod
+    def make_key(text: str, voice: str, engine: str, sample_rate: int, rate: Optional[int] = None) -> str:
+        normalized = ' '.join(text.split())
+        material = f"{engine}\x00{voice}\x00{sample_rate}\x00{rate}\x00{normalized}"
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _mapped(self) -> Optional[np.memmap]:
+        size = self.data_path.stat().st_size
+        if size == 0:
+            return None
+        if self._map is None or size != self._mapped_size:
+            self._map = np.memmap(self.data_path, dtype=np.int16, mode='r')
+            self._mapped_size = size
+        return self._map
+
+    def _remember(self, key: str, pcm: np.ndarray):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = pcm
+        self._memory_bytes += pcm.nbytes
+        while self._memory_bytes > self.memory_budget_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self.stats['evictions'] += 1
+
+    def get(self, text: str, voice: str, engine: str, sample_rate: int,
+            rate: Optional[int] = None) -> Optional[np.ndarray]:
+        """Cached PCM for a phrase, or None"""
+        key = self.make_key(text, voice, engine, sample_rate, rate)
+        pcm = self._memory.get(key)
+        if pcm is not None:
+            self._memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            entry = self._index.get(key)
+            if entry is not None:
+                entry['last_used'] = time.time()
+            return pcm
+
+        entry = self._index.get(key)
+        mapped = self._mapped() if entry else None
+        if entry is None or mapped is None or entry['offset'] + entry['samples'] > len(mapped):
+            self.stats['misses'] += 1
+            return None
+
+        pcm = mapped[entry['offset']:entry['offset'] + entry['samples']]
+        entry['last_used'] = time.time()
+        self._remember(key, pcm)
+        self.stats['disk_hits'] += 1
+        return pcm
+
+    def put(self, text: str, voice: str, engine: str, sample_rate: int, pcm: np.ndarray,
+            rate: Optional[int] = None, pinned: bool = False) -> bool:
+        """Append a phrase to the store (``pinned`` phrases survive compaction first)"""
+        if len(text) > self.max_phrase_chars or not len(pcm):
+            self.stats['skipped'] += 1
+            return False
+        key = self.make_key(text, voice, engine, sample_rate, rate)
+        pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+        with open(self.data_path, 'ab') as f:
+            offset = f.tell() // 2
+            f.write(pcm.tobytes())
+        now = time.time()
+        with self._index_lock:
+            self._index[key] = {'offset': offset, 'samples': len(pcm), 'text': text[:80],
+                                'created_at': now, 'last_used': now, 'pinned': pinned}
+        self._sightings.pop(key, None)
+        self._remember(key, pcm)
+        self.stats['stores'] += 1
+
+        if self.data_path.stat().st_size > self.max_disk_bytes or len(self._index) > self.max_phrases:
+            self._compact()
+        self._schedule_index_save()
+        return True
+
+    def _schedule_index_save(self):
+        """Coalesce index changes into one background write per flush interval"""
+        with self._index_lock:
+            if self._index_timer is not None or self._closed:
+                return
+            self._index_timer = threading.Timer(self.index_flush_interval, self._save_index)
+            self._index_timer.daemon = True
+            self._index_timer.start()
+
+    def _save_index(self):
+        with self._index_lock:
+            self._index_timer = None
+            snapshot = {key: dict(entry) for key, entry in self._index.items()}
+        temp_path = self.index_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(temp_path, self.index_path)
+        self.stats['index_writes'] += 1
+
+    def _compact(self):
+        """Rewrite the store keeping pinned, then most recently used phrases (up to half the caps)"""
+        mapped = self._mapped()
+        keep, kept_bytes = [], 0
+        ranked = sorted(self._index.items(),
+                        key=lambda item: (item[1].get('pinned', False), item[1]['last_used']), reverse=True)
+        for key, entry in ranked:
+            if kept_bytes + entry['samples'] * 2 > self.max_disk_bytes // 2 or len(keep) >= self.max_phrases // 2:
+                break
+            keep.append((key, entry))
+            kept_bytes += entry['samples'] * 2
+        self.stats['evictions'] += len(self._index) - len(keep)
+        persisted = set(self._index)
+
+        temp_path = self.data_path.with_suffix('.tmp')
+        index, offset = {}, 0
+        with open(temp_path, 'wb') as f:
+            for key, entry in keep:
+                f.write(mapped[entry['offset']:entry['offset'] + entry['samples']].tobytes())
+                index[key] = dict(entry, offset=offset)
+                offset += entry['samples']
+        self._map = None
+        os.replace(temp_path, self.data_path)
+        with self._index_lock:
+            self._index = index
+        # Memory entries may be views on the old file - drop the ones that were compacted away
+        for key in [key for key in self._memory if key in persisted and key not in index]:
+            self._memory_bytes -= self._memory.pop(key).nbytes
+
+    async def get_or_synthesize(self, text: str, voice: str, engine: str, sample_rate: int,
+                                synthesize: Callable[[str], Awaitable[np.ndarray]],
+                                rate: Optional[int] = None) -> np.ndarray:
+        """Return cached audio, synthesizing it on a miss.
+
+        New audio is kept in memory; it is persisted once the phrase has been asked for
+        ``persist_after`` times, so one-off LLM sentences don't pile up on disk.
+        """
+        key = self.make_key(text, voice, engine, sample_rate, rate)
+        pcm = self.get(text, voice, engine, sample_rate, rate)
+        if pcm is None:
+            pcm = await synthesize(text)
+            if len(pcm):
+                self._remember(key, np.ascontiguousarray(pcm, dtype=np.int16))
+        if key not in self._index and len(pcm):
+            uses = self._sightings.pop(key, 0) + 1
+            if uses >= self.persist_after:
+                self.put(text, voice, engine, sample_rate, pcm, rate)
+            else:
+                self._sightings[key] = uses
+                self.stats['memory_only'] += 1
+                while len(self._sightings) > self._max_sightings:
+                    self._sightings.popitem(last=False)
+        return pcm
+
+    async def prewarm(self, phrases: Iterable[str], voice: str, engine: str, sample_rate: int,
+                      synthesize: Callable[[str], Awaitable[np.ndarray]], rate: Optional[int] = None) -> int:
+        """Synthesize every phrase that isn't cached yet; returns how many were added"""
+        added = 0
+        for phrase in phrases:
+            key = self.make_key(phrase, voice, engine, sample_rate, rate)
+            if key in self._index:
+                continue
+            try:
+                pcm = await synthesize(phrase)
+            except Exception:
+                continue
+            added += self.put(phrase, voice, engine, sample_rate, pcm, rate, pinned=True)
+        return added
+
+    def close(self):
+        """Write any pending index changes now"""
+        with self._index_lock:
+            self._closed = True
+            timer, self._index_timer = self._index_timer, None
+        if timer is not None:
+            timer.cancel()
+            self._save_index()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit-rate statistics"""
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return {
+            'phrases': len(self._index),
+            'memory_phrases': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+            'disk_bytes': self.data_path.stat().st_size,
+            'memory_hits': self.stats['memory_hits'],
+            'disk_hits': self.stats['disk_hits'],
+            'misses': self.stats['misses'],
+            'stores': self.stats['stores'],
+            'evictions': self.stats['evictions'],
+            'memory_only': self.stats['memory_only'],
+            'index_writes': self.stats['index_writes'],
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
+
+
+def main():
+    """Hit rate and latency on a talkai-like prompt mix with a fake 180 ms synthesizer"""
+    import random
+
+    sample_rate = 16000
+    prompts = ["I'm listening.", "I'm sorry, I didn't quite catch that. Please try again.",
+               "Conversation history cleared. I'm ready for a fresh start."]
+    calls = {'count': 0}
+
+    async def fake_polly(text: str) -> np.ndarray:
+        calls['count'] += 1
+        await asyncio.sleep(0.18)  # Network round trip + synthesis
+        return (np.random.randn(int(len(text) * 0.06 * sample_rate)) * 1000).astype(np.int16)
+
+    async def run():
+        print("💾 GEM OS - Phrase audio cache benchmark")
+        print("=" * 50)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = PhraseAudioCache(Path(directory))
+            start_time = time.perf_counter()
+            added = await cache.prewarm(prompts, 'Joanna', 'neural', sample_rate, fake_polly)
+            print(f"🔥 Prewarmed {added} prompts in {time.perf_counter() - start_time:.2f}s")
+
+            random.seed(3)
+            turns = 50
+            latencies = []
+            for turn in range(turns):
+                # Every turn says "I'm listening."; some turns add a fixed error prompt or a unique reply
+                texts = [prompts[0]]
+                if random.random() < 0.2:
+                    texts.append(prompts[1])
+                texts.append(f"Here is answer number {turn}.")
+                for text in texts:
+                    start_time = time.perf_counter()
+                    await cache.get_or_synthesize(text, 'Joanna', 'neural', sample_rate, fake_polly)
+                    latencies.append((text in prompts, time.perf_counter() - start_time))
+
+            prompt_ms = [elapsed * 1000 for is_prompt, elapsed in latencies if is_prompt]
+            stats = cache.get_stats()
+            print(f"🎯 Hit rate: {stats['hit_rate'] * 100:.0f}% | Polly calls: {calls['count']} "
+                  f"for {len(latencies)} utterances")
+            print(f"⚡ Prompt latency: avg {sum(prompt_ms) / len(prompt_ms):.3f}ms (vs ~180ms uncached)")
+            print(f"🧹 On disk: {stats['phrases']} phrases (one-off answers kept in memory only: "
+                  f"{stats['memory_only']}) | index writes so far: {stats['index_writes']}")
+            cache.close()
+
+            # A fresh process maps the same store from disk
+            reopened = PhraseAudioCache(Path(directory))
+            start_time = time.perf_counter()
+            pcm = reopened.get(prompts[1], 'Joanna', 'neural', sample_rate)
+            print(f"🗂️ Disk (mmap) hit after restart: {(time.perf_counter() - start_time) * 1000:.3f}ms, "
+                  f"{len(pcm)} samples | store {stats['disk_bytes'] / 1024:.0f} KiB")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+🔈 GEM OS - Streaming Speech Output
+One continuously open output stream fed from a jitter buffer. Sentences are
+synthesized ahead of playback, so sentence N+1 is ready when sentence N ends, and
+barge-in silences the speaker within one audio block.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Union
+
+import numpy as np
+
+Synthesizer = Callable[[str], Awaitable[np.ndarray]]
+TextSource = Union[AsyncIterator[str], Iterable[str]]
+
+_END = object()
+
+
+class JitterBuffer:
+    """Thread-safe int16 PCM FIFO drained by the audio callback"""
+
+    def __init__(self):
+        self._chunks: deque = deque()
+        self._offset = 0
+        self._buffered = 0
+        self._lock = threading.Lock()
+
+    @property
+    def buffered(self) -> int:
+        return self._buffered
+
+    def write(self, pcm: np.ndarray):
+        pcm = np.ascontiguousarray(pcm, dtype=np.int16).reshape(-1)
+        if not len(pcm):
+            return
+        with self._lock:
+            self._chunks.append(pcm)
+            self._buffered += len(pcm)
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Fill ``out`` from the buffer, zero-padding; returns the number of real samples"""
+        filled = 0
+        with self._lock:
+            while filled < len(out) and self._chunks:
+                chunk = self._chunks[0]
+                take = min(len(out) - filled, len(chunk) - self._offset)
+                out[filled:filled + take] = chunk[self._offset:self._offset + take]
+                filled += take
+                self._offset += take
+                if self._offset == len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+            self._buffered -= filled
+        out[filled:] = 0
+        return filled
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+            self._offset = 0
+            self._buffered = 0
+
+
+class StreamingAudioOutput:
+    """Continuously open mono int16 output stream with utterance-level metrics.
+
+    ``begin`` starts an utterance, ``write`` queues PCM (from any thread), ``finish``
+    marks the end and ``wait_drained`` resolves once it has been played. ``stop_now``
+    drops everything queued; the next callback, at most one block later, is silent.
+    Playback of an utterance starts once ``prebuffer_ms`` of audio is queued (or the
+    utterance is finished), which absorbs synthesis jitter.
+    """
+
+    def __init__(self, sample_rate: int = 16000, block_ms: int = 20, prebuffer_ms: int = 60,
+                 stream_factory: Optional[Callable[..., Any]] = None):
+        self.sample_rate = sample_rate
+        self.blocksize = int(sample_rate * block_ms / 1000)
+        self.prebuffer = int(sample_rate * prebuffer_ms / 1000)
+        self._stream_factory = stream_factory or self._sounddevice_stream
+        self._stream = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._drained: Optional[asyncio.Event] = None
+        self.buffer = JitterBuffer()
+
+        # Utterance state (shared with the audio thread)
+        self._active = False
+        self._finished = False
+        self._playing = False
+        self._begin_time = 0.0
+        self._first_audio = False
+        self._gap_samples = 0
+        self._stop_requested_at: Optional[float] = None
+
+        self.metrics = {
+            'time_to_first_audio': deque(maxlen=500),
+            'gaps': deque(maxlen=500),
+            'underruns': 0,
+            'stop_latencies': deque(maxlen=500),
+            'utterances': 0
+        }
+
+    def _sounddevice_stream(self, callback):
+        import sounddevice as sd
+        return sd.OutputStream(samplerate=self.sample_rate, channels=1, dtype='int16',
+                               blocksize=self.blocksize, latency='low', callback=callback)
+
+    def start(self):
+        """Open the output stream (idempotent); must be called from the event loop"""
+        if self._stream is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._stream = self._stream_factory(self._callback)
+        self._stream.start()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    @property
+    def is_active(self) -> bool:
+        return self._active
+
+    def begin(self):
+        """Start a new utterance"""
+        self.start()
+        self.buffer.clear()
+        self._drained.clear()
+        self._begin_time = time.perf_counter()
+        self._first_audio = False
+        self._gap_samples = 0
+        self._finished = False
+        self._playing = False
+        self._stop_requested_at = None
+        self._active = True
+        self.metrics['utterances'] += 1
+
+    def write(self, pcm: np.ndarray):
+        """Queue PCM for the current utterance (thread-safe)"""
+        if self._active:
+            self.buffer.write(pcm)
+
+    def finish(self):
+        """No more audio for this utterance; resolve ``wait_drained`` once it's played"""
+        self._finished = True
+        if not self._active:
+            self._drained.set()
+
+    async def wait_drained(self):
+        await self._drained.wait()
+
+    def stop_now(self):
+        """Barge-in: drop queued audio, the next block is silence"""
+        if not self._active:
+            return
+        self._stop_requested_at = time.perf_counter()
+        self._active = False
+        self.buffer.clear()
+
+    def _set_drained(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._drained.set)
+
+    def _callback(self, outdata, frames, time_info, status):
+        """Audio thread: never blocks, never allocates beyond the output view"""
+        out = outdata[:, 0] if outdata.ndim > 1 else outdata
+
+        if self._stop_requested_at is not None:
+            out[:] = 0
+            self.metrics['stop_latencies'].append(time.perf_counter() - self._stop_requested_at)
+            self._stop_requested_at = None
+            self._playing = False
+            self._set_drained()
+            return
+
+        if not self._active:
+            out[:] = 0
+            return
+
+        if not self._playing:
+            if self.buffer.buffered >= self.prebuffer or (self._finished and self.buffer.buffered):
+                self._playing = True
+            elif self._finished:
+                out[:] = 0
+                self._active = False
+                self._set_drained()
+                return
+            else:
+                out[:] = 0
+                if self._first_audio:
+                    self._gap_samples += len(out)
+                return
+
+        filled = self.buffer.read_into(out)
+        if filled:
+            if not self._first_audio:
+                self._first_audio = True
+                self.metrics['time_to_first_audio'].append(time.perf_counter() - self._begin_time)
+            elif self._gap_samples:
+                self.metrics['gaps'].append(self._gap_samples / self.sample_rate)
+                self._gap_samples = 0
+        if filled < len(out):
+            self._playing = False
+            if not self._finished:
+                # Ran dry mid-utterance - synthesis fell behind playback
+                self.metrics['underruns'] += 1
+                self._gap_samples += len(out) - filled
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Latency metrics in milliseconds"""
+        def summary(samples):
+            if not samples:
+                return {'count': 0, 'avg_ms': 0.0, 'max_ms': 0.0}
+            return {'count': len(samples), 'avg_ms': sum(samples) / len(samples) * 1000,
+                    'max_ms': max(samples) * 1000}
+        return {
+            'utterances': self.metrics['utterances'],
+            'time_to_first_audio': summary(self.metrics['time_to_first_audio']),
+            'gaps': summary(self.metrics['gaps']),
+            'underruns': self.metrics['underruns'],
+            'stop_latency': summary(self.metrics['stop_latencies'])
+        }
+
+
+async def _iterate_text(source: TextSource) -> AsyncIterator[str]:
+    """Accept async iterators as well as plain (possibly blocking) generators"""
+    if hasattr(source, '__aiter__'):
+        async for item in source:
+            yield item
+        return
+
+    # Blocking generators (e.g. a streaming LLM client) are pulled on a worker thread
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def pump():
+        try:
+            for item in source:
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, _END)
+
+    pump_future = loop.run_in_executor(None, pump)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+        await asyncio.gather(pump_future, return_exceptions=True)
+
+
+async def speak_stream(text_source: TextSource, synthesize: Synthesizer, output: StreamingAudioOutput,
+                       max_lookahead_seconds: float = 8.0):
+    """Synthesize sentences as they arrive and keep the output fed.
+
+    Synthesis of the next sentence starts as soon as the previous one is queued, so it
+    overlaps playback; it pauses while more than ``max_lookahead_seconds`` of audio is
+    already waiting, to avoid wasted work on barge-in.
+    """
+    output.begin()
+    lookahead = int(max_lookahead_seconds * output.sample_rate)
+    try:
+        async for sentence in _iterate_text(text_source):
+            if not output.is_active:
+                break  # Interrupted
+            if not sentence.strip():
+                continue
+            while output.buffer.buffered > lookahead and output.is_active:
+                await asyncio.sleep(0.05)
+            pcm = await synthesize(sentence.strip())
+            output.write(pcm)
+    finally:
+        output.finish()
+    await output.wait_drained()
+
+
+class FakeOutputStream:
+    """Drives the callback in real time from a thread - benchmarks without a sound card"""
+
+    def __init__(self, callback, sample_rate: int = 16000, blocksize: int = 320):
+        self.callback = callback
+        self.blocksize = blocksize
+        self.period = blocksize / sample_rate
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        block = np.zeros((self.blocksize, 1), dtype=np.int16)
+        next_time = time.perf_counter()
+        while self._running:
+            self.callback(block, self.blocksize, None, None)
+            next_time += self.period
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+
+    def close(self):
+        pass
+
+
+def fake_synthesizer(sample_rate: int = 16000, seconds_per_char: float = 0.06,
+                     latency: float = 0.15) -> Synthesizer:
+    """Stand-in for Polly: fixed latency, then a tone as long as the sentence would take to say"""
+    async def synthesize(text: str) -> np.ndarray:
+        await asyncio.sleep(latency)
+        t = np.arange(int(len(text) * seconds_per_char * sample_rate)) / sample_rate
+        return (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16)
+    return synthesize
+
+
+def main():
+    """Measure time-to-first-audio, inter-sentence gaps and barge-in latency"""
+    sample_rate = 16000
+    sentences = ["Hello there.", "Here is the forecast for today.", "Expect light rain after noon.",
+                 "Take an umbrella if you go out."]
+
+    async def run():
+        print("🔈 GEM OS - Streaming speech output benchmark")
+        print("=" * 50)
+        synthesize = fake_synthesizer(sample_rate)
+
+        def blocking_generator(items):
+            # talkai passes GeminiProClient's plain generator straight through
+            for sentence in items:
+                time.sleep(0.05)
+                yield sentence
+
+        # Old path: pull a sentence, synthesize it, play to the end, repeat
+        start_time = time.perf_counter()
+        first_audio = None
+        gaps = []
+        playback_end = None
+        for sentence in blocking_generator(sentences):
+            pcm = await synthesize(sentence)
+            now = time.perf_counter()
+            if first_audio is None:
+                first_audio = now - start_time
+            else:
+                gaps.append(now - playback_end)
+            await asyncio.sleep(len(pcm) / sample_rate)  # sd.play + sd.wait
+            playback_end = time.perf_counter()
+        print(f"🐢 play-and-wait per sentence: TTFA {first_audio * 1000:.0f}ms | "
+              f"gaps {len(gaps)} (max {max(gaps) * 1000:.0f}ms), total {time.perf_counter() - start_time:.2f}s")
+
+        output = StreamingAudioOutput(sample_rate, stream_factory=lambda callback: FakeOutputStream(
+            callback, sample_rate, int(sample_rate * 0.02)))
+        start_time = time.perf_counter()
+        await speak_stream(blocking_generator(sentences), synthesize, output)
+        metrics = output.get_metrics()
+        print(f"🚀 streaming output: TTFA {metrics['time_to_first_audio']['avg_ms']:.0f}ms | "
+              f"gaps {metrics['gaps']['count']} (max {metrics['gaps']['max_ms']:.0f}ms) | "
+              f"underruns {metrics['underruns']}, total {time.perf_counter() - start_time:.2f}s")
+
+        # Barge-in halfway through a long answer
+        task = asyncio.create_task(speak_stream(iter(sentences * 3), synthesize, output))
+        await asyncio.sleep(1.0)
+        output.stop_now()
+        await task
+        stop = output.get_metrics()['stop_latency']
+        print(f"✋ barge-in: silence after {stop['max_ms']:.1f}ms (block {1000 * output.blocksize / sample_rate:.0f}ms)")
+        output.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -9,19 +9,33 @@ import asyncio
 import json
 import time
 import os
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional, AsyncGenerator
+from typing import Dict, List, Any, Optional, AsyncGenerator, AsyncIterator
 import logging
 
+from backend_connections import BackendConnectionManager, get_connection_manager
+from backend_router import AdaptiveRouter
+from response_cache import ResponseCache
+from semantic_cache import SemanticCache
+from sentence_segmenter import SentenceSegmenter
+
+OLLAMA_ENDPOINT = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
+
 class UnifiedAIClient:
     """REAL unified AI client - single interface for all AI processing"""
     
-    def __init__(self):
+    def __init__(self, connections: Optional[BackendConnectionManager] = None):
         self.version = "2.0.0-Unified"
         self.response_time_target = 2.0  # seconds
         self.context_memory_limit = 10000  # tokens
         
-        # Available AI backends (REAL, not examples)
+        # Shared keep-alive sessions/clients for every backend
+        self.connections = connections or get_connection_manager()
+        self.health_check_interval = 30.0  # seconds between Ollama probes
+        self._last_health_check = 0.0
+        
+        # Available AI backends (REAL, not examples); response_time/reliability are only the router's priors
         self.backends = {
             'google_ai': {
                 'available': bool(os.getenv('GOOGLE_AI_API_KEY')),
@@ -31,8 +45,8 @@ class UnifiedAIClient:
                 'reliability': 0.98
             },
             'ollama_local': {
-                'available': self._check_ollama_availability(),
-                'endpoint': 'http://localhost:11434',
+                'available': False,  # Probed asynchronously before the first request
+                'endpoint': OLLAMA_ENDPOINT,
                 'models': ['phi3:mini', 'llama3.2:1b'],
                 'response_time': 1.2,  # average seconds
                 'reliability': 0.95
@@ -46,6 +60,13 @@ class UnifiedAIClient:
             }
         }
         
+        # Measured latency/errors per backend and request type, with hedging and circuit breaking
+        self.router = AdaptiveRouter(
+            self.backends,
+            prior_latency={name: info['response_time'] for name, info in self.backends.items()},
+            prior_error={name: 1.0 - info['reliability'] for name, info in self.backends.items()}
+        )
+        
         # Context memory system (REAL persistence)
         self.context_memory = {
             'conversation_history': [],
@@ -55,8 +76,16 @@ class UnifiedAIClient:
             'session_start': datetime.now().isoformat()
         }
         
-        # Response cache for performance
-        self.response_cache = {}
+        # Response cache for performance: bounded LRU with TTL, persisted when GEM_RESPONSE_CACHE_DB is set
+        self.response_cache = ResponseCache(
+            max_entries=int(os.getenv('GEM_RESPONSE_CACHE_ENTRIES', '512')),
+            default_ttl=float(os.getenv('GEM_RESPONSE_CACHE_TTL', '3600')),
+            db_path=os.getenv('GEM_RESPONSE_CACHE_DB')
+        )
+        # Rephrased standalone questions ("tell me the capital of France") hit here
+        self.semantic_cache = SemanticCache(
+            threshold=float(os.getenv('GEM_SEMANTIC_CACHE_THRESHOLD', '0.8'))
+        )
         self.cache_hit_rate = 0.0
         
         # Performance metrics
@@ -66,6 +95,9 @@ class UnifiedAIClient:
             'failed_responses': 0,
             'average_response_time': 0.0,
             'cache_hits': 0,
+            'semantic_cache_hits': 0,
+            'streamed_responses': 0,
+            'time_to_first_token': deque(maxlen=200),
             'backend_usage': {backend: 0 for backend in self.backends.keys()}
         }
         
@@ -74,15 +106,41 @@ class UnifiedAIClient:
         print("🧠 GEMINI: Unified AI Client initialized")
         self._display_backend_status()
         
-    def _check_ollama_availability(self) -> bool:
-        """Check if Ollama is running locally"""
-        try:
-            import requests
-            response = requests.get('http://localhost:11434/api/tags', timeout=2)
-            return response.status_code == 200
-        except:
-            return False
-            
+    async def refresh_backend_health(self, deep: bool = False):
+        """Probe backends without blocking the event loop.
+        
+        Ollama availability comes from its /api/tags endpoint. Cloud backends are
+        considered available when a key is set; ``deep`` also probes them with an
+        authenticated, non-billed call.
+        """
+        self._last_health_check = time.time()
+        ollama = self.backends['ollama_local']
+        probes = [self.connections.probe_http('ollama_local', f"{ollama['endpoint']}/api/tags")]
+        if deep and self.backends['openai']['api_key']:
+            probes.append(self.connections.probe_openai('openai', self.backends['openai']['api_key']))
+        if deep and self.backends['google_ai']['api_key']:
+            probes.append(self.connections.probe_gemini('google_ai', self.backends['google_ai']['api_key']))
+        await asyncio.gather(*probes)
+        
+        was_available = ollama['available']
+        ollama['available'] = bool(self.connections.is_healthy('ollama_local'))
+        if deep:
+            for backend in ('openai', 'google_ai'):
+                if self.backends[backend]['api_key']:
+                    self.backends[backend]['available'] = bool(self.connections.is_healthy(backend))
+        if ollama['available'] != was_available:
+            self._display_backend_status()
+            
+    async def _ensure_backend_health(self):
+        """Re-probe when the last check is older than ``health_check_interval``"""
+        if time.time() - self._last_health_check > self.health_check_interval:
+            await self.refresh_backend_health()
+            
+    async def close(self):
+        """Release the shared backend connections and the response cache"""
+        await self.connections.close()
+        self.response_cache.close()
+        
     def _display_backend_status(self):
         """Display available AI backends"""
         print("\n🔍 AI BACKEND STATUS:")
@@ -96,53 +154,64 @@ class UnifiedAIClient:
         available_backends = sum(1 for info in self.backends.values() if info['available'])
         print(f"\n📊 Total available backends: {available_backends}/{len(self.backends)}")
         
-    def _select_best_backend(self, request_type: str = "general") -> Optional[str]:
-        """Select best available backend based on performance and availability"""
-        available_backends = {k: v for k, v in self.backends.items() if v['available']}
+    def _available_backends(self) -> List[str]:
+        return [name for name, info in self.backends.items() if info['available']]
         
-        if not available_backends:
-            return None
-            
-        # Score backends based on response time and reliability
-        scored_backends = []
-        for backend, info in available_backends.items():
-            score = (info['reliability'] * 0.7) + ((2.0 - info['response_time']) / 2.0 * 0.3)
-            scored_backends.append((backend, score))
-            
-        # Sort by score (highest first)
-        scored_backends.sort(key=lambda x: x[1], reverse=True)
+    def _request_type(self, accessibility_mode: bool, emergency_mode: bool) -> str:
+        """Routing class: the mode prompts change how long backends take to answer"""
+        if emergency_mode:
+            return 'emergency'
+        return 'accessibility' if accessibility_mode else 'general'
         
-        return scored_backends[0][0]
+    def _select_best_backend(self, request_type: str = "general") -> Optional[str]:
+        """Select the available backend with the best measured latency and error rate"""
+        ranked = self.router.rank(request_type, self._available_backends())
+        return ranked[0] if ranked else None
         
-    def _generate_cache_key(self, prompt: str, context: List[Dict]) -> str:
-        """Generate cache key for response caching"""
-        import hashlib
+    def _generate_cache_key(self, prompt: str, context: List[Dict], accessibility_mode: bool,
+                            emergency_mode: bool) -> str:
+        """Generate cache key for response caching (raw prompt, so hits skip prompt prefixing)"""
+        return ResponseCache.make_key(prompt, context, accessibility_mode, emergency_mode)
         
-        cache_data = {
-            'prompt': prompt,
-            'context_length': len(context),
-            'last_context': context[-1] if context else {}
-        }
+    def _check_caches(self, cache_key: str, prompt: str, accessibility_mode: bool,
+                      emergency_mode: bool) -> Optional[str]:
+        """Exact match first, then a semantic match for rephrased standalone questions"""
+        if emergency_mode:
+            return None
+        cached_response = self.response_cache.get(cache_key)
+        if cached_response is None:
+            match = self.semantic_cache.lookup(prompt, scope=f"accessibility={accessibility_mode}")
+            if match is None:
+                return None
+            self.metrics['semantic_cache_hits'] += 1
+            cached_response = match['response']
+        self.metrics['cache_hits'] += 1
+        return cached_response
+        
+    def _cache_response(self, cache_key: str, prompt: str, response: str, accessibility_mode: bool,
+                        emergency_mode: bool):
+        """Store an answer in both caches (emergency answers are always generated fresh)"""
+        if emergency_mode:
+            return
+        self.response_cache.put(cache_key, response)
+        self.semantic_cache.store(prompt, response, scope=f"accessibility={accessibility_mode}")
         
-        cache_string = json.dumps(cache_data, sort_keys=True)
-        return hashlib.md5(cache_string.encode()).hexdigest()
+    def _build_conversation_text(self, prompt: str, context: List[Dict]) -> str:
+        """Flatten recent context into a single Gemini prompt"""
+        conversation_text = ""
+        for msg in context[-5:]:  # Last 5 messages for context
+            role = msg.get('role', 'user')
+            content = msg.get('content', '')
+            conversation_text += f"{role}: {content}\n"
+            
+        return conversation_text + f"user: {prompt}"
         
     async def _call_google_ai(self, prompt: str, context: List[Dict]) -> str:
         """Call Google AI API"""
         try:
-            import google.generativeai as genai
+            model = self.connections.gemini_model(self.backends['google_ai']['api_key'], 'gemini-1.5-flash')
             
-            genai.configure(api_key=self.backends['google_ai']['api_key'])
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            # Build conversation context
-            conversation_text = ""
-            for msg in context[-5:]:  # Last 5 messages for context
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                conversation_text += f"{role}: {content}\n"
-                
-            conversation_text += f"user: {prompt}"
+            conversation_text = self._build_conversation_text(prompt, context)
             
             response = await asyncio.to_thread(model.generate_content, conversation_text)
             return response.text
@@ -165,17 +234,17 @@ class UnifiedAIClient:
                 'stream': False
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    'http://localhost:11434/api/chat',
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=5.0)
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result['message']['content']
-                    else:
-                        raise Exception(f"Ollama API error: {response.status}")
+            session = await self.connections.http_session()
+            async with session.post(
+                f"{self.backends['ollama_local']['endpoint']}/api/chat",
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=5.0)
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result['message']['content']
+                else:
+                    raise Exception(f"Ollama API error: {response.status}")
                         
         except Exception as e:
             self.logger.error(f"Ollama call failed: {e}")
@@ -184,9 +253,7 @@ class UnifiedAIClient:
     async def _call_openai(self, prompt: str, context: List[Dict]) -> str:
         """Call OpenAI API"""
         try:
-            import openai
-            
-            client = openai.AsyncOpenAI(api_key=self.backends['openai']['api_key'])
+            client = self.connections.openai_client(self.backends['openai']['api_key'])
             
             messages = context[-5:] + [{'role': 'user', 'content': prompt}]
             
@@ -203,6 +270,113 @@ class UnifiedAIClient:
             self.logger.error(f"OpenAI call failed: {e}")
             raise
             
+    async def _stream_google_ai(self, prompt: str, context: List[Dict]) -> AsyncIterator[str]:
+        """Stream Google AI output chunk by chunk"""
+        model = self.connections.gemini_model(self.backends['google_ai']['api_key'], 'gemini-1.5-flash')
+        
+        response = await model.generate_content_async(
+            self._build_conversation_text(prompt, context), stream=True
+        )
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+                
+    async def _stream_ollama_local(self, prompt: str, context: List[Dict]) -> AsyncIterator[str]:
+        """Stream local Ollama output (newline-delimited JSON)"""
+        import aiohttp
+        
+        payload = {
+            'model': 'phi3:mini',
+            'messages': context[-5:] + [{'role': 'user', 'content': prompt}],
+            'stream': True
+        }
+        
+        session = await self.connections.http_session()
+        async with session.post(
+            f"{self.backends['ollama_local']['endpoint']}/api/chat",
+            json=payload,
+            # No total limit for long answers, but each token must arrive in time
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=2.0, sock_read=5.0)
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Ollama API error: {response.status}")
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                content = data.get('message', {}).get('content', '')
+                if content:
+                    yield content
+                if data.get('done'):
+                    break
+                        
+    async def _stream_openai(self, prompt: str, context: List[Dict]) -> AsyncIterator[str]:
+        """Stream OpenAI chat completion deltas"""
+        client = self.connections.openai_client(self.backends['openai']['api_key'])
+        
+        stream = await client.chat.completions.create(
+            model='gpt-4o-mini',
+            messages=context[-5:] + [{'role': 'user', 'content': prompt}],
+            max_tokens=1000,
+            timeout=5.0,
+            stream=True
+        )
+        async for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+                
+    def _apply_mode_prompts(self, prompt: str, accessibility_mode: bool, emergency_mode: bool) -> str:
+        """Prefix the accessibility/emergency instructions"""
+        # Add accessibility context if needed
+        if accessibility_mode:
+            accessibility_prompt = (
+                "Please provide a response that is optimized for screen readers and accessibility. "
+                "Use clear, descriptive language and avoid visual-only references. "
+            )
+            prompt = accessibility_prompt + prompt
+            
+        # Add emergency context if needed
+        if emergency_mode:
+            emergency_prompt = (
+                "EMERGENCY MODE: This is an urgent request. Provide immediate, clear, actionable guidance. "
+                "Prioritize safety and direct assistance. "
+            )
+            prompt = emergency_prompt + prompt
+            
+        return prompt
+        
+    def _record_response(self, prompt: str, response: str, backend: str, response_time: float):
+        """Update metrics and conversation memory after a successful answer"""
+        self.metrics['successful_responses'] += 1
+        self.metrics['backend_usage'][backend] += 1
+        
+        # Update average response time
+        total_successful = self.metrics['successful_responses']
+        current_avg = self.metrics['average_response_time']
+        self.metrics['average_response_time'] = (
+            (current_avg * (total_successful - 1) + response_time) / total_successful
+        )
+        
+        # Update context memory
+        self.context_memory['conversation_history'].append({
+            'role': 'user',
+            'content': prompt,
+            'timestamp': datetime.now().isoformat()
+        })
+        self.context_memory['conversation_history'].append({
+            'role': 'assistant',
+            'content': response,
+            'timestamp': datetime.now().isoformat(),
+            'backend': backend,
+            'response_time': response_time
+        })
+        
+        # Limit context memory size
+        if len(self.context_memory['conversation_history']) > 20:
+            self.context_memory['conversation_history'] = (
+                self.context_memory['conversation_history'][-20:]
+            )
+            
     async def generate_response(
         self, 
         prompt: str, 
@@ -220,81 +394,35 @@ class UnifiedAIClient:
             context = self.context_memory['conversation_history']
             
         # Check cache first
-        cache_key = self._generate_cache_key(prompt, context)
-        if cache_key in self.response_cache and not emergency_mode:
-            self.metrics['cache_hits'] += 1
-            cached_response = self.response_cache[cache_key]
+        user_prompt = prompt
+        cache_key = self._generate_cache_key(prompt, context, accessibility_mode, emergency_mode)
+        cached_response = self._check_caches(cache_key, prompt, accessibility_mode, emergency_mode)
+        if cached_response is not None:
             print(f"🔄 Cache hit: {time.time() - start_time:.3f}s")
             return cached_response
             
-        # Select best backend
-        backend = self._select_best_backend()
-        if not backend:
-            error_msg = "No AI backends available"
-            self.metrics['failed_responses'] += 1
-            raise Exception(error_msg)
-            
-        # Add accessibility context if needed
-        if accessibility_mode:
-            accessibility_prompt = (
-                "Please provide a response that is optimized for screen readers and accessibility. "
-                "Use clear, descriptive language and avoid visual-only references. "
-            )
-            prompt = accessibility_prompt + prompt
-            
-        # Add emergency context if needed
-        if emergency_mode:
-            emergency_prompt = (
-                "EMERGENCY MODE: This is an urgent request. Provide immediate, clear, actionable guidance. "
-                "Prioritize safety and direct assistance. "
-            )
-            prompt = emergency_prompt + prompt
+        await self._ensure_backend_health()
+        prompt = self._apply_mode_prompts(prompt, accessibility_mode, emergency_mode)
+        calls = {
+            'google_ai': self._call_google_ai,
+            'ollama_local': self._call_ollama_local,
+            'openai': self._call_openai
+        }
             
-        # Call selected backend
+        # Best measured backend first; hedged past its p95, failed over on error
         try:
-            if backend == 'google_ai':
-                response = await self._call_google_ai(prompt, context)
-            elif backend == 'ollama_local':
-                response = await self._call_ollama_local(prompt, context)
-            elif backend == 'openai':
-                response = await self._call_openai(prompt, context)
-            else:
-                raise Exception(f"Unknown backend: {backend}")
+            response, backend = await self.router.call(
+                self._request_type(accessibility_mode, emergency_mode),
+                lambda backend: calls[backend](prompt, context),
+                available=self._available_backends()
+            )
                 
-            # Update metrics
+            # Update metrics and context memory
             response_time = time.time() - start_time
-            self.metrics['successful_responses'] += 1
-            self.metrics['backend_usage'][backend] += 1
-            
-            # Update average response time
-            total_successful = self.metrics['successful_responses']
-            current_avg = self.metrics['average_response_time']
-            self.metrics['average_response_time'] = (
-                (current_avg * (total_successful - 1) + response_time) / total_successful
-            )
+            self._record_response(prompt, response, backend, response_time)
             
             # Cache response
-            self.response_cache[cache_key] = response
-            
-            # Update context memory
-            self.context_memory['conversation_history'].append({
-                'role': 'user',
-                'content': prompt,
-                'timestamp': datetime.now().isoformat()
-            })
-            self.context_memory['conversation_history'].append({
-                'role': 'assistant',
-                'content': response,
-                'timestamp': datetime.now().isoformat(),
-                'backend': backend,
-                'response_time': response_time
-            })
-            
-            # Limit context memory size
-            if len(self.context_memory['conversation_history']) > 20:
-                self.context_memory['conversation_history'] = (
-                    self.context_memory['conversation_history'][-20:]
-                )
+            self._cache_response(cache_key, user_prompt, response, accessibility_mode, emergency_mode)
                 
             print(f"🧠 {backend}: {response_time:.3f}s")
             
@@ -306,37 +434,122 @@ class UnifiedAIClient:
             
         except Exception as e:
             self.metrics['failed_responses'] += 1
-            self.logger.error(f"AI generation failed with {backend}: {e}")
+            self.logger.error(f"AI generation failed: {e}")
+            raise
             
-            # Try fallback backend
-            available_backends = [k for k, v in self.backends.items() if v['available'] and k != backend]
-            if available_backends and not emergency_mode:
-                fallback_backend = available_backends[0]
-                self.logger.info(f"Trying fallback backend: {fallback_backend}")
+    async def stream_response(
+        self,
+        prompt: str,
+        context: Optional[List[Dict]] = None,
+        accessibility_mode: bool = True,
+        emergency_mode: bool = False,
+        sentences: bool = True
+    ) -> AsyncGenerator[str, None]:
+        """Stream an AI response as it is generated.
+        
+        Yields whole sentences (ready for ``stream_and_speak``) or, with
+        ``sentences=False``, raw tokens. Backends race for the first token: the router
+        hedges on a second one past the first's p95 time-to-first-token and fails over
+        on errors. Once text has been yielded the answer can't switch backends. The
+        complete answer is cached and added to context memory only when the stream
+        finishes, so an interrupted answer is never cached.
+        """
+        start_time = time.time()
+        self.metrics['total_requests'] += 1
+        
+        # Use provided context or default
+        if context is None:
+            context = self.context_memory['conversation_history']
+            
+        segmenter = SentenceSegmenter() if sentences else None
+        
+        # Check cache first
+        user_prompt = prompt
+        cache_key = self._generate_cache_key(prompt, context, accessibility_mode, emergency_mode)
+        cached_response = self._check_caches(cache_key, prompt, accessibility_mode, emergency_mode)
+        if cached_response is not None:
+            print(f"🔄 Cache hit: {time.time() - start_time:.3f}s")
+            if segmenter is None:
+                yield cached_response
+            else:
+                for sentence in segmenter.feed(cached_response) + segmenter.flush():
+                    yield sentence
+            return
+            
+        await self._ensure_backend_health()
+        prompt = self._apply_mode_prompts(prompt, accessibility_mode, emergency_mode)
+        
+        streams = {
+            'google_ai': self._stream_google_ai,
+            'ollama_local': self._stream_ollama_local,
+            'openai': self._stream_openai
+        }
+        
+        async def first_token(backend: str):
+            tokens = streams[backend](prompt, context)
+            try:
+                return tokens, await tokens.__anext__()
+            except StopAsyncIteration:
+                return tokens, ''
+            except BaseException:
+                # Failed, or cancelled as the losing hedge - don't leave its connection open
+                await tokens.aclose()
+                raise
                 
+        # Streams are routed on time-to-first-token, kept apart from full-answer latency
+        request_type = f"{self._request_type(accessibility_mode, emergency_mode)}_stream"
+        try:
+            (tokens, token), backend = await self.router.call(request_type, first_token,
+                                                              available=self._available_backends())
+        except Exception as e:
+            self.metrics['failed_responses'] += 1
+            self.logger.error(f"AI streaming failed: {e}")
+            raise
+        self.metrics['time_to_first_token'].append(time.time() - start_time)
+            
+        parts: List[str] = []
+        try:
+            while True:
+                if token:
+                    parts.append(token)
+                    if segmenter is None:
+                        yield token
+                    else:
+                        for sentence in segmenter.feed(token):
+                            yield sentence
                 try:
-                    if fallback_backend == 'google_ai':
-                        response = await self._call_google_ai(prompt, context)
-                    elif fallback_backend == 'ollama_local':
-                        response = await self._call_ollama_local(prompt, context)
-                    elif fallback_backend == 'openai':
-                        response = await self._call_openai(prompt, context)
-                        
-                    self.metrics['successful_responses'] += 1
-                    self.metrics['backend_usage'][fallback_backend] += 1
-                    return response
-                    
-                except Exception as fallback_error:
-                    self.logger.error(f"Fallback backend {fallback_backend} also failed: {fallback_error}")
-                    
-            # All backends failed
-            raise Exception(f"All AI backends failed. Last error: {e}")
+                    token = await tokens.__anext__()
+                except StopAsyncIteration:
+                    break
+        except Exception as e:
+            # Part of the answer is already out - a different backend would not continue it
+            self.metrics['failed_responses'] += 1
+            self.router.record(backend, request_type, None, False)
+            self.logger.error(f"AI streaming failed with {backend}: {e}")
+            raise
+        finally:
+            await tokens.aclose()
             
+        if segmenter is not None:
+            for sentence in segmenter.flush():
+                yield sentence
+                
+        # Tee the finished answer into the cache and context memory
+        response = ''.join(parts)
+        response_time = time.time() - start_time
+        self._record_response(prompt, response, backend, response_time)
+        self.metrics['streamed_responses'] += 1
+        self._cache_response(cache_key, user_prompt, response, accessibility_mode, emergency_mode)
+        
+        print(f"🧠 {backend} (streamed): first token {self.metrics['time_to_first_token'][-1]:.3f}s, "
+              f"complete {response_time:.3f}s")
+        
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get current performance metrics"""
         total_requests = self.metrics['total_requests']
         cache_hit_rate = (self.metrics['cache_hits'] / total_requests * 100) if total_requests > 0 else 0
         success_rate = (self.metrics['successful_responses'] / total_requests * 100) if total_requests > 0 else 0
+        ttft = sorted(self.metrics['time_to_first_token'])
         
         return {
             'total_requests': total_requests,
@@ -345,7 +558,13 @@ class UnifiedAIClient:
             'success_rate_percent': success_rate,
             'average_response_time_seconds': self.metrics['average_response_time'],
             'cache_hit_rate_percent': cache_hit_rate,
+            'response_cache': self.response_cache.get_metrics(),
+            'semantic_cache': self.semantic_cache.get_metrics(),
+            'streamed_responses': self.metrics['streamed_responses'],
+            'average_time_to_first_token_seconds': sum(ttft) / len(ttft) if ttft else 0.0,
+            'p95_time_to_first_token_seconds': ttft[min(len(ttft) - 1, int(len(ttft) * 0.95))] if ttft else 0.0,
             'backend_usage': self.metrics['backend_usage'],
+            'routing': self.router.get_stats(),
             'target_response_time_seconds': self.response_time_target,
             'performance_status': 'GOOD' if self.metrics['average_response_time'] <= self.response_time_target else 'NEEDS_OPTIMIZATION'
         }
@@ -353,7 +572,8 @@ class UnifiedAIClient:
     def clear_context(self):
         """Clear conversation context"""
         self.context_memory['conversation_history'] = []
-        self.response_cache = {}
+        self.response_cache.clear()
+        self.semantic_cache.clear()
         print("🧠 Context and cache cleared")
 
 async def main():
@@ -385,6 +605,108 @@ async def main():
             
     except Exception as e:
         print(f"❌ Test failed: {e}")
+    finally:
+        await client.close()
+
+class FakeOllamaServer:
+    """Local stand-in for Ollama's ``/api/tags`` and ``/api/chat`` (streaming and not)"""
+    
+    def __init__(self, reply: str, first_token_delay: float = 0.4, token_delay: float = 0.03):
+        self.reply = reply
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.requests = 0
+        self._runner = None
+        
+    def _tokens(self) -> List[str]:
+        words = self.reply.split(' ')
+        return [word + ' ' for word in words[:-1]] + words[-1:]
+        
+    async def start(self) -> str:
+        """Start serving on a free local port and return the endpoint URL"""
+        from aiohttp import web
+        
+        async def tags(request):
+            return web.json_response({'models': [{'name': 'phi3:mini'}]})
+            
+        async def chat(request):
+            self.requests += 1
+            body = await request.json()
+            await asyncio.sleep(self.first_token_delay)
+            if not body.get('stream', True):
+                await asyncio.sleep(self.token_delay * len(self._tokens()))
+                return web.json_response({'message': {'role': 'assistant', 'content': self.reply}, 'done': True})
+                
+            response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+            await response.prepare(request)
+            for token in self._tokens():
+                line = {'message': {'role': 'assistant', 'content': token}, 'done': False}
+                await response.write((json.dumps(line) + '\n').encode())
+                await asyncio.sleep(self.token_delay)
+            await response.write((json.dumps({'message': {'role': 'assistant', 'content': ''}, 'done': True}) + '\n').encode())
+            await response.write_eof()
+            return response
+            
+        app = web.Application()
+        app.router.add_get('/api/tags', tags)
+        app.router.add_post('/api/chat', chat)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+        
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            
+async def streaming_benchmark():
+    """Time-to-first-sentence: blocking generate_response vs stream_response on a fake Ollama"""
+    print("🧠 GEMINI: Streaming benchmark against a fake Ollama server")
+    
+    reply = ("Sure. Open the settings menu and choose accessibility. "
+             "Then turn on the screen reader, and adjust the speaking rate to a comfortable level. "
+             "You can also enable high contrast. Let me know if you need anything else.")
+    server = FakeOllamaServer(reply)
+    endpoint = await server.start()
+    
+    client = UnifiedAIClient()
+    for name, info in client.backends.items():
+        info['available'] = name == 'ollama_local'
+    client.backends['ollama_local']['endpoint'] = endpoint
+    
+    try:
+        start_time = time.time()
+        await client.generate_response("How do I turn on the screen reader?", accessibility_mode=False)
+        blocking_time = time.time() - start_time
+        
+        start_time = time.time()
+        first_sentence = None
+        sentences = []
+        async for sentence in client.stream_response("How do I enable high contrast?", context=[],
+                                                     accessibility_mode=False):
+            if first_sentence is None:
+                first_sentence = time.time() - start_time
+            sentences.append(sentence)
+        streamed_time = time.time() - start_time
+        
+        start_time = time.time()
+        cached = [sentence async for sentence in client.stream_response("How do I enable high contrast?", context=[],
+                                                                         accessibility_mode=False)]
+        cached_time = time.time() - start_time
+        
+        metrics = client.get_performance_metrics()
+        print(f"\n⏳ generate_response: first words after {blocking_time:.3f}s (whole answer)")
+        print(f"⚡ stream_response: first token {metrics['average_time_to_first_token_seconds']:.3f}s, "
+              f"first sentence {first_sentence:.3f}s, complete {streamed_time:.3f}s, {len(sentences)} sentences")
+        print(f"🔄 Replay from cache: {cached_time * 1000:.2f}ms, {len(cached)} sentences, "
+              f"{server.requests} requests reached the server")
+    finally:
+        await client.close()
+        await server.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    import sys
+    
+    asyncio.run(streaming_benchmark() if '--fake-ollama' in sys.argv else main())
\ No newline at end of file
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+🗣️ GEM OS - Shared Voice Activity Detection
+One stateful VAD for every voice front-end: frames are scored in NumPy batches, an
+adaptive noise floor tracks the room, and hysteresis plus hangover keep decisions
+from flickering on and off inside words.
+"""
+
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """Batch-vectorized energy/ZCR VAD with hysteresis, hangover and noise tracking.
+
+    Speech starts when a frame is ``enter_margin_db`` above the noise floor (and
+    above ``min_speech_db``), and only ends after ``hangover_ms`` of frames below
+    the lower ``exit_margin_db`` threshold. Samples that don't fill a frame are
+    carried over to the next call, so any block size can be fed.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30,
+                 min_speech_db: float = -45.0, enter_margin_db: float = 10.0,
+                 exit_margin_db: float = 6.0, hangover_ms: int = 240,
+                 noise_adapt_rate: float = 0.05,
+                 zcr_range: Optional[Tuple[float, float]] = None,
+                 webrtc_aggressiveness: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.min_speech_db = min_speech_db
+        self.enter_margin_db = enter_margin_db
+        self.exit_margin_db = exit_margin_db
+        self.hangover_frames = max(1, int(round(hangover_ms / frame_ms)))
+        self.noise_adapt_rate = noise_adapt_rate
+        self.zcr_range = zcr_range
+
+        # Optional WebRTC confirmation (requires 10/20/30 ms frames)
+        self.webrtc_vad = None
+        if webrtc_aggressiveness is not None:
+            try:
+                import webrtcvad
+                self.webrtc_vad = webrtcvad.Vad(webrtc_aggressiveness)
+            except ImportError:
+                pass
+
+        # Reused work buffers - no per-call allocation in steady state
+        self._scratch = np.zeros(self.frame_length * 8, dtype=np.float32)
+        self._pending = np.zeros(self.frame_length, dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """Forget speech state and noise estimate"""
+        self._pending_length = 0
+        self.noise_floor_db = -60.0
+        self.speaking = False
+        self._hangover = 0
+        self.frames_processed = 0
+
+    def _frames(self, audio: np.ndarray) -> np.ndarray:
+        """Normalize to float32, prepend the carried-over samples and cut whole frames"""
+        audio = np.asarray(audio).reshape(-1)
+        total = self._pending_length + len(audio)
+        if total > len(self._scratch):
+            self._scratch = np.zeros(total * 2, dtype=np.float32)
+
+        scratch = self._scratch
+        scratch[:self._pending_length] = self._pending[:self._pending_length]
+        target = scratch[self._pending_length:total]
+        if audio.dtype == np.int16:
+            np.multiply(audio, 1.0 / 32768.0, out=target, casting='unsafe')
+        else:
+            target[:] = audio
+
+        n_frames = total // self.frame_length
+        used = n_frames * self.frame_length
+        self._pending_length = total - used
+        self._pending[:self._pending_length] = scratch[used:total]
+        return scratch[:used].reshape(n_frames, self.frame_length)
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """Feed samples (int16 or float32) and return one speech decision per completed frame"""
+        frames = self._frames(audio)
+        n_frames = len(frames)
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+
+        # Per-frame features for the whole batch at once
+        energy_db = 10.0 * np.log10(np.einsum('ij,ij->i', frames, frames) / self.frame_length + 1e-12)
+        enter_threshold = max(self.min_speech_db, self.noise_floor_db + self.enter_margin_db)
+        exit_threshold = max(self.min_speech_db - (self.enter_margin_db - self.exit_margin_db),
+                             self.noise_floor_db + self.exit_margin_db)
+        can_enter = energy_db > enter_threshold
+        can_stay = energy_db > exit_threshold
+
+        if self.zcr_range is not None:
+            crossings = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / self.frame_length
+            can_enter &= (crossings > self.zcr_range[0]) & (crossings < self.zcr_range[1])
+
+        if self.webrtc_vad is not None:
+            for index in np.flatnonzero(can_enter):
+                pcm = (frames[index] * 32767).astype(np.int16).tobytes()
+                can_enter[index] = self.webrtc_vad.is_speech(pcm, self.sample_rate)
+
+        # Hysteresis state machine - scalar booleans only
+        decisions = np.empty(n_frames, dtype=bool)
+        speaking = self.speaking
+        hangover = self._hangover
+        for index, (enter, stay) in enumerate(zip(can_enter.tolist(), can_stay.tolist())):
+            if speaking:
+                if stay:
+                    hangover = self.hangover_frames
+                else:
+                    hangover -= 1
+                    speaking = hangover > 0
+            elif enter:
+                speaking = True
+                hangover = self.hangover_frames
+            decisions[index] = speaking
+        self.speaking = speaking
+        self._hangover = hangover
+
+        # Track the noise floor (closed-form EWMA over the batch). Speech frames still pull
+        # it up at a tenth of the rate so a steady loud room is eventually learned.
+        alpha = np.where(decisions, self.noise_adapt_rate * 0.1, self.noise_adapt_rate)
+        keep = np.cumprod((1.0 - alpha)[::-1])[::-1]
+        weights = alpha * np.append(keep[1:], 1.0)
+        floor = keep[0] * self.noise_floor_db + float(weights @ energy_db)
+        noise = energy_db[~decisions]
+        if len(noise):
+            # Drop immediately when the room gets quieter
+            floor = min(floor, float(noise.min()))
+        self.noise_floor_db = max(-90.0, floor)
+
+        self.frames_processed += n_frames
+        return decisions
+
+    def is_speech(self, audio: np.ndarray) -> bool:
+        """Convenience for chunk-based callers: True if any frame in the chunk is speech"""
+        decisions = self.process(audio)
+        return bool(decisions.any()) if len(decisions) else self.speaking
+
+
+def _legacy_vad(chunk: np.ndarray) -> bool:
+    """The previous per-chunk AdvancedVoiceEngine energy + ZCR check (without WebRTC)"""
+    energy = np.sum(chunk.astype(np.float32) ** 2) / len(chunk)
+    zcr = np.sum(np.abs(np.diff(np.sign(chunk)))) / len(chunk)
+    return energy > 1000 and 0.01 < zcr < 0.3
+
+
+def main():
+    """Benchmark VAD frame throughput"""
+    sample_rate = 16000
+    seconds = 60
+    rng = np.random.default_rng(3)
+    audio = (rng.standard_normal(seconds * sample_rate) * 100).astype(np.int16)
+    audio[sample_rate * 10:sample_rate * 20] *= 30  # A loud stretch to exercise hysteresis
+
+    print("🗣️ GEM OS - VAD throughput benchmark")
+    print("=" * 50)
+
+    vad = VoiceActivityDetector(sample_rate=sample_rate, frame_ms=30)
+    frame = vad.frame_length
+    n_frames = len(audio) // frame
+
+    start_time = time.perf_counter()
+    for start in range(0, n_frames * frame, frame):
+        _legacy_vad(audio[start:start + frame])
+    legacy = time.perf_counter() - start_time
+
+    vad.reset()
+    start_time = time.perf_counter()
+    for start in range(0, n_frames * frame, frame):
+        vad.process(audio[start:start + frame])
+    per_frame = time.perf_counter() - start_time
+
+    vad.reset()
+    block = 1024
+    start_time = time.perf_counter()
+    for start in range(0, len(audio), block):
+        vad.process(audio[start:start + block])
+    per_block = time.perf_counter() - start_time
+
+    vad.reset()
+    start_time = time.perf_counter()
+    decisions = vad.process(audio)
+    batch = time.perf_counter() - start_time
+
+    print(f"📊 {n_frames} frames of {vad.frame_ms} ms")
+    for label, elapsed in (('legacy per-chunk energy+ZCR', legacy),
+                           ('shared VAD, one frame per call', per_frame),
+                           ('shared VAD, 1024-sample blocks', per_block),
+                           ('shared VAD, one 60 s batch', batch)):
+        print(f"   {label}: {n_frames / elapsed:,.0f} frames/s")
+    print(f"🎤 Speech frames: {decisions.sum()} | noise floor {vad.noise_floor_db:.1f} dBFS")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,9 @@ import struct
 import webrtcvad
 from collections import deque
 
+from tts_cache import PhraseAudioCache
+from tts_output import StreamingAudioOutput, speak_stream
+
 class VoiceInterface:
     def __init__(self, language_code: str, polly_voice: str, wake_word: str):
         # --- General Config ---
@@ -67,117 +70,98 @@ class VoiceInterface:
         # --- WebRTC VAD (Voice Activity Detection) ---
         self.vad = webrtcvad.Vad(3) # Aggressiveness mode 3 is the highest
 
-    async def speak(self, text: str):
-        """Use Amazon Polly to speak the given text."""
-        if not self.polly:
-            print(f"🗣️ (Simulated): {text}")
-            # Return a dummy task for simulated speech
-            return asyncio.create_task(asyncio.sleep(2))
-
-        print(f"🗣️ Speaking: {text}")
-        self.is_speaking = True
-        loop = asyncio.get_running_loop()
+        # --- Speech output: one open stream fed from a jitter buffer ---
+        self.audio_output = StreamingAudioOutput(sample_rate=self.samplerate)
+        self.phrase_cache = PhraseAudioCache()
 
+    def _polly_engine(self) -> str:
         # Use standard engine for accessibility mode for potentially clearer, less nuanced speech.
         # Usa o motor 'standard' para o modo de acessibilidade para uma fala potencialmente mais clara e menos sutil.
-        engine = 'standard' if self.accessibility_mode else 'neural'
+        return 'standard' if self.accessibility_mode else 'neural'
+
+    async def _synthesize_polly(self, text: str, engine: str) -> np.ndarray:
+        """Synthesize one sentence with Amazon Polly into int16 PCM."""
+        # Using an executor to run the blocking I/O in a separate thread
+        response = await asyncio.get_running_loop().run_in_executor(None, lambda: self.polly.synthesize_speech(
+            Text=text,
+            OutputFormat='pcm',
+            VoiceId=self.polly_voice,
+            Engine=engine,
+            SampleRate=str(self.samplerate)
+        ))
+        return np.frombuffer(response['AudioStream'].read(), dtype=np.int16)
+
+    async def _synthesize(self, text: str) -> np.ndarray:
+        """Return cached audio for a sentence, calling Polly only on a cache miss."""
+        engine = self._polly_engine()
+        return await self.phrase_cache.get_or_synthesize(
+            text, self.polly_voice, engine, self.samplerate,
+            lambda phrase: self._synthesize_polly(phrase, engine)
+        )
 
-        try:
-            # Using an executor to run the blocking I/O in a separate thread
-            response = await loop.run_in_executor(None, lambda: self.polly.synthesize_speech(
-                Text=text,
-                OutputFormat='pcm',
-                VoiceId=self.polly_voice,
-                Engine=engine,
-                SampleRate=str(self.samplerate)
-            ))
-
-            audio_stream = response['AudioStream'].read()
-            audio_data = np.frombuffer(audio_stream, dtype=np.int16)
-
-            # Play audio non-blockingly
-            await loop.run_in_executor(None, sd.play, audio_data, self.samplerate)
-            
-            async def _wait_for_playback_to_finish():
-                await loop.run_in_executor(None, sd.wait)
-                self.is_speaking = False
-
-            # Return a task that completes when playback is done
-            return asyncio.create_task(_wait_for_playback_to_finish())
+    async def prewarm_prompts(self, prompts) -> int:
+        """Synthesize the fixed prompts ahead of time so they play without a Polly round trip."""
+        if not self.polly:
+            return 0
+        engine = self._polly_engine()
+        added = await self.phrase_cache.prewarm(
+            prompts, self.polly_voice, engine, self.samplerate,
+            lambda phrase: self._synthesize_polly(phrase, engine)
+        )
+        stats = self.phrase_cache.get_stats()
+        print(f"💾 TTS cache: {added} prompts synthesized, {stats['phrases']} phrases cached.")
+        return added
 
+    async def _play(self, text_source):
+        """Stream sentences through the shared output and clear is_speaking when done."""
+        self.is_speaking = True
+        try:
+            await speak_stream(text_source, self._synthesize, self.audio_output)
         except Exception as e:
             print(f"⚠️ Error during speech synthesis: {e}")
+            self.audio_output.stop_now()
+        finally:
             self.is_speaking = False
-            # Return a completed dummy task on error
-            return asyncio.create_task(asyncio.sleep(0))
+
+    async def speak(self, text: str):
+        """Use Amazon Polly to speak the given text."""
+        if not self.polly:
+            print(f"🗣️ (Simulated): {text}")
+            # Return a dummy task for simulated speech
+            return asyncio.create_task(asyncio.sleep(2))
+
+        print(f"🗣️ Speaking: {text}")
+        # Return a task that completes when playback is done
+        return asyncio.create_task(self._play([text]))
 
     async def stream_and_speak(self, text_generator):
         """
-        Receives text from a generator, synthesizes it into audio chunk by chunk,
-        and plays it in real-time.
+        Receives text from a generator (sync or async), synthesizes it sentence by
+        sentence and plays it in real time. Synthesis of the next sentence overlaps
+        playback of the current one, so there is no gap between sentences.
         """
         if not self.polly:
             # Simulate for environments without AWS
             full_text = ""
-            async for text_chunk in text_generator:
-                full_text += text_chunk + " "
+            if hasattr(text_generator, '__aiter__'):
+                async for text_chunk in text_generator:
+                    full_text += text_chunk + " "
+            else:
+                for text_chunk in text_generator:
+                    full_text += text_chunk + " "
             print(f"🗣️ (Simulated): {full_text}")
-        await asyncio.sleep(5)  # Simulate a long speech
+            await asyncio.sleep(5)  # Simulate a long speech
             return
 
-        self.is_speaking = True
-        audio_queue = asyncio.Queue()
-        loop = asyncio.get_running_loop()
-        playback_finished = asyncio.Event()
-
-        # Use standard engine for accessibility mode.
-        # Usa o motor 'standard' para o modo de acessibilidade.
-        engine = 'standard' if self.accessibility_mode else 'neural'
-
-        async def producer():
-            """Gets text from the generator, synthesizes it, and puts audio in the queue."""
-            try:
-                async for text_chunk in text_generator:
-                    if not self.is_speaking: break  # Stop if interrupted
-                    response = await loop.run_in_executor(None, lambda: self.polly.synthesize_speech(
-                        Text=text_chunk, OutputFormat='pcm', VoiceId=self.polly_voice,
-                        Engine=engine, SampleRate=str(self.samplerate)
-                    ))
-                    audio_data = np.frombuffer(response['AudioStream'].read(), dtype=np.int16)
-                    await audio_queue.put(audio_data)
-            except asyncio.CancelledError:
-                pass # Expected when interrupted
-            finally:
-                await audio_queue.put(None) # Signal that production is finished
-
-        def consumer():
-            """Consumes audio from the queue and plays it."""
-            while self.is_speaking:
-                try:
-                    audio_data = audio_queue.get_nowait()
-                    if audio_data is None: break
-                    sd.play(audio_data, self.samplerate)
-                    sd.wait()
-                except asyncio.QueueEmpty:  # Use get_nowait with a small sleep to yield control
-                    await asyncio.sleep(0.01)
-                    continue
-            sd.stop()  # Ensure sound stops if interrupted
-            playback_finished.set()
-
-        producer_task = asyncio.create_task(producer())
-        consumer_task = loop.run_in_executor(None, consumer)
-
-        await playback_finished.wait()
-        self.is_speaking = False
-        producer_task.cancel()
-        await asyncio.gather(producer_task, consumer_task, return_exceptions=True)
+        await self._play(text_generator)
 
     async def stop_speaking(self):
         """Forcibly stops any ongoing audio playback."""
         if self.is_speaking:
             print("\n...Stopping playback.")
-            self.is_speaking = False  # Signal threads to stop
-            await asyncio.get_running_loop().run_in_executor(None, sd.stop)
+            # The output callback goes silent on its next block (< 50 ms)
+            self.audio_output.stop_now()
+            self.is_speaking = False
 
     def toggle_accessibility_mode(self, enabled: bool) -> str:
         """
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+👂 GEM OS - Local Wake Word Detection
+Cheap always-on keyword spotting so full speech-to-text only runs after a wake hit.
+Default engine: MFCC features + subsequence DTW against enrolled templates (pure NumPy,
+testable offline on recorded WAV fixtures). Porcupine is available as a drop-in engine.
+Record templates with: python wake_word_detector.py --enroll "hey gem"
+"""
+
+import time
+import wave
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from audio_ring_buffer import AudioRingBuffer
+from pcm_audio import pcm16_to_float32, resample
+
+WAKE_WORD_TEMPLATE_DIR = Path("data/wake_words")
+
+
+class WakeWordDetector(ABC):
+    """Base class for wake word engines.
+
+    ``process`` is fed consecutive capture blocks and returns the detected
+    keyword (or ``None``). ``detect`` runs a whole recorded clip.
+    """
+
+    sample_rate = 16000
+
+    @property
+    def ready(self) -> bool:
+        return True
+
+    @abstractmethod
+    def process(self, block: np.ndarray) -> Optional[str]:
+        """Feed the next capture block; returns the keyword on a hit"""
+
+    def reset(self):
+        pass
+
+    def detect(self, audio: np.ndarray, block_size: int = 512) -> Optional[str]:
+        """Scan a complete clip (e.g. a recorded fixture) for a wake word"""
+        self.reset()
+        for start in range(0, len(audio), block_size):
+            keyword = self.process(audio[start:start + block_size])
+            if keyword:
+                return keyword
+        return None
+
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Triangular mel filterbank, built once per configuration"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    filterbank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filterbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filterbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filterbank
+
+
+@lru_cache(maxsize=8)
+def _dct_matrix(n_mfcc: int, n_mels: int) -> np.ndarray:
+    """Orthonormal DCT-II basis"""
+    n = np.arange(n_mels)
+    basis = np.cos(np.pi / n_mels * (n + 0.5)[None, :] * np.arange(n_mfcc)[:, None])
+    basis *= np.sqrt(2.0 / n_mels)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+def mfcc(audio: np.ndarray, sample_rate: int = 16000, n_mfcc: int = 13,
+         frame_ms: float = 25.0, hop_ms: float = 10.0, n_mels: int = 26) -> np.ndarray:
+    """MFCCs (without c0) for a float32 clip, shape (frames, n_mfcc - 1).
+
+    No cepstral mean normalization: templates are matched against windows that
+    include surrounding silence, and a window-wide mean would shift them apart.
+    """
+    frame_length = int(sample_rate * frame_ms / 1000)
+    hop = int(sample_rate * hop_ms / 1000)
+    n_fft = 1 << (frame_length - 1).bit_length()
+
+    if len(audio) < frame_length:
+        return np.zeros((0, n_mfcc - 1), dtype=np.float32)
+
+    emphasized = np.empty_like(audio, dtype=np.float32)
+    emphasized[0] = audio[0]
+    emphasized[1:] = audio[1:] - 0.97 * audio[:-1]
+
+    frames = np.lib.stride_tricks.sliding_window_view(emphasized, frame_length)[::hop]
+    spectrum = np.fft.rfft(frames * np.hamming(frame_length).astype(np.float32), n_fft)
+    power = (spectrum.real ** 2 + spectrum.imag ** 2) / n_fft
+
+    log_mel = np.log(power @ _mel_filterbank(sample_rate, n_fft, n_mels).T + 1e-10)
+    coefficients = log_mel @ _dct_matrix(n_mfcc, n_mels).T
+    # Drop c0 so detection is level-independent
+    return np.ascontiguousarray(coefficients[:, 1:], dtype=np.float32)
+
+
+def subsequence_dtw(template: np.ndarray, query: np.ndarray) -> float:
+    """Best per-frame DTW distance of ``template`` anywhere inside ``query``.
+
+    Steps are restricted to (1,0), (1,1) and (1,2) so each template row depends
+    only on the previous one and the recursion vectorizes over the query axis.
+    """
+    if len(template) == 0 or len(query) == 0:
+        return float('inf')
+
+    # Pairwise Euclidean distances via the ||a||^2 + ||b||^2 - 2ab expansion
+    cost = (np.sum(template ** 2, axis=1)[:, None] + np.sum(query ** 2, axis=1)[None, :]
+            - 2.0 * template @ query.T)
+    np.sqrt(np.maximum(cost, 0.0, out=cost), out=cost)
+
+    accumulated = cost[0].copy()  # Free start anywhere in the query
+    for row in cost[1:]:
+        best = accumulated.copy()                               # (1,0)
+        best[1:] = np.minimum(best[1:], accumulated[:-1])        # (1,1)
+        best[2:] = np.minimum(best[2:], accumulated[:-2])        # (1,2)
+        accumulated = row + best
+    return float(accumulated.min() / len(template))
+
+
+class TemplateWakeWordDetector(WakeWordDetector):
+    """MFCC + DTW template matcher over a rolling window of live audio.
+
+    Most always-on time is silence, so an RMS gate skips feature extraction
+    entirely until the window holds something loud enough to be speech.
+    """
+
+    def __init__(self, sample_rate: int = 16000, window_seconds: float = 1.5,
+                 hop_seconds: float = 0.25, threshold: Optional[float] = None,
+                 energy_gate: float = 0.01):
+        self.sample_rate = sample_rate
+        self.window = int(window_seconds * sample_rate)
+        self.hop = int(hop_seconds * sample_rate)
+        self.energy_gate = energy_gate
+        self.fixed_threshold = threshold
+        self.default_threshold = 6.0
+
+        self.templates: Dict[str, List[np.ndarray]] = {}
+        self.thresholds: Dict[str, float] = {}
+        self._ring = AudioRingBuffer(capacity_seconds=window_seconds * 2, sample_rate=sample_rate,
+                                     frame_size=self.hop)
+        self._next_check = self.window
+
+        self.metrics = {'windows_checked': 0, 'windows_gated': 0, 'detections': 0, 'processing_time': 0.0}
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.templates)
+
+    def enroll(self, keyword: str, audio: np.ndarray):
+        """Add a recorded example of a keyword (int16 or float32 mono at sample_rate)"""
+        if audio.dtype == np.int16:
+            audio = pcm16_to_float32(audio)
+        features = mfcc(audio, self.sample_rate)
+        if len(features):
+            self.templates.setdefault(keyword.lower(), []).append(features)
+            self._calibrate(keyword.lower())
+
+    def load_templates(self, directory: Path = WAKE_WORD_TEMPLATE_DIR) -> int:
+        """Enroll every ``<directory>/<keyword>/*.wav`` recording"""
+        count = 0
+        directory = Path(directory)
+        if not directory.exists():
+            return 0
+        for keyword_dir in sorted(p for p in directory.iterdir() if p.is_dir()):
+            for wav_path in sorted(keyword_dir.glob('*.wav')):
+                self.enroll(keyword_dir.name.replace('_', ' '), load_wav(wav_path, self.sample_rate))
+                count += 1
+        return count
+
+    def _calibrate(self, keyword: str):
+        """Derive the acceptance threshold from the spread between a keyword's templates"""
+        if self.fixed_threshold is not None:
+            self.thresholds[keyword] = self.fixed_threshold
+            return
+        templates = self.templates[keyword]
+        if len(templates) < 2:
+            self.thresholds[keyword] = self.default_threshold
+            return
+        distances = [subsequence_dtw(a, b) for i, a in enumerate(templates)
+                     for b in templates[i + 1:]]
+        self.thresholds[keyword] = float(np.mean(distances)) * 1.25
+
+    def reset(self):
+        self._ring.discard()
+        self._next_check = self._ring.write_position + self.window
+
+    def process(self, block: np.ndarray) -> Optional[str]:
+        if block.dtype == np.int16:
+            block = pcm16_to_float32(block)
+        self._ring.write(block)
+        if self._ring.write_position < self._next_check:
+            return None
+        self._next_check = self._ring.write_position + self.hop
+
+        start_time = time.perf_counter()
+        try:
+            window = self._ring.slice(self._ring.write_position - self.window, self._ring.write_position)
+            if window is None:
+                return None
+            if np.sqrt(np.mean(window ** 2)) < self.energy_gate:
+                self.metrics['windows_gated'] += 1
+                return None
+
+            self.metrics['windows_checked'] += 1
+            features = mfcc(window, self.sample_rate)
+            for keyword, templates in self.templates.items():
+                distance = min(subsequence_dtw(template, features) for template in templates)
+                if distance <= self.thresholds[keyword]:
+                    self.metrics['detections'] += 1
+                    # Don't fire again on the same utterance
+                    self._next_check = self._ring.write_position + self.window
+                    return keyword
+            return None
+        finally:
+            self.metrics['processing_time'] += time.perf_counter() - start_time
+
+
+class PorcupineWakeWordDetector(WakeWordDetector):
+    """Picovoice Porcupine engine (needs PORCUPINE_ACCESS_KEY)"""
+
+    def __init__(self, keywords: List[str], access_key: str):
+        import pvporcupine
+        self.keywords = keywords
+        self.porcupine = pvporcupine.create(access_key=access_key, keywords=keywords)
+        self.sample_rate = self.porcupine.sample_rate
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def reset(self):
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def process(self, block: np.ndarray) -> Optional[str]:
+        if block.dtype != np.int16:
+            block = (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+        self._pending = np.concatenate((self._pending, block))
+        frame_length = self.porcupine.frame_length
+        while len(self._pending) >= frame_length:
+            frame, self._pending = self._pending[:frame_length], self._pending[frame_length:]
+            index = self.porcupine.process(frame)
+            if index >= 0:
+                return self.keywords[index]
+        return None
+
+
+def load_wav(path, sample_rate: int = 16000) -> np.ndarray:
+    """Load a 16-bit WAV fixture as float32 mono at ``sample_rate``"""
+    with wave.open(str(path), 'rb') as wav_file:
+        audio = pcm16_to_float32(wav_file.readframes(wav_file.getnframes()), wav_file.getnchannels())
+        return resample(audio, wav_file.getframerate(), sample_rate)
+
+
+def save_wav(path, audio: np.ndarray, sample_rate: int = 16000):
+    """Write float32 mono audio as a 16-bit WAV"""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(str(path), 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+
+
+def trim_silence(audio: np.ndarray, sample_rate: int = 16000, energy_gate: float = 0.01,
+                 padding_seconds: float = 0.1) -> np.ndarray:
+    """Cut a recording down to its loud part (plus a little padding); empty if it's all quiet"""
+    frame = int(sample_rate * 0.01)
+    usable = len(audio) - len(audio) % frame
+    if usable == 0:
+        return audio[:0]
+    rms = np.sqrt(np.mean(audio[:usable].reshape(-1, frame) ** 2, axis=1))
+    loud = np.flatnonzero(rms >= energy_gate)
+    if len(loud) == 0:
+        return audio[:0]
+    padding = int(sample_rate * padding_seconds)
+    return audio[max(0, loud[0] * frame - padding):min(len(audio), (loud[-1] + 1) * frame + padding)]
+
+
+def record_microphone(seconds: float, sample_rate: int = 16000) -> np.ndarray:
+    """Record a mono float32 clip from the default input device"""
+    import pyaudio
+
+    chunk = 1024
+    audio_interface = pyaudio.PyAudio()
+    try:
+        stream = audio_interface.open(format=pyaudio.paInt16, channels=1, rate=sample_rate,
+                                      input=True, frames_per_buffer=chunk)
+        try:
+            blocks = [stream.read(chunk, exception_on_overflow=False)
+                      for _ in range(int(np.ceil(seconds * sample_rate / chunk)))]
+        finally:
+            stream.stop_stream()
+            stream.close()
+    finally:
+        audio_interface.terminate()
+    return pcm16_to_float32(b''.join(blocks))
+
+
+def enroll_keyword(keyword: str, samples: int = 5, seconds: float = 2.0, sample_rate: int = 16000,
+                   directory: Path = WAKE_WORD_TEMPLATE_DIR,
+                   record: Callable[[float, int], np.ndarray] = record_microphone,
+                   energy_gate: float = 0.01) -> List[Path]:
+    """Record ``samples`` examples of a keyword into ``<directory>/<keyword>/NNN.wav``.
+
+    Each take is trimmed to its loud part; takes with nothing above ``energy_gate``
+    are asked for again. Returns the paths written.
+    """
+    keyword_dir = Path(directory) / keyword.lower().replace(' ', '_')
+    keyword_dir.mkdir(parents=True, exist_ok=True)
+    number = len(list(keyword_dir.glob('*.wav')))
+
+    paths = []
+    attempts = 0
+    while len(paths) < samples and attempts < samples * 3:
+        attempts += 1
+        print(f"🎙️ Say '{keyword}' ({len(paths) + 1}/{samples})...")
+        take = trim_silence(record(seconds, sample_rate), sample_rate, energy_gate)
+        if len(take) < int(0.2 * sample_rate):
+            print("⚠️ Didn't catch that - too quiet, try again")
+            continue
+        number += 1
+        path = keyword_dir / f"{number:03d}.wav"
+        save_wav(path, take, sample_rate)
+        paths.append(path)
+    return paths
+
+
+def create_wake_word_detector(engine: str = 'template', sample_rate: int = 16000,
+                              keywords: Optional[List[str]] = None,
+                              access_key: Optional[str] = None,
+                              template_dir: Path = WAKE_WORD_TEMPLATE_DIR) -> Optional[WakeWordDetector]:
+    """Build a wake word engine by name ('template', 'porcupine' or 'none')"""
+    if engine == 'porcupine':
+        return PorcupineWakeWordDetector(keywords or ['porcupine'], access_key)
+    if engine == 'template':
+        detector = TemplateWakeWordDetector(sample_rate=sample_rate)
+        detector.load_templates(template_dir)
+        return detector
+    return None
+
+
+def synthetic_keyword(jitter: float = 0.0, sample_rate: int = 16000, seed: int = 7,
+                      descending: bool = False) -> np.ndarray:
+    """A two-syllable tone sweep that stands in for a recorded keyword in benchmarks and tests"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(0.6 * sample_rate)) / sample_rate
+    sweep = 500 * t / t[-1]
+    f0 = (800 - sweep if descending else 300 + sweep) + jitter
+    tone = np.sin(2 * np.pi * np.cumsum(f0) / sample_rate) * np.hanning(len(t))
+    tone += 0.5 * np.sin(2 * np.pi * (1800 - 900 * t / t[-1] + jitter) * t)
+    return (0.3 * tone + 0.005 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def main():
+    """Offline sanity check and idle CPU cost of the template detector"""
+    sample_rate = 16000
+    rng = np.random.default_rng(7)
+
+    def noise(seconds: float, level: float) -> np.ndarray:
+        return (level * rng.standard_normal(int(seconds * sample_rate))).astype(np.float32)
+
+    print("👂 GEM OS - Wake word detector benchmark")
+    print("=" * 50)
+
+    detector = TemplateWakeWordDetector(sample_rate=sample_rate)
+    for jitter in (-20.0, 0.0, 20.0):
+        detector.enroll('hey gem', synthetic_keyword(jitter))
+    print(f"📚 Enrolled 3 templates, threshold {detector.thresholds['hey gem']:.2f}")
+
+    positive = np.concatenate((noise(0.5, 0.005), synthetic_keyword(10.0), noise(0.5, 0.005)))
+    negative = np.concatenate((noise(0.5, 0.005), noise(0.6, 0.2), noise(0.5, 0.005)))
+    print(f"✅ Keyword clip: {detector.detect(positive)}")
+    print(f"✅ Loud noise clip: {detector.detect(negative)}")
+
+    for label, level in (('silent room', 0.002), ('constant speech-level noise', 0.1)):
+        detector.reset()
+        detector.metrics['processing_time'] = 0.0
+        seconds = 60
+        block = 512
+        audio = noise(seconds, level)
+        start_time = time.process_time()
+        for start in range(0, len(audio), block):
+            detector.process(audio[start:start + block])
+        cpu_seconds = time.process_time() - start_time
+        print(f"\n⚡ {label}:")
+        print(f"   CPU per hour of listening: {cpu_seconds * 60:.1f}s ({cpu_seconds / seconds * 100:.2f}% of one core)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local wake word engine")
+    parser.add_argument('--enroll', metavar='KEYWORD', help="record templates for KEYWORD from the microphone")
+    parser.add_argument('--samples', type=int, default=5, help="takes to record (default 5)")
+    parser.add_argument('--seconds', type=float, default=2.0, help="length of each take (default 2.0)")
+    parser.add_argument('--template-dir', type=Path, default=WAKE_WORD_TEMPLATE_DIR)
+    args = parser.parse_args()
+
+    if args.enroll:
+        written = enroll_keyword(args.enroll, args.samples, args.seconds, directory=args.template_dir)
+        detector = create_wake_word_detector(template_dir=args.template_dir)
+        keyword = args.enroll.lower()
+        print(f"✅ Saved {len(written)} templates for '{keyword}' in {args.template_dir}"
+              f" (threshold {detector.thresholds.get(keyword, float('nan')):.2f})")
+    else:
+        main()